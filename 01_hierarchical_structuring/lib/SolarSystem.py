@@ -7,6 +7,9 @@ import avango.script
 from avango.script import field_has_changed
 import avango.daemon
 
+### import application libraries
+from lib.TriMeshLoadReport import TRIMESH_LOADER
+
 ### import python libraries
 import math
 
@@ -28,7 +31,7 @@ class OrbitVisualization:
         ### resources ###
         
         ## init geometry
-        _loader = avango.gua.nodes.TriMeshLoader() # init trimesh loader
+        _loader = TRIMESH_LOADER # shared trimesh loader (load report; cube.obj is loaded for all segments)
 
         for _i in range(self.number_of_segments):
             _segment_angle  = 360.0 / self.number_of_segments
@@ -295,7 +298,7 @@ class SolarObject:
         ### resources ###
 
         # init geometries of solar object
-        _loader = avango.gua.nodes.TriMeshLoader() # init trimesh loader to load external meshes
+        _loader = TRIMESH_LOADER # shared trimesh loader (load report)
 
         self.object_geometry = _loader.create_geometry_from_file(NAME + "_geometry", "data/objects/sphere.obj", avango.gua.LoaderFlags.DEFAULTS)
         self.object_geometry.Transform.value = avango.gua.make_scale_mat(self.diameter)
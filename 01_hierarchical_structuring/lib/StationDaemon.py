@@ -0,0 +1,504 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango.daemon
+
+### import application libraries
+from lib.DeviceDiscovery import InputDeviceTable, get_keyboard_paths, HotplugAttacher
+from lib.StationHistory import StationHistoryWriter, IDENTITY
+
+### import python libraries
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import signal
+import struct
+import sys
+import time
+
+
+### global variables ###
+## Station configuration entries (dicts, see the STATIONS list in daemon.py):
+#   "type": "hid" (default), "keyboard" (one station per keyboard, numbered from 0) or "dtrack"
+#   "station": station name (hid, keyboard)
+#   "devices": device names in /proc/bus/input/devices, the first one found is used (hid)
+#   "number": which device of that name is used (hid, default 1)
+#   "values", "buttons": channel map, list index = station value resp. button (hid, keyboard)
+#   "timeout": REL values fall back to 0 after this many ms without events (hid)
+#   "norm_abs": normalize EV_ABS values (hid)
+#   "rate": publish rate in Hz; events in between are coalesced (hid, default: every event)
+#   "coalesce": "last" keeps the latest REL value per channel, "sum" adds up the deltas (hid)
+#   "port", "stations": DTrack port and {body id: station name} (dtrack)
+#   "history": keep the last N timestamped samples in shared memory (see lib/StationHistory.py);
+#              hid devices are then read by RateLimitedHIDInput if possible (kernel timestamps of every button edge)
+#   "history_rate": polling rate in Hz for stations written by avango.daemon devices (default DEFAULT_HISTORY_RATE)
+#   "autostart": started when the daemon is run without station arguments (default True)
+# Several hid entries may configure the same station; the first one whose device is found is started.
+
+INPUT_EVENT = struct.Struct("llHHi") # struct input_event: time (sec, usec), type, code, value
+
+## event types and codes read by RateLimitedHIDInput (see linux/input-event-codes.h)
+EV_SYN = 0x00 # SYN_REPORT (code 0) ends the events of one report
+EVENT_TYPES = {"EV_KEY": 0x01, "EV_REL": 0x02}
+
+EVENT_CODES = {
+    "REL_X": 0x00, "REL_Y": 0x01, "REL_Z": 0x02, "REL_RX": 0x03, "REL_RY": 0x04, "REL_RZ": 0x05, "REL_WHEEL": 0x08,
+    "BTN_0": 0x100, "BTN_1": 0x101, "BTN_LEFT": 0x110, "BTN_RIGHT": 0x111, "BTN_MIDDLE": 0x112,
+    "KEY_1": 2, "KEY_2": 3, "KEY_3": 4, "KEY_4": 5, "KEY_5": 6, "KEY_6": 7, "KEY_7": 8, "KEY_8": 9,
+    "KEY_Q": 16, "KEY_W": 17, "KEY_E": 18, "KEY_A": 30, "KEY_S": 31, "KEY_D": 32, "KEY_B": 48,
+    "KEY_LEFTCTRL": 29, "KEY_SPACE": 57, "KEY_KPMINUS": 74, "KEY_KPPLUS": 78,
+    "KEY_UP": 103, "KEY_PAGEUP": 104, "KEY_LEFT": 105, "KEY_RIGHT": 106, "KEY_DOWN": 108, "KEY_PAGEDOWN": 109, "KEY_F14": 184,
+    }
+
+DEFAULT_HISTORY_RATE = 120.0 # in Hz, polling of stations written by avango.daemon devices
+
+EXERCISE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # working directory of hot-plugged child daemons
+PR_SET_PDEATHSIG = 1 # see prctl.h
+
+
+
+### helper functions ###
+
+## (type, code) of a channel like "EV_REL::REL_X", None if RateLimitedHIDInput does not read it
+def get_event_code(CHANNEL):
+    _type, _, _code = CHANNEL.partition("::")
+
+    if _type not in EVENT_TYPES or _code not in EVENT_CODES:
+        return None
+
+    return EVENT_TYPES[_type], EVENT_CODES[_code]
+
+
+## station names of a configuration entry (keyboards: the first keyboard station)
+def get_entry_stations(ENTRY):
+    _type = ENTRY.get("type", "hid")
+
+    if _type == "dtrack":
+        return list(ENTRY["stations"].values())
+
+    if _type == "keyboard":
+        return [ENTRY["station"] + "0"]
+
+    return [ENTRY["station"]]
+
+
+def get_station_names(CONFIG):
+    _names = []
+
+    for _entry in CONFIG:
+        for _name in get_entry_stations(_entry):
+            if _name not in _names:
+                _names.append(_name)
+
+    return _names
+
+
+## event path of the device of a hid entry ("" if none of its devices is found)
+def get_entry_path(ENTRY, TABLE):
+    for _name in ENTRY["devices"]:
+        _path = TABLE.get_event_path(_name, ENTRY.get("number", 1))
+
+        if len(_path) > 0:
+            return _path
+
+    return ""
+
+
+## runs FUNCTION in a child process (the parent runs the avango.daemon devices)
+def start_process(FUNCTION):
+    _pid = os.fork()
+
+    if _pid == 0:
+        try:
+            FUNCTION()
+        finally:
+            os._exit(0)
+
+    return _pid
+
+
+def is_requested(ENTRY, STATION, STATIONS):
+    if len(STATIONS) == 0:
+        return ENTRY.get("autostart", True)
+
+    if ENTRY.get("type", "hid") == "keyboard": # gua-device-keyboard requests all keyboards
+        return len([_name for _name in STATIONS if _name.startswith(STATION)]) > 0
+
+    return STATION in STATIONS
+
+
+
+## Reads an input event device and publishes into its station at a fixed rate.
+# REL events arriving in between (about 1000 per second for mice and
+# spacemice) are coalesced per channel, so the station is written at most
+# RATE times per second. Button changes are published immediately. With a
+# HISTORY every report is kept with its kernel timestamp.
+class RateLimitedHIDInput:
+
+    ## constructor
+    def __init__(self,
+        STATION, # avango.daemon.Station
+        DEVICE, # /dev/input/eventX
+        VALUES = [], # channels, e.g. "EV_REL::REL_X"
+        BUTTONS = [], # channels, e.g. "EV_KEY::BTN_0"
+        RATE = 60.0, # in Hz
+        TIMEOUT = None, # in ms
+        COALESCE = "last",
+        HISTORY = None, # StationHistoryWriter
+        ):
+
+        ### parameters ###
+        self.station = STATION
+        self.device = DEVICE
+        self.interval = 1.0 / RATE
+        self.timeout = TIMEOUT * 0.001 if TIMEOUT is not None else None
+        self.coalesce = COALESCE
+        self.history = HISTORY
+
+
+        ### variables ###
+        self.value_channels = {} # (type, code) -> value index
+        self.button_channels = {} # (type, code) -> button index
+
+        for _i, _channel in enumerate(VALUES):
+            self.value_channels[get_event_code(_channel)] = _i
+
+        for _i, _channel in enumerate(BUTTONS):
+            self.button_channels[get_event_code(_channel)] = _i
+
+        self.values = [0.0] * len(VALUES) # published
+        self.buttons = [False] * len(BUTTONS)
+        self.pending = {} # value index -> coalesced value since the last publish
+        self.event_times = [0.0] * len(VALUES)
+        self.report_values = [0.0] * len(VALUES) # values of the current report (for the history)
+
+
+    ### functions ###
+    ## all channels can be read (otherwise avango.daemon.HIDInput has to be used)
+    @staticmethod
+    def supports(VALUES, BUTTONS):
+        return None not in [get_event_code(_channel) for _channel in VALUES + BUTTONS]
+
+
+    def start(self):
+        return start_process(self.run)
+
+
+    def run(self):
+        _fd = os.open(self.device, os.O_RDONLY)
+        _parent = os.getppid()
+        _next_publish = time.time()
+
+        while os.getppid() == _parent: # ends with the daemon
+            if len(self.values) > 0:
+                _readable, _, _ = select.select([_fd], [], [], max(0.0, _next_publish - time.time()))
+            else: # buttons are published on arrival
+                _readable, _, _ = select.select([_fd], [], [], 1.0)
+
+            if len(_readable) > 0:
+                self.process(os.read(_fd, INPUT_EVENT.size * 64))
+
+            _time = time.time()
+
+            if _time >= _next_publish:
+                self.publish(_time)
+                _next_publish = _time + self.interval
+
+        os.close(_fd)
+
+
+    def process(self, BYTES):
+        _time = time.time()
+
+        for _offset in range(0, len(BYTES) - INPUT_EVENT.size + 1, INPUT_EVENT.size):
+            _sec, _usec, _type, _code, _value = INPUT_EVENT.unpack_from(BYTES, _offset)
+
+            if _type == EV_SYN and _code == 0:
+                if self.history is not None:
+                    self.history.append(_sec + _usec * 0.000001, self.report_values, self.buttons)
+
+                    if self.coalesce == "sum": # deltas of the next report
+                        self.report_values = [0.0] * len(self.values)
+
+                continue
+
+            _index = self.value_channels.get((_type, _code))
+
+            if _index is not None:
+                if self.coalesce == "sum":
+                    self.pending[_index] = self.pending.get(_index, 0.0) + _value
+                else:
+                    self.pending[_index] = float(_value)
+
+                self.report_values[_index] = float(_value)
+                self.event_times[_index] = _time
+                continue
+
+            _index = self.button_channels.get((_type, _code))
+
+            if _index is not None:
+                _pressed = _value != 0 # 1 press, 2 autorepeat
+
+                if _pressed != self.buttons[_index]:
+                    self.buttons[_index] = _pressed
+                    self.station.buttons[_index] = _pressed
+
+
+    def publish(self, TIME):
+        for _index in range(len(self.values)):
+            if _index in self.pending:
+                _value = self.pending.pop(_index)
+
+            elif self.coalesce == "sum" or (self.timeout is not None and TIME - self.event_times[_index] > self.timeout):
+                _value = 0.0
+
+            else:
+                continue
+
+            if _value != self.values[_index]:
+                self.values[_index] = _value
+                self.station.values[_index] = _value
+
+
+
+## Keeps the histories of stations written by avango.daemon devices (DTrack,
+# HIDInput) that cannot be read where the samples arrive: the configured
+# channels of the stations are polled at RATE and a sample is appended
+# whenever one changed.
+class StationSampler:
+
+    ## constructor
+    def __init__(self,
+        STATIONS = [], # (avango.daemon.Station, StationHistoryWriter, number of values, number of buttons, matrix) tuples
+        RATE = DEFAULT_HISTORY_RATE, # in Hz
+        ):
+
+        ### parameters ###
+        self.stations = STATIONS
+        self.interval = 1.0 / RATE
+
+
+    ### functions ###
+    def start(self):
+        return start_process(self.run)
+
+
+    def run(self):
+        _parent = os.getppid()
+        _last_states = [None] * len(self.stations)
+
+        while os.getppid() == _parent: # ends with the daemon
+            _time = time.time()
+
+            for _i, (_station, _history, _num_values, _num_buttons, _matrix) in enumerate(self.stations):
+                if _matrix == True:
+                    _mat = _station.matrix
+                    _elements = [_mat.get_element(_row, _col) for _row in range(4) for _col in range(4)]
+                else:
+                    _elements = IDENTITY
+
+                _state = (
+                    _elements,
+                    [_station.values[_j] for _j in range(_num_values)], # configured channels only
+                    [_station.buttons[_j] for _j in range(_num_buttons)],
+                    )
+
+                if _state != _last_states[_i]: # unchanged stations are not written
+                    _history.append(_time, _state[1], _state[2], _state[0])
+                    _last_states[_i] = _state
+
+            time.sleep(max(0.0, self.interval - (time.time() - _time)))
+
+
+
+### functions ###
+
+## Devices for the requested stations of CONFIG (hid stations in DEVICE_PATHS
+# open the given event device instead of looking up their device names).
+# Returns (avango.daemon devices, child processes to start, started station names).
+def create_devices(CONFIG, TABLE, STATIONS = [], DEVICE_PATHS = {}):
+    _devices = []
+    _readers = [] # RateLimitedHIDInputs and StationSamplers
+    _started = []
+    _sampled = {} # history rate -> (station, history) pairs
+
+    for _entry in CONFIG:
+        _type = _entry.get("type", "hid")
+
+        if _type == "dtrack":
+            _dtrack = avango.daemon.DTrack()
+            _dtrack.port = _entry["port"]
+
+            _names = [_name for _id, _name in sorted(_entry["stations"].items()) if is_requested(_entry, _name, STATIONS)]
+
+            for _id, _name in sorted(_entry["stations"].items()):
+                if _name in _names:
+                    _station = avango.daemon.Station(_name)
+                    _dtrack.stations[_id] = _station
+                    _started.append(_name)
+
+                    if _entry.get("history") is not None: # DTrack writes the station natively
+                        _sampled.setdefault(_entry.get("history_rate", DEFAULT_HISTORY_RATE), []).append((_station, StationHistoryWriter(_name, _entry["history"]), 0, 0, True))
+
+            if len(_names) > 0:
+                _devices.append(_dtrack)
+                print("DTrack started at port", _entry["port"])
+
+        elif _type == "keyboard":
+            if is_requested(_entry, _entry["station"], STATIONS) == False:
+                continue
+
+            for _i, _path in enumerate(get_keyboard_paths()):
+                _name = _entry["station"] + str(_i)
+
+                if _entry.get("history") is not None and RateLimitedHIDInput.supports([], _entry["buttons"]): # key edges with kernel timestamps
+                    _readers.append(RateLimitedHIDInput(
+                        STATION = avango.daemon.Station(_name),
+                        DEVICE = _path,
+                        BUTTONS = _entry["buttons"],
+                        HISTORY = StationHistoryWriter(_name, _entry["history"]),
+                        ))
+
+                else:
+                    _keyboard = avango.daemon.HIDInput()
+                    _keyboard.station = avango.daemon.Station(_name)
+                    _keyboard.device = _path
+
+                    for _j, _channel in enumerate(_entry["buttons"]):
+                        _keyboard.buttons[_j] = _channel
+
+                    _devices.append(_keyboard)
+
+                    if _entry.get("history") is not None:
+                        _sampled.setdefault(_entry.get("history_rate", DEFAULT_HISTORY_RATE), []).append((avango.daemon.Station(_name), StationHistoryWriter(_name, _entry["history"]), 0, len(_entry["buttons"]), False))
+
+                _started.append(_entry["station"] + str(_i))
+                print("Keyboard " + str(_i) + " started at:", os.path.basename(_path))
+
+        else:
+            _station = _entry["station"]
+
+            if _station in _started or is_requested(_entry, _station, STATIONS) == False:
+                continue
+
+            _path = DEVICE_PATHS.get(_station) or get_entry_path(_entry, TABLE)
+
+            if len(_path) == 0: # maybe found by a later entry of the same station
+                continue
+
+            _values = _entry.get("values", [])
+            _buttons = _entry.get("buttons", [])
+
+            if (_entry.get("rate") is not None or _entry.get("history") is not None) and RateLimitedHIDInput.supports(_values, _buttons):
+                _readers.append(RateLimitedHIDInput(
+                    STATION = avango.daemon.Station(_station),
+                    DEVICE = _path,
+                    VALUES = _values,
+                    BUTTONS = _buttons,
+                    RATE = _entry.get("rate", 60.0),
+                    TIMEOUT = _entry.get("timeout"),
+                    COALESCE = _entry.get("coalesce", "last"),
+                    HISTORY = StationHistoryWriter(_station, _entry["history"]) if _entry.get("history") is not None else None,
+                    ))
+
+            else:
+                _device = avango.daemon.HIDInput()
+                _device.station = avango.daemon.Station(_station)
+                _device.device = _path
+
+                if _entry.get("timeout") is not None:
+                    _device.timeout = str(_entry["timeout"])
+
+                if _entry.get("norm_abs", False) == True:
+                    _device.norm_abs = "True"
+
+                for _i, _channel in enumerate(_values):
+                    _device.values[_i] = _channel
+
+                for _i, _channel in enumerate(_buttons):
+                    _device.buttons[_i] = _channel
+
+                _devices.append(_device)
+
+                if _entry.get("history") is not None:
+                    _sampled.setdefault(_entry.get("history_rate", DEFAULT_HISTORY_RATE), []).append((avango.daemon.Station(_station), StationHistoryWriter(_station, _entry["history"]), len(_values), len(_buttons), False))
+
+            _started.append(_station)
+            print(_station, "started at:", _path)
+
+    for _rate, _stations in sorted(_sampled.items()):
+        _readers.append(StationSampler(STATIONS = _stations, RATE = _rate))
+
+    return _devices, _readers, _started
+
+
+## Runs a hot-plugged configuration entry on the event device PATH in a child
+# daemon process (see HotplugAttacher), which ends with the daemon PARENT_PID.
+def run_hotplugged(ENTRY, PATH, PARENT_PID):
+    ctypes.CDLL(ctypes.util.find_library("c"), use_errno = True).prctl(PR_SET_PDEATHSIG, signal.SIGTERM)
+
+    if os.getppid() != PARENT_PID: # daemon ended before
+        return
+
+    _devices, _readers, _started = create_devices([ENTRY], InputDeviceTable(), [ENTRY["station"]], {ENTRY["station"]: PATH})
+
+    for _reader in _readers:
+        _reader.start()
+
+    if len(_devices) > 0:
+        avango.daemon.run(_devices)
+    else:
+        os.wait() # readers end when this process is terminated
+
+
+## argument list of the child daemon process of a hot-plugged device (started in EXERCISE_DIR)
+def get_hotplug_command(ENTRY, PATH):
+    return [sys.executable, "-m", "lib.StationDaemon", json.dumps(ENTRY), PATH, str(os.getpid())]
+
+
+## Starts the requested stations of CONFIG (all autostart entries if STATIONS is empty) and runs the daemon.
+def start_daemon(CONFIG, STATIONS = [], HOTPLUG = True):
+    _table = InputDeviceTable.load() # /proc/bus/input/devices parsed once
+    _devices, _readers, _started = create_devices(CONFIG, _table, STATIONS)
+
+    _missing = []
+
+    for _entry in CONFIG:
+        for _name in get_entry_stations(_entry):
+            if is_requested(_entry, _name, STATIONS) and _name not in _started and _name not in _missing:
+                _missing.append(_name)
+                print(_name, "NOT found!")
+
+    for _reader in _readers:
+        _reader.start()
+
+    ## devices plugged in after the daemon was started
+    if HOTPLUG == True:
+        _hotplug_devices = {}
+
+        for _entry in CONFIG:
+            if _entry.get("type", "hid") == "hid" and is_requested(_entry, _entry["station"], STATIONS):
+                for _name in _entry["devices"]:
+                    _hotplug_devices.setdefault(_name, _entry)
+
+        _started_paths = {} # station name -> event path of the hid stations started above
+
+        for _entry in CONFIG:
+            if _entry.get("type", "hid") == "hid" and _entry["station"] in _started and _entry["station"] not in _started_paths:
+                _path = get_entry_path(_entry, _table)
+
+                if len(_path) > 0:
+                    _started_paths[_entry["station"]] = _path
+
+        if len(_hotplug_devices) > 0:
+            _attacher = HotplugAttacher(DEVICES = _hotplug_devices, COMMAND = get_hotplug_command, WORKING_DIR = EXERCISE_DIR, STARTED = _started_paths)
+            _attacher.start()
+
+    avango.daemon.run(_devices)
+
+
+
+if __name__ == '__main__': # child daemon of a hot-plugged device (see get_hotplug_command)
+    run_hotplugged(json.loads(sys.argv[1]), sys.argv[2], int(sys.argv[3]))
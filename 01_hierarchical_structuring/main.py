@@ -9,6 +9,7 @@ from lib.SimpleViewingSetup import *
 from lib.SolarSystem import SolarSystem
 from lib.Device import *
 from lib.Navigation import SteeringNavigation
+from lib.TriMeshLoadReport import TRIMESH_LOADER
 
 
 ### global variables ###
@@ -59,6 +60,8 @@ def start():
     viewingSetup.connect_navigation_matrix(steeringNavigation.sf_nav_mat)
     steeringNavigation.set_rotation_center_offset(viewingSetup.get_head_position())
 
+    TRIMESH_LOADER.print_report() # load time and resident memory per mesh file
+
     viewingSetup.run(locals(), globals())
 
 
@@ -20,6 +20,7 @@ class Avatar:
     def __init__(self,
         SCENEGRAPH = None,
         START_MATRIX = avango.gua.make_identity_mat(),
+        PICKING_SERVICE = None,
         ):
 
         self.translation_factor = 0.01
@@ -45,7 +46,7 @@ class Avatar:
         self.accumulator.my_constructor(START_MATRIX = START_MATRIX)
 
         self.groundFollowing = GroundFollowing()
-        self.groundFollowing.my_constructor(SCENEGRAPH = SCENEGRAPH, START_MATRIX = START_MATRIX)
+        self.groundFollowing.my_constructor(SCENEGRAPH = SCENEGRAPH, START_MATRIX = START_MATRIX, PICKING_SERVICE = PICKING_SERVICE)
 
 
         ## init field connections (dependency graph)
@@ -128,6 +129,7 @@ class GroundFollowing(avango.script.Script):
     def my_constructor(self,
         SCENEGRAPH = None,
         START_MATRIX = avango.gua.make_identity_mat(),
+        PICKING_SERVICE = None,
         ):
 
         ### parameters ###
@@ -145,7 +147,7 @@ class GroundFollowing(avango.script.Script):
 
         ## init internal sub-classes
         self.gravity_intersection = Intersection()
-        self.gravity_intersection.my_constructor(SCENEGRAPH, self.sf_mat, self.pick_length, self.pick_direction)
+        self.gravity_intersection.my_constructor(SCENEGRAPH, self.sf_mat, self.pick_length, self.pick_direction, PICKING_SERVICE = PICKING_SERVICE)
 
         ## init field connections
         self.mf_pick_result.connect_from(self.gravity_intersection.mf_pick_result)
@@ -24,7 +24,7 @@ class Intersection(avango.script.Script):
         self.super(Intersection).__init__()
 
 
-    def my_constructor(self, SCENEGRAPH, SF_MAT, PICK_LENGTH, PICK_DIRECTION, WHITE_LIST = [], BLACK_LIST = []):
+    def my_constructor(self, SCENEGRAPH, SF_MAT, PICK_LENGTH, PICK_DIRECTION, WHITE_LIST = [], BLACK_LIST = [], PICKING_SERVICE = None):
 
         ### external references ###
         self.SCENEGRAPH = SCENEGRAPH
@@ -54,6 +54,11 @@ class Intersection(avango.script.Script):
         ### resources ###  
                 
         self.ray = avango.gua.nodes.Ray()
+
+        if PICKING_SERVICE is not None: # batched ray test (resolved when the result is read)
+            self.pick_request = PICKING_SERVICE.create_request(PICK_OPTIONS = self.pick_options, WHITE_LIST = self.white_list, BLACK_LIST = self.black_list)
+        else: # immediate ray test
+            self.pick_request = None
   
   
         ## init field connections
@@ -64,6 +69,11 @@ class Intersection(avango.script.Script):
     ### callback functions ###
 
     def evaluate(self): # evaluated once every frame
+        if self.pick_request is not None:
+            self.pick_request.set_ray(self.sf_pick_mat.value.get_translate(), self.pick_direction * self.pick_length)
+            self.mf_pick_result.value = self.pick_request.get_pick_result().value # result of this frame's ray
+            return
+
         ## update ray parameters
         self.ray.Origin.value = self.sf_pick_mat.value.get_translate()
         self.ray.Direction.value = self.pick_direction * self.pick_length
@@ -11,6 +11,7 @@ from lib.Avatar import Avatar
 from lib.Scene import Scene
 from lib.KeyboardInput import KeyboardInput
 from lib.Avatar import Accumulator
+from lib.PickingService import PickingService
 
 
 
@@ -23,8 +24,12 @@ def start():
     viewingSetup = SimpleViewingSetup(SCENEGRAPH = scenegraph, STEREO_MODE = "mono")
     #viewingSetup = SimpleViewingSetup(SCENEGRAPH = scenegraph, STEREO_MODE = "anaglyph")
 
+    ## init picking service (resolves all ray requests once per frame)
+    pickingService = PickingService()
+    pickingService.my_constructor(SCENEGRAPH = scenegraph)
+
     ## init game avatar
-    avatar = Avatar(SCENEGRAPH = scenegraph, START_MATRIX = avango.gua.make_trans_mat(0.1, 0.14, 0.0))
+    avatar = Avatar(SCENEGRAPH = scenegraph, START_MATRIX = avango.gua.make_trans_mat(0.1, 0.14, 0.0), PICKING_SERVICE = pickingService)
 
 
     ## init scene
@@ -6,6 +6,12 @@ import avango.gua
 import avango.script
 from avango.script import field_has_changed
 
+# import application libraries
+try:
+    from lib.TargetArray import TargetArray # requires numpy
+except ImportError:
+    TargetArray = None
+
 class Hook(avango.script.Script):
 
     ## internal fields
@@ -30,6 +36,15 @@ class Hook(avango.script.Script):
         self.TARGET_LIST = TARGET_LIST
         self.parent = PARENT_NODE
 
+        ### variables ###
+
+        self.highlight_mask = None # per target: hook inside bounding box (None before the first test)
+
+        if TargetArray is not None: # vectorized containment test over all targets
+            self.target_array = TargetArray(NODES = self.TARGET_LIST)
+        else:
+            self.target_array = None
+
         ### resources ###
         
         _loader = avango.gua.nodes.TriMeshLoader() # get trimesh loader to load external tri-meshes
@@ -72,14 +87,29 @@ class Hook(avango.script.Script):
         _pos = self.sf_mat.value.get_translate() # world position of hook
         #_pos = self.sf_mat.value.get_translate() * _pos
 
-        for _node in self.TARGET_LIST: # iterate over all target nodes
-            _bb = _node.BoundingBox.value # get bounding box of a node
-            #print(_node.Name.value, _bb.contains(_pos))
-            #print("_pos", _pos)
-            #print("_bb: ", _bb)
-            
-            if _bb.contains(_pos) == True: # hook inside bounding box of this node
-                _node.Material.value.set_uniform("Color", avango.gua.Vec4(1.0,0.0,0.0,0.85)) # highlight color
-            else:
-                _node.Material.value.set_uniform("Color", avango.gua.Vec4(1.0,1.0,1.0,1.0)) # default color
-       
+        if self.target_array is not None:
+            self.target_array.update_bounding_boxes() # world bounding boxes are only valid after the scenegraph update
+            _mask = self.target_array.get_containing_mask(_pos) # hook inside bounding box of each target node
+
+            if self.highlight_mask is None:
+                self.highlight_mask = ~_mask # initially set all colors
+
+            _on_list, _off_list = self.target_array.get_mask_changes(self.highlight_mask, _mask)
+
+        else:
+            _mask = [_node.BoundingBox.value.contains(_pos) for _node in self.TARGET_LIST] # iterate over all target nodes
+
+            if self.highlight_mask is None:
+                self.highlight_mask = [not _value for _value in _mask] # initially set all colors
+
+            _on_list = [_node for _node, _old, _new in zip(self.TARGET_LIST, self.highlight_mask, _mask) if _new == True and _old == False]
+            _off_list = [_node for _node, _old, _new in zip(self.TARGET_LIST, self.highlight_mask, _mask) if _new == False and _old == True]
+
+        self.highlight_mask = _mask
+
+        ## only update materials of targets whose state changed
+        for _node in _on_list: # hook entered bounding box of this node
+            _node.Material.value.set_uniform("Color", avango.gua.Vec4(1.0,0.0,0.0,0.85)) # highlight color
+
+        for _node in _off_list: # hook left bounding box of this node
+            _node.Material.value.set_uniform("Color", avango.gua.Vec4(1.0,1.0,1.0,1.0)) # default color
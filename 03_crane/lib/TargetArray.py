@@ -0,0 +1,81 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+
+### import python libraries
+import numpy
+
+
+## Contiguous NumPy arrays over a list of target nodes (positions and world
+# bounding boxes) for evaluating all targets with one vectorized call per frame.
+# Moving targets have to be written back with update_position() or
+# update_bounding_box().
+class TargetArray:
+
+    ## constructor
+    def __init__(self,
+        NODES = [],
+        ):
+
+        ### variables ###
+        self.nodes = list(NODES)
+        self.node_indices = dict([(_node, _i) for _i, _node in enumerate(self.nodes)]) # node -> row
+
+        self.positions = numpy.zeros((len(self.nodes), 3), dtype = numpy.float64) # local translations
+        self.bb_min = numpy.zeros((len(self.nodes), 3), dtype = numpy.float64) # world bounding boxes
+        self.bb_max = numpy.zeros((len(self.nodes), 3), dtype = numpy.float64)
+
+        for _node in self.nodes:
+            self.update_position(_node)
+
+
+    ### functions ###
+    def get_index(self, NODE):
+        return self.node_indices[NODE]
+
+
+    def create_mask(self):
+        return numpy.zeros(len(self.nodes), dtype = bool)
+
+
+    ## per-target table of small integer states (e.g. idle/highlighted/dragged)
+    def create_state_table(self, STATE = 0):
+        return numpy.full(len(self.nodes), STATE, dtype = numpy.int8)
+
+
+    def update_position(self, NODE):
+        _pos = NODE.Transform.value.get_translate()
+        self.positions[self.node_indices[NODE]] = (_pos.x, _pos.y, _pos.z)
+
+
+    def update_bounding_box(self, NODE):
+        _bb = NODE.BoundingBox.value
+        _i = self.node_indices[NODE]
+        self.bb_min[_i] = (_bb.Min.x, _bb.Min.y, _bb.Min.z)
+        self.bb_max[_i] = (_bb.Max.x, _bb.Max.y, _bb.Max.z)
+
+
+    def update_bounding_boxes(self):
+        for _node in self.nodes:
+            self.update_bounding_box(_node)
+
+
+    ## distances of all target positions to POS (float64[N])
+    def get_distances(self, POS):
+        _diff = self.positions - (POS.x, POS.y, POS.z)
+        return numpy.sqrt(numpy.einsum("ij,ij->i", _diff, _diff))
+
+
+    ## mask of all target bounding boxes containing POS (bool[N])
+    def get_containing_mask(self, POS):
+        _pos = (POS.x, POS.y, POS.z)
+        return numpy.logical_and(self.bb_min <= _pos, self.bb_max >= _pos).all(axis = 1)
+
+
+    ## nodes whose mask entry switched on resp. off between two masks
+    def get_mask_changes(self, OLD_MASK, NEW_MASK):
+        _on = numpy.flatnonzero(NEW_MASK & ~OLD_MASK)
+        _off = numpy.flatnonzero(OLD_MASK & ~NEW_MASK)
+        return [self.nodes[_i] for _i in _on], [self.nodes[_i] for _i in _off]
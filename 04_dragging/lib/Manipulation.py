@@ -8,12 +8,28 @@ from avango.script import field_has_changed
 import avango.daemon
 
 ### import application libraries
+from lib.SpatialIndex import SpatialIndex
 from lib.Device import MouseInput
 
+try:
+    from lib.TargetArray import TargetArray # requires numpy
+except ImportError:
+    TargetArray = None
+
 ### import python libraries
 import operator
 
+
+### global variables ###
+CANDIDATE_SEARCH = "Spatial Index" # radius queries on a uniform grid
+#CANDIDATE_SEARCH = "NumPy" # vectorized distances over all targets (requires numpy)
+
+## interaction states of target nodes
+IDLE_STATE = 0
+HIGHLIGHT_STATE = 1
+DRAGGING_STATE = 2
    
+
 class ManipulationManager(avango.script.Script):
 
     ### input fields
@@ -46,8 +62,35 @@ class ManipulationManager(avango.script.Script):
         ### variables ###
         self.dragging_technique = 0
         self.dragged_objects_list = []
+        self.near_objects_list = [] # nodes within the highlight release distance of the hand
         self.lf_hand_mat = avango.gua.make_identity_mat() # last frame hand matrix
 
+        ## init spatial index over target positions (radius queries for dragging candidates)
+        self.spatial_index = SpatialIndex(CELL_SIZE = 0.03)
+
+        for _node in self.TARGET_LIST:
+            self.spatial_index.insert(_node, _node.Transform.value.get_translate())
+
+        ## init target arrays (alternative vectorized candidate search)
+        if CANDIDATE_SEARCH == "NumPy" and TargetArray is not None:
+            self.target_array = TargetArray(NODES = self.TARGET_LIST)
+        else:
+            self.target_array = None
+
+        ## init interaction state table (indexed by target id); colors are only derived on state transitions
+        self.target_ids = dict([(_node, _i) for _i, _node in enumerate(self.TARGET_LIST)]) # node -> target id
+
+        if self.target_array is not None:
+            self.target_states = self.target_array.create_state_table(IDLE_STATE)
+        else:
+            self.target_states = [IDLE_STATE] * len(self.TARGET_LIST)
+
+        self.state_colors = [
+            avango.gua.Vec4(1.0, 1.0, 1.0, 1.0), # default material
+            avango.gua.Vec4(0.0, 1.0, 0.0, 1.0), # highlight material
+            avango.gua.Vec4(1.0, 0.0, 0.0, 1.0), # dragging material
+            ]
+
         
         ## init hand geometry
         _loader = avango.gua.nodes.TriMeshLoader() # init trimesh loader to load external meshes
@@ -108,9 +151,8 @@ class ManipulationManager(avango.script.Script):
         _hand_mat = self.hand_transform.Transform.value
 
         for _node in self.TARGET_LIST:
-            if self.is_highlight_material(_node.CurrentColor.value) == True: # a monkey node in close proximity
-                _node.CurrentColor.value = avango.gua.Vec4(1.0, 0.0, 0.0, 1.0)
-                _node.Material.value.set_uniform("Color", _node.CurrentColor.value) # switch to dragging material
+            if self.target_states[self.target_ids[_node]] == HIGHLIGHT_STATE: # a monkey node in close proximity
+                self.set_target_state(_node, DRAGGING_STATE) # switch to dragging material
 
                 self.dragged_objects_list.append(_node) # add node for dragging
           
@@ -131,22 +173,43 @@ class ManipulationManager(avango.script.Script):
   
   
     def update_dragging_candidates(self):
+        if self.target_array is not None:
+            self.update_dragging_candidates_vectorized()
+            return
+
         _hand_pos = self.hand_transform.Transform.value.get_translate()
-    
-        for _node in self.TARGET_LIST:
-            _pos = _node.Transform.value.get_translate() # a monkey position
 
-            _dist = (_hand_pos - _pos).length() # hand-object distance
-            _color = _node.CurrentColor.value
+        _near_list = self.spatial_index.query_radius(_hand_pos, 0.03) # (node, hand-object distance) tuples within release distance
 
+        for _node, _dist in _near_list:
             ## toggle object highlight
-            if _dist < 0.025 and self.is_default_material(_color) == True:
-                _node.CurrentColor.value = avango.gua.Vec4(0.0, 1.0, 0.0, 1.0)
-                _node.Material.value.set_uniform("Color", _node.CurrentColor.value) # switch to highlight material
+            if _dist < 0.025 and self.target_states[self.target_ids[_node]] == IDLE_STATE:
+                self.set_target_state(_node, HIGHLIGHT_STATE) # switch to highlight material
+
+        _near_nodes = set([_node for _node, _dist in _near_list])
 
-            elif _dist > 0.03 and self.is_highlight_material(_color) == True:
-                _node.CurrentColor.value = avango.gua.Vec4(1.0, 1.0, 1.0, 1.0)
-                _node.Material.value.set_uniform("Color", _node.CurrentColor.value) # switch to default material
+        for _node in self.near_objects_list: # nodes that left the release distance since the last frame
+            if _node not in _near_nodes and self.target_states[self.target_ids[_node]] == HIGHLIGHT_STATE:
+                self.set_target_state(_node, IDLE_STATE) # switch to default material
+
+        self.near_objects_list = list(_near_nodes)
+
+
+    def update_dragging_candidates_vectorized(self):
+        _hand_pos = self.hand_transform.Transform.value.get_translate()
+
+        _dist = self.target_array.get_distances(_hand_pos) # all hand-object distances
+
+        ## toggle object highlight (state changes only)
+        _highlight_mask = self.target_states == HIGHLIGHT_STATE
+        _new_highlight_mask = (_highlight_mask | ((_dist < 0.025) & (self.target_states == IDLE_STATE))) & ~(_dist > 0.03)
+        _on_list, _off_list = self.target_array.get_mask_changes(_highlight_mask, _new_highlight_mask)
+
+        for _node in _on_list:
+            self.set_target_state(_node, HIGHLIGHT_STATE) # switch to highlight material
+
+        for _node in _off_list:
+            self.set_target_state(_node, IDLE_STATE) # switch to default material
     
 
     def object_dragging(self):
@@ -167,8 +230,10 @@ class ManipulationManager(avango.script.Script):
     def stop_dragging(self):  
         ## handle all dragged objects
         for _node in self.dragged_objects_list:      
-            _node.CurrentColor.value = avango.gua.Vec4(0.0, 1.0, 0.0, 1.0)
-            _node.Material.value.set_uniform("Color", _node.CurrentColor.value) # switch to highlight material
+            self.set_target_state(_node, HIGHLIGHT_STATE) # switch to highlight material
+
+            if _node not in self.near_objects_list: # released nodes are un-highlighted once the hand moves away
+                self.near_objects_list.append(_node)
 
         ## TODO: Implement individual components of the different dragging strategies here ##
         if self.dragging_technique == 1: # change node order in scenegraph
@@ -182,20 +247,21 @@ class ManipulationManager(avango.script.Script):
 
         elif self.dragging_technique == 3: # relative tool input to object space
             pass
-    
-        self.dragged_objects_list = [] # clear list
-
 
-    def is_default_material(self, VEC4):
-        return VEC4.x == 1.0 and VEC4.y == 1.0 and VEC4.z == 1.0 and VEC4.w == 1.0
+        for _node in self.dragged_objects_list: # re-insert dropped nodes into spatial index
+            self.spatial_index.update(_node, _node.Transform.value.get_translate())
 
+            if self.target_array is not None:
+                self.target_array.update_position(_node)
+    
+        self.dragged_objects_list = [] # clear list
 
-    def is_highlight_material(self, VEC4):
-        return VEC4.x == 0.0 and VEC4.y == 1.0 and VEC4.z == 0.0 and VEC4.w == 1.0
 
+    def set_target_state(self, NODE, STATE):
+        self.target_states[self.target_ids[NODE]] = STATE
 
-    def is_dragging_material(self, VEC4):
-        return VEC4.x == 1.0 and VEC4.y == 0.0 and VEC4.z == 0.0 and VEC4.w == 1.0
+        NODE.CurrentColor.value = self.state_colors[STATE]
+        NODE.Material.value.set_uniform("Color", NODE.CurrentColor.value)
 
     
     ### callback functions ###
@@ -231,6 +297,12 @@ class ManipulationManager(avango.script.Script):
 
         self.object_dragging() # possibly drag object with hand input
 
+        for _node in self.dragged_objects_list: # re-insert moved nodes into spatial index
+            self.spatial_index.update(_node, _node.Transform.value.get_translate())
+
+            if self.target_array is not None:
+                self.target_array.update_position(_node)
+
         self.lf_hand_mat = self.hand_transform.Transform.value
 
     ## print the subgraph under a given node to the console
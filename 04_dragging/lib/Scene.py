@@ -4,6 +4,9 @@
 import avango
 import avango.gua
 
+### import application libraries
+from lib.TriMeshLoadReport import TRIMESH_LOADER
+
 ### import python libraries
 import random
 
@@ -36,7 +39,7 @@ class Scene:
 
 
         ## init scene geometries
-        _loader = avango.gua.nodes.TriMeshLoader() # get trimesh loader to load external meshes
+        _loader = TRIMESH_LOADER # shared trimesh loader (load report; monkey.obj is loaded for all targets)
 
         # init ground plane
         self.ground_geometry = _loader.create_geometry_from_file("ground", "data/objects/plane.obj", avango.gua.LoaderFlags.DEFAULTS)
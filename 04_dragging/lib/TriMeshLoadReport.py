@@ -0,0 +1,94 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+
+### import python libraries
+import os
+import time
+
+
+### global variables ###
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096 # in byte
+
+
+
+### helper functions ###
+
+## resident memory of this process in byte (0 if not available)
+def get_resident_memory():
+    try:
+        with open("/proc/self/statm") as _file:
+            return int(_file.read().split()[1]) * PAGE_SIZE
+
+    except (IOError, ValueError, IndexError):
+        return 0
+
+
+
+## TriMeshLoader that reports time and resident memory per loaded file. Every
+# call is passed to guacamole's loader, which keeps each file in its geometry
+# database: repeated loads of a file share the mesh resource, so their time
+# and memory growth (the "cache hits") should stay far below the first load.
+class TriMeshLoadReport:
+
+    ## constructor
+    def __init__(self):
+
+        ### variables ###
+        self.entries = {} # filename -> dict with load count, first and repeated load time (sec) and memory growth (byte)
+
+
+        ### resources ###
+        self.loader = avango.gua.nodes.TriMeshLoader()
+
+
+    ### functions ###
+    def create_geometry_from_file(self, NAME, FILENAME, FLAGS = avango.gua.LoaderFlags.DEFAULTS):
+        _memory = get_resident_memory()
+        _time = time.perf_counter()
+
+        _node = self.loader.create_geometry_from_file(NAME, FILENAME, FLAGS)
+
+        _time = time.perf_counter() - _time
+        _memory = get_resident_memory() - _memory
+
+        _entry = self.entries.get(FILENAME)
+
+        if _entry is None: # first load (file parsed)
+            self.entries[FILENAME] = {"loads": 1, "first_time": _time, "first_memory": _memory, "repeated_time": 0.0, "repeated_memory": 0}
+        else: # geometry database hit
+            _entry["loads"] += 1
+            _entry["repeated_time"] += _time
+            _entry["repeated_memory"] += _memory
+
+        return _node
+
+
+    ## (filename, loads, first load time, mean repeated load time, first load memory, mean repeated load memory) per file (times in sec, memory in byte)
+    def get_report(self):
+        _report = []
+
+        for _filename, _entry in sorted(self.entries.items()):
+            _hits = _entry["loads"] - 1
+            _report.append((_filename, _entry["loads"], _entry["first_time"], _entry["repeated_time"] / max(_hits, 1), _entry["first_memory"], _entry["repeated_memory"] / max(_hits, 1)))
+
+        return _report
+
+
+    def print_report(self):
+        print("TriMeshLoader:", sum([_entry["loads"] for _entry in self.entries.values()]), "geometries from", len(self.entries), "files")
+
+        for _filename, _loads, _first_time, _hit_time, _first_memory, _hit_memory in self.get_report():
+            _line = "  {0}: {1} loads, first {2:.2f} ms / {3:+.1f} KiB".format(_filename, _loads, _first_time * 1000.0, _first_memory / 1024.0)
+
+            if _loads > 1:
+                _line += ", repeated {0:.3f} ms / {1:+.1f} KiB each".format(_hit_time * 1000.0, _hit_memory / 1024.0)
+
+            print(_line)
+
+
+
+## loader shared by all modules of the application
+TRIMESH_LOADER = TriMeshLoadReport()
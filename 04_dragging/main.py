@@ -11,6 +11,7 @@ from lib.Scene import Scene
 from lib.Device import KeyboardInput
 from lib.Navigation import SteeringNavigation
 from lib.Manipulation import ManipulationManager
+from lib.TriMeshLoadReport import TRIMESH_LOADER
 
 
 def start():
@@ -44,6 +45,7 @@ def start():
 
 
     print_graph(scenegraph.Root.value)
+    TRIMESH_LOADER.print_report() # load time and resident memory per mesh file
 
     ## start application/render loop
     viewingSetup.run(locals(), globals())
@@ -0,0 +1,41 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+
+
+### import application libraries
+from lib.SimpleViewingSetup import SimpleViewingSetup
+from lib.Calibration import CalibrationRecorder
+
+### import python libraries
+import sys
+
+
+## usage: python3 calibrate.py [device station] [profile file] (daemon.py has to run)
+def start():
+
+    _station = sys.argv[1] if len(sys.argv) > 1 else "gua-device-spacemouse"
+    _filename = sys.argv[2] if len(sys.argv) > 2 else "data/calibration/spacemouse.txt"
+
+
+    ## create scenegraph
+    scenegraph = avango.gua.nodes.SceneGraph(Name = "scenegraph")
+
+    ## init viewing setup (drives the frame loop)
+    viewingSetup = SimpleViewingSetup(SCENEGRAPH = scenegraph, STEREO_MODE = "mono")
+
+
+    ## init calibration recorder
+    calibrationRecorder = CalibrationRecorder()
+    calibrationRecorder.my_constructor(DEVICE_STATION = _station, FILENAME = _filename)
+
+
+    ## start application/render loop
+    viewingSetup.run(locals(), globals())
+
+
+
+if __name__ == '__main__':
+  start()
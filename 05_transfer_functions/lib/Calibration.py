@@ -0,0 +1,186 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.script
+import avango.daemon
+
+### import python libraries
+import os
+
+
+## Per-channel calibration of a multi-dof device, stored as text file with one
+# line per channel: name, sign, offset, min, max, negative and positive
+# threshold (in percent of min resp. max, see MultiDofInput.filter_channel).
+class CalibrationProfile:
+
+    ## constructor
+    def __init__(self,
+        CHANNELS = [], # (name, sign, offset, min, max, neg. threshold, pos. threshold) tuples
+        ):
+
+        ### parameters ###
+        self.channels = [tuple(_channel) for _channel in CHANNELS]
+
+
+    ### functions ###
+    @staticmethod
+    def load(FILENAME):
+        _channels = []
+
+        with open(FILENAME) as _file:
+            for _line in _file:
+                _line = _line.split("#")[0].strip()
+
+                if len(_line) == 0:
+                    continue
+
+                _values = _line.split()
+
+                if len(_values) != 7:
+                    raise ValueError("calibration profile " + FILENAME + ": expected 7 values per channel, got '" + _line + "'")
+
+                _channels.append(tuple([_values[0]] + [float(_value) for _value in _values[1:]]))
+
+        return CalibrationProfile(CHANNELS = _channels)
+
+
+    def save(self, FILENAME):
+        with open(FILENAME, "w") as _file:
+            _file.write("# name  sign  offset  min  max  neg_threshold  pos_threshold (in percent)\n")
+
+            for _channel in self.channels:
+                _file.write(" ".join([_channel[0]] + [repr(round(_value, 6)) for _value in _channel[1:]]) + "\n")
+
+
+    ## scale/bias per channel: value * scale + bias > 0 (positive range) resp. < 0 (negative range)
+    def compile(self):
+        _pos_scale = []
+        _pos_bias = []
+        _neg_scale = []
+        _neg_bias = []
+
+        for _name, _sign, _offset, _min, _max, _neg_threshold, _pos_threshold in self.channels:
+            _min -= _offset
+            _max -= _offset
+            _pos = _max * _pos_threshold * 0.01
+            _neg = _min * _neg_threshold * 0.01
+
+            _scale = 1.0 / (_max - _pos)
+            _pos_scale.append(_sign * _scale)
+            _pos_bias.append(-(_offset + _pos) * _scale)
+
+            _scale = 1.0 / abs(_min - _neg)
+            _neg_scale.append(_sign * _scale)
+            _neg_bias.append(-(_offset + _neg) * _scale)
+
+        return tuple(_pos_scale), tuple(_pos_bias), tuple(_neg_scale), tuple(_neg_bias)
+
+
+
+## Records a calibration profile of a device station. The device has to rest
+# during the first REST_FRAMES frames (noise band and offset), afterwards all
+# axes have to be moved to their extremes (range).
+class CalibrationRecorder(avango.script.Script):
+
+    ## constructor
+    def __init__(self):
+        self.super(CalibrationRecorder).__init__()
+
+
+    def my_constructor(self,
+        DEVICE_STATION = "gua-device-spacemouse",
+        FILENAME = "data/calibration/spacemouse.txt",
+        CHANNEL_NAMES = ["x", "y", "z", "rx", "ry", "rz"],
+        SIGNS = None, # axis flips (kept from an existing profile if None)
+        REST_FRAMES = 180,
+        RANGE_FRAMES = 900,
+        NOISE_MARGIN = 1.5, # thresholds relative to the measured noise band
+        ):
+
+        ### parameters ###
+        self.filename = FILENAME
+        self.channel_names = CHANNEL_NAMES
+        self.rest_frames = REST_FRAMES
+        self.range_frames = RANGE_FRAMES
+        self.noise_margin = NOISE_MARGIN
+
+        if SIGNS is None:
+            if os.path.isfile(FILENAME):
+                SIGNS = [_channel[1] for _channel in CalibrationProfile.load(FILENAME).channels]
+            else:
+                SIGNS = [1.0] * len(CHANNEL_NAMES)
+
+        self.signs = SIGNS
+
+
+        ### variables ###
+        self.frame = 0
+        self.rest_min = [None] * len(CHANNEL_NAMES)
+        self.rest_max = [None] * len(CHANNEL_NAMES)
+        self.range_min = [0.0] * len(CHANNEL_NAMES)
+        self.range_max = [0.0] * len(CHANNEL_NAMES)
+        self.profile = None
+
+
+        ### resources ###
+        self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
+        self.device_sensor.Station.value = DEVICE_STATION
+        self.value_fields = [getattr(self.device_sensor, "Value" + str(_i)) for _i in range(len(CHANNEL_NAMES))]
+
+        self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
+
+        print("calibration: do not touch the device")
+
+
+    ### functions ###
+    def get_values(self):
+        return [_field.value for _field in self.value_fields]
+
+
+    def create_profile(self):
+        _channels = []
+
+        for _i, _name in enumerate(self.channel_names):
+            _sign = self.signs[_i] # profile values are given for the sign-corrected channel
+
+            _offset = (self.rest_min[_i] + self.rest_max[_i]) * 0.5 * _sign
+            _noise = (self.rest_max[_i] - self.rest_min[_i]) * 0.5 * self.noise_margin
+
+            _range = sorted([self.range_min[_i] * _sign, self.range_max[_i] * _sign])
+            _min = min(_range[0], _offset - 2.0 * _noise - 1.0e-6)
+            _max = max(_range[1], _offset + 2.0 * _noise + 1.0e-6)
+
+            _neg_threshold = 100.0 * _noise / abs(_min - _offset)
+            _pos_threshold = 100.0 * _noise / abs(_max - _offset)
+
+            _channels.append((_name, _sign, _offset, _min, _max, _neg_threshold, _pos_threshold))
+
+        return CalibrationProfile(CHANNELS = _channels)
+
+
+    ### callback functions ###
+    def frame_callback(self): # evaluated every frame
+        if self.profile is not None:
+            return
+
+        _values = self.get_values()
+        self.frame += 1
+
+        if self.frame <= self.rest_frames: # rest noise band
+            for _i, _value in enumerate(_values):
+                self.rest_min[_i] = _value if self.rest_min[_i] is None else min(self.rest_min[_i], _value)
+                self.rest_max[_i] = _value if self.rest_max[_i] is None else max(self.rest_max[_i], _value)
+
+            if self.frame == self.rest_frames:
+                print("calibration: move all axes to their extremes")
+
+        elif self.frame <= self.rest_frames + self.range_frames: # range
+            for _i, _value in enumerate(_values):
+                self.range_min[_i] = min(self.range_min[_i], _value)
+                self.range_max[_i] = max(self.range_max[_i], _value)
+
+        else:
+            self.profile = self.create_profile()
+            self.profile.save(self.filename)
+            print("calibration: profile written to", self.filename)
@@ -7,6 +7,10 @@ import avango.script
 from avango.script import field_has_changed
 import avango.daemon
 
+### import application libraries
+from lib.Calibration import CalibrationProfile
+from lib.ButtonEvents import ButtonEventQueue
+
 
 ### import python libraries
 # ...
@@ -25,6 +29,66 @@ class MultiDofInput(avango.script.Script):
   
   
     ### functions ###
+    ## load a calibration profile (see lib/Calibration.py) precompiled to per-channel scale/bias for sample_dof()
+    def init_calibration(self, FILENAME, EPSILON = 0.0001):
+        self.calibration = CalibrationProfile.load(FILENAME)
+        self.channel_calibration = tuple(zip(*self.calibration.compile())) # (pos. scale, pos. bias, neg. scale, neg. bias) per channel
+        self.dof_epsilon = EPSILON
+
+
+    ## snapshot of all value channels (filtered in one multiply-add-clamp pass, equivalent to filter_channel)
+    def sample_dof(self):
+        _sensor = self.device_sensor
+        _values = (_sensor.Value0.value, _sensor.Value1.value, _sensor.Value2.value, _sensor.Value3.value, _sensor.Value4.value, _sensor.Value5.value)
+
+        _dof = []
+
+        for _value, (_pos_scale, _pos_bias, _neg_scale, _neg_bias) in zip(_values, self.channel_calibration):
+            if _value == 0.0: # no input
+                _dof.append(0.0)
+                continue
+
+            _v = _value * _pos_scale + _pos_bias
+
+            if _v > 0.0: # above positive threshold
+                _dof.append(min(_v, 1.0))
+                continue
+
+            _v = _value * _neg_scale + _neg_bias
+
+            if _v < 0.0: # below negative threshold
+                _dof.append(max(_v, -1.0))
+            else:
+                _dof.append(0.0)
+
+        _dof.append(0.0)
+
+        return _dof
+
+
+    ## write mf_dof only if a channel changed beyond epsilon (or returned to zero)
+    def forward_dof(self, DOF):
+        _epsilon = self.dof_epsilon
+
+        for _new, _old in zip(DOF, self.mf_dof.value):
+            if abs(_new - _old) > _epsilon or (_new == 0.0 and _old != 0.0):
+                self.mf_dof.value = DOF # propagate input via field connection
+                return
+
+
+    ## watch the device buttons for edges (see lib/ButtonEvents.py)
+    def init_button_events(self, BUTTONS = [0, 1]):
+        self.button_queue = ButtonEventQueue(DEVICE_SENSOR = self.device_sensor, BUTTONS = BUTTONS)
+
+
+    ## forward every button edge since the last frame in order (quick taps are not lost at low frame rates)
+    def forward_buttons(self):
+        for _time, _button, _pressed in self.button_queue.poll():
+            _buttons = list(self.mf_buttons.value)
+            _buttons[_button] = _pressed
+            self.mf_buttons.value = _buttons # propagate input via field connection
+
+
     def filter_channel(self, VALUE, OFFSET, MIN, MAX, NEG_THRESHOLD, POS_THRESHOLD):
         VALUE = VALUE - OFFSET
         MIN = MIN - OFFSET
@@ -51,7 +115,7 @@ class MultiDofInput(avango.script.Script):
 
 class SpacemouseInput(MultiDofInput):
  
-    def my_constructor(self, DEVICE_STATION):
+    def my_constructor(self, DEVICE_STATION, CALIBRATION_FILE = "data/calibration/spacemouse.txt"):
 
         ### resources ###
 
@@ -59,6 +123,9 @@ class SpacemouseInput(MultiDofInput):
         self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
         self.device_sensor.Station.value = DEVICE_STATION
 
+        self.init_calibration(CALIBRATION_FILE)
+        self.init_button_events()
+
         ## init callback triggers
         self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
 
@@ -67,58 +134,16 @@ class SpacemouseInput(MultiDofInput):
   
     def frame_callback(self): # evaluated every frame   
         # button input
-        _button1 = self.device_sensor.Button0.value
-        _button2 = self.device_sensor.Button1.value
-        
-        #print(_button1, _button2)
-        
-        _flag = False
-        _buttons = self.mf_buttons.value
-        
-        if _button1 != _buttons[0]: # trigger changes
-            _flag = True
-
-        if _button2 != _buttons[1]: # trigger changes
-            _flag = True
-         
-        if _flag == True: # forward input once per frame (unless there is no input at all)
-            self.mf_buttons.value = [_button1,_button2,False]
+        self.forward_buttons()
           
-        _x = self.device_sensor.Value0.value
-        _y = self.device_sensor.Value1.value * -1.0
-        _z = self.device_sensor.Value2.value
-        _rx = self.device_sensor.Value3.value
-        _ry = self.device_sensor.Value4.value * -1.0
-        _rz = self.device_sensor.Value5.value
-
-        #print(_x, _y, _z, _rx, _ry, _rz)
-        
-        if _x != 0.0:
-            _x = self.filter_channel(_x, 0.0, -0.76, 0.82, 3, 3)
-        
-        if _y != 0.0:
-            _y = self.filter_channel(_y, 0.0, -0.7, 0.6, 3, 3)
-          
-        if _z != 0.0:
-            _z = self.filter_channel(_z, 0.0, -0.95, 0.8, 3, 3)
-            
-        if _rx != 0.0:
-            _rx = self.filter_channel(_rx, 0.0, -0.82, 0.8, 12, 12)
-         
-        if _ry != 0.0:
-            _ry = self.filter_channel(_ry, 0.0, -0.5, 0.6, 12, 12)
-        
-        if _rz != 0.0:
-            _rz = self.filter_channel(_rz, 0.0, -0.86, 0.77, 12, 12)
-         
-        self.mf_dof.value = [_x,_y,_z,_rx,_ry,_rz,0.0] # propagate input via field connection
+        self.forward_dof(self.sample_dof()) # idle devices do not trigger downstream evaluation
 
 
 
 
 class NewSpacemouseInput(MultiDofInput):
  
-    def my_constructor(self, DEVICE_STATION):
+    def my_constructor(self, DEVICE_STATION, CALIBRATION_FILE = "data/calibration/blue_spacemouse.txt"):
 
         ### resources ###
 
@@ -126,6 +151,9 @@ class NewSpacemouseInput(MultiDofInput):
         self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
         self.device_sensor.Station.value = DEVICE_STATION
 
+        self.init_calibration(CALIBRATION_FILE)
+        self.init_button_events()
+
         ## init callback triggers
         self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
 
@@ -134,55 +162,20 @@ class NewSpacemouseInput(MultiDofInput):
   
     def frame_callback(self): # evaluated every frame   
         # button input
-        _button1 = self.device_sensor.Button0.value
-        _button2 = self.device_sensor.Button1.value
-        
-        #print(_button1, _button2)
-        
-        _flag = False
-        _buttons = self.mf_buttons.value
-        
-        if _button1 != _buttons[0]: # trigger changes
-            _flag = True
-
-        if _button2 != _buttons[1]: # trigger changes
-            _flag = True
-         
-        if _flag == True: # forward input once per frame (unless there is no input at all)
-            self.mf_buttons.value = [_button1,_button2,False]
+        self.forward_buttons()
           
-        _x = self.device_sensor.Value0.value
-        _y = self.device_sensor.Value1.value * -1.0
-        _z = self.device_sensor.Value2.value
-        _rx = self.device_sensor.Value3.value
-        _ry = self.device_sensor.Value4.value * -1.0
-        _rz = self.device_sensor.Value5.value
-
-        #print(_x, _y, _z, _rx, _ry, _rz)
-        
-        if _x != 0.0:
-            _x = self.filter_channel(_x, 0.0, -350.0, 350.0, 3, 3)
-        
-        if _y != 0.0:
-            _y = self.filter_channel(_y, 0.0, -350.0, 350.0, 3, 3)
-          
-        if _z != 0.0:
-            _z = self.filter_channel(_z, 0.0, -350.0, 350.0, 3, 3)
-            
-        if _rx != 0.0:
-            _rx = self.filter_channel(_rx, 0.0, -350.0, 350.0, 8, 8)
-         
-        if _ry != 0.0:
-            _ry = self.filter_channel(_ry, 0.0, -350.0, 350.0, 8, 8)
-        
-        if _rz != 0.0:
-            _rz = self.filter_channel(_rz, 0.0, -350.0, 350.0, 8, 8)
-         
-        self.mf_dof.value = [_x,_y,_z,_rx,_ry,_rz,0.0] # propagate input via field connection
+        self.forward_dof(self.sample_dof()) # idle devices do not trigger downstream evaluation
 
 
 
 class KeyboardInput(MultiDofInput):
+
+    ## input fields
+    sf_fps_button = avango.SFBool()
+
+    ## output fields
+    sf_max_fps = avango.SFFloat()
+    sf_max_fps.value = 60.0 # initial value
    
     def my_constructor(self, DEVICE_STATION):
 
@@ -192,13 +185,31 @@ class KeyboardInput(MultiDofInput):
         self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
         self.device_sensor.Station.value = DEVICE_STATION
 
+        self.init_button_events([15]) # left ctrl key
+
         ## init callback triggers
         self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
 
         
     ### callback functions ###
+
+    ## frame-rate stress test: hand motion of all transfer functions has to stay the same at 20Hz
+    @field_has_changed(sf_fps_button)
+    def sf_fps_button_changed(self):
+        if self.sf_fps_button.value == True: # key pressed
+
+            if self.sf_max_fps.value == 60.0:
+                self.sf_max_fps.value = 20.0 # set slow application/render framerate
+                print("stress test (slow):", self.sf_max_fps.value)
+            else:
+                self.sf_max_fps.value = 60.0 # set fast application/render framerate
+                print("stress test (fast):", self.sf_max_fps.value)
+
     
     def frame_callback(self): # evaluated every frame  
+        for _time, _button, _pressed in self.button_queue.poll(): # every ctrl key edge, also between frames
+            self.sf_fps_button.value = _pressed
+
         _x = 0.0
         _y = 0.0
         _z = 0.0
@@ -267,6 +278,8 @@ class MouseInput(MultiDofInput):
         self.device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
         self.device_sensor.Station.value = DEVICE_STATION
 
+        self.init_button_events()
+
         ### init callback triggers
         self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
     
@@ -275,22 +288,7 @@ class MouseInput(MultiDofInput):
     
     def frame_callback(self): # evaluated every frame
         # button input
-        _button1 = self.device_sensor.Button0.value
-        _button2 = self.device_sensor.Button1.value
-
-        #print _button1, _button2
-
-        _flag = False
-        _buttons = self.mf_buttons.value
-
-        if _button1 != _buttons[0]: # trigger changes
-            _flag = True
-
-        if _button2 != _buttons[1]: # trigger changes
-            _flag = True
-         
-        if _flag == True: # forward input once per frame (unless there is no input at all)
-            self.mf_buttons.value = [_button1,_button2,False]
+        self.forward_buttons()
           
         _x = self.device_sensor.Value0.value
         _y = self.device_sensor.Value1.value * -1.0
@@ -0,0 +1,151 @@
+#!/usr/bin/python
+
+### import python libraries
+import bisect
+
+
+## Nonlinear gain curve sampled into a dense lookup table (linear interpolation
+# between samples). The curve is either given as python function or as control
+# points (piecewise linear or spline), e.g. loaded from a text file with one
+# "input output" pair per line. Inputs beyond MAX_INPUT are evaluated directly
+# resp. clamped to the last control point.
+class GainCurve:
+
+    ## constructor
+    def __init__(self,
+        FUNCTION = None, # python function of the input value
+        POINTS = [], # (input, output) control points (alternative to FUNCTION)
+        INTERPOLATION = "linear", # "linear" or "spline" (cubic Hermite) between control points
+        MIN_INPUT = 0.0,
+        MAX_INPUT = 1.0,
+        SAMPLES = 1024,
+        ):
+
+        ### parameters ###
+        self.function = FUNCTION
+        self.points = sorted(POINTS)
+        self.interpolation = INTERPOLATION
+        self.min_input = MIN_INPUT
+        self.max_input = MAX_INPUT
+        self.samples = SAMPLES
+
+
+        ### variables ###
+        self.point_inputs = [_x for _x, _y in self.points]
+        self.table = []
+        self.inv_step = 0.0
+        self.lookup = None
+
+        self.sample()
+
+
+    ### functions ###
+    @staticmethod
+    def load(FILENAME, INTERPOLATION = "linear", SAMPLES = 1024):
+        _points = []
+
+        with open(FILENAME) as _file:
+            for _line in _file:
+                _line = _line.split("#")[0].strip()
+
+                if len(_line) == 0:
+                    continue
+
+                _x, _y = _line.split()[:2]
+                _points.append((float(_x), float(_y)))
+
+        if len(_points) < 2:
+            raise ValueError("gain curve " + FILENAME + " requires at least two control points")
+
+        return GainCurve(POINTS = _points, INTERPOLATION = INTERPOLATION, MIN_INPUT = min(_points)[0], MAX_INPUT = max(_points)[0], SAMPLES = SAMPLES)
+
+
+    ## curve configuration entry: python function or curve file (see load)
+    @staticmethod
+    def resolve(CURVE, INTERPOLATION = "spline"):
+        if isinstance(CURVE, str):
+            return GainCurve.load(CURVE, INTERPOLATION = INTERPOLATION)
+
+        return CURVE
+
+
+    ## exact (slow) evaluation of the curve
+    def evaluate(self, X):
+        if self.function is not None:
+            return self.function(X)
+
+        _points = self.points
+
+        if X <= _points[0][0]:
+            return _points[0][1]
+
+        if X >= _points[-1][0]:
+            return _points[-1][1]
+
+        _i = bisect.bisect_right(self.point_inputs, X) - 1
+        _x0, _y0 = _points[_i]
+        _x1, _y1 = _points[_i + 1]
+        _h = _x1 - _x0
+        _t = (X - _x0) / _h
+
+        if self.interpolation == "spline":
+            _m0 = self.get_tangent(_i) * _h
+            _m1 = self.get_tangent(_i + 1) * _h
+            _t2 = _t * _t
+            _t3 = _t2 * _t
+
+            return (2.0 * _t3 - 3.0 * _t2 + 1.0) * _y0 + (_t3 - 2.0 * _t2 + _t) * _m0 + (-2.0 * _t3 + 3.0 * _t2) * _y1 + (_t3 - _t2) * _m1
+
+        return _y0 + (_y1 - _y0) * _t
+
+
+    ## finite-difference tangent at control point INDEX (spline interpolation)
+    def get_tangent(self, INDEX):
+        _points = self.points
+        _prev = _points[max(0, INDEX - 1)]
+        _next = _points[min(len(_points) - 1, INDEX + 1)]
+
+        return (_next[1] - _prev[1]) / (_next[0] - _prev[0])
+
+
+    def sample(self):
+        _step = (self.max_input - self.min_input) / (self.samples - 1)
+
+        self.table = [self.evaluate(self.min_input + _i * _step) for _i in range(self.samples)]
+        self.table.append(self.table[-1]) # guard entry for interpolation at MAX_INPUT
+        self.inv_step = 1.0 / _step
+
+        self.lookup = self.compile()
+
+
+    ## table lookup with linear interpolation (all parameters bound as locals)
+    def compile(self):
+        _table = self.table
+        _first = _table[0]
+        _last = _table[-1]
+        _inv_step = self.inv_step
+        _min_input = self.min_input
+        _max_input = self.max_input
+        _function = self.function
+
+        def lookup(X):
+            if X > _max_input:
+                if _function is not None:
+                    return _function(X)
+                return _last
+
+            _f = (X - _min_input) * _inv_step
+
+            if _f <= 0.0:
+                return _first
+
+            _i = int(_f)
+            _y0 = _table[_i]
+
+            return _y0 + (_table[_i + 1] - _y0) * (_f - _i)
+
+        return lookup
+
+
+    def __call__(self, X):
+        return self.lookup(X)
@@ -0,0 +1,83 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+
+
+## Drags a group of nodes with one matrix update per frame. At drag start the
+# nodes are re-parented under a temporary drag node (keeping their world
+# transformations); at drag end they are moved back to their original parents
+# at their original child index.
+class GroupDragging:
+
+    ## constructor
+    def __init__(self,
+        PARENT_NODE = None, # static node the drag node is attached to
+        ):
+
+        ### external references ###
+        self.PARENT_NODE = PARENT_NODE
+
+
+        ### variables ###
+        self.dragged_nodes = [] # (node, original parent, original child index) tuples
+        self.parent_inverse_mat = avango.gua.make_identity_mat()
+
+
+        ### resources ###
+        self.drag_node = avango.gua.nodes.TransformNode(Name = "group_drag_node")
+
+
+    ### functions ###
+    def is_dragging(self):
+        return len(self.dragged_nodes) > 0
+
+
+    def start(self, NODES, DRAG_MAT):
+        if len(NODES) == 0:
+            return
+
+        self.parent_inverse_mat = avango.gua.make_inverse_mat(self.PARENT_NODE.WorldTransform.value)
+        self.drag_node.Transform.value = self.parent_inverse_mat * DRAG_MAT
+        self.PARENT_NODE.Children.value.append(self.drag_node)
+
+        _inverse_drag_mat = avango.gua.make_inverse_mat(DRAG_MAT)
+
+        _child_indices = [_node.Parent.value.Children.value.index(_node) for _node in NODES] # before any node is removed
+
+        for _node, _index in zip(NODES, _child_indices):
+            _parent = _node.Parent.value
+            _world_mat = _node.WorldTransform.value
+
+            _parent.Children.value.remove(_node)
+            _node.Transform.value = _inverse_drag_mat * _world_mat # object transformation in drag coordinate system
+            self.drag_node.Children.value.append(_node)
+
+            self.dragged_nodes.append((_node, _parent, _index))
+
+
+    def update(self, DRAG_MAT):
+        if len(self.dragged_nodes) > 0:
+            self.drag_node.Transform.value = self.parent_inverse_mat * DRAG_MAT
+
+
+    def stop(self):
+        if len(self.dragged_nodes) == 0:
+            return
+
+        _parent_inverse_mats = {} # original parent -> inverse world matrix
+
+        ## re-insert in ascending index order to restore the original sibling order
+        for _node, _parent, _index in sorted(self.dragged_nodes, key = lambda _entry: _entry[2]):
+            if _parent not in _parent_inverse_mats:
+                _parent_inverse_mats[_parent] = avango.gua.make_inverse_mat(_parent.WorldTransform.value)
+
+            _world_mat = _node.WorldTransform.value
+
+            self.drag_node.Children.value.remove(_node)
+            _node.Transform.value = _parent_inverse_mats[_parent] * _world_mat # object transformation in original parent coordinate system
+            _parent.Children.value.insert(_index, _node)
+
+        self.PARENT_NODE.Children.value.remove(self.drag_node)
+        self.dragged_nodes = []
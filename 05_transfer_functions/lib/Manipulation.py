@@ -8,7 +8,16 @@ from avango.script import field_has_changed
 import avango.daemon
 
 ### import application libraries
+from lib.SpatialIndex import SpatialIndex
+from lib.GroupDragging import GroupDragging
+from lib.TransferFunction import TransferFunction
 from lib.Device import MouseInput, SpacemouseInput, NewSpacemouseInput
+from lib.ButtonEvents import ButtonEventQueue
+
+try:
+    from lib.TargetArray import TargetArray # requires numpy
+except ImportError:
+    TargetArray = None
 
 ### import python libraries
 # ...
@@ -21,19 +30,50 @@ import math
 #SPACEMOUSE_TYPE = "Spacemouse"
 SPACEMOUSE_TYPE = "Blue Spacemouse" # blue LED
 
+CANDIDATE_SEARCH = "Spatial Index" # radius queries on a uniform grid
+#CANDIDATE_SEARCH = "NumPy" # vectorized distances over all targets (requires numpy)
+
+## interaction states of target nodes
+IDLE_STATE = 0
+HIGHLIGHT_STATE = 1
+DRAGGING_STATE = 2
+
+## gain curves of the non-isomorphic techniques (closed form; a curve file name is loaded as GainCurve, e.g. "data/curves/niipc_gain.txt")
+NIIPC_GAIN_FACTOR = 2.0 / math.sin(90) # xy-magnitude to 2 * mag^3 (scaled by 1/sin(90 rad) as tuned)
+NIIPC_GAIN_CURVE = lambda _mag: NIIPC_GAIN_FACTOR * _mag * _mag
+NIERC_GAIN_CURVE = lambda _mag: math.pow(0.1 * _mag, 6) # (gained magnitude^3)^2 per axis pair
+
+## transfer functions of the manipulation techniques (see TransferFunction for the stages)
+TRANSFER_FUNCTIONS = {
+    "IPC" : dict(TYPE = "isotonic-position-control", ISOTONIC = True, ORDER = 0, GAIN = 0.1),
+    "EPC" : dict(TYPE = "elastic-position-control", CHANNELS = 6, ORDER = 0, GAIN = [0.2, 0.2, 0.2, 45.0, 45.0, 45.0]),
+    "IRC" : dict(TYPE = "isotonic-rate-control", ISOTONIC = True, ORDER = 1, GAIN = 0.1, OUTPUT_SCALE = 0.01),
+    "ERC" : dict(TYPE = "elastic-rate-control", CHANNELS = 6, ORDER = 1, GAIN = 0.1),
+    "IAC" : dict(TYPE = "isotonic-acceleration-control", ISOTONIC = True, ORDER = 2, GAIN = 0.1, OUTPUT_SCALE = 0.01),
+    "EAC" : dict(TYPE = "elastic-acceleration-control", CHANNELS = 6, ORDER = 2, GAIN = 0.1, OUTPUT_SCALE = 0.01),
+    "NIIPC" : dict(TYPE = "non-isometric-isotonic-position-control", ISOTONIC = True, ORDER = 0, GAIN = 0.1,
+        GAIN_CURVES = [((0,1), NIIPC_GAIN_CURVE)]),
+        #GAIN_CURVES = [((0,1), "data/curves/niipc_gain.txt")]),
+    "NIERC" : dict(TYPE = "non-isomorphic-elastic-rate-control", ORDER = 1, GAIN = 0.1,
+        GAIN_CURVES = [((0,1), NIERC_GAIN_CURVE), ((0,2), NIERC_GAIN_CURVE), ((2,1), NIERC_GAIN_CURVE)]),
+    }
+
+## manipulation techniques 1-8 as (keyboard button, transfer function, input device); constructed on first activation
+MANIPULATION_TECHNIQUES = [
+    (16, "IPC", "mouse"), # key 1: isotonic position control
+    (17, "EPC", "spacemouse"), # key 2: elastic position control
+    (18, "IRC", "mouse"), # key 3: isotonic rate control
+    (19, "ERC", "spacemouse"), # key 4: elastic rate control
+    (20, "IAC", "mouse"), # key 5: isotonic acceleration control
+    (21, "EAC", "spacemouse"), # key 6: elastic acceleration control
+    (22, "NIIPC", "mouse"), # key 7: non-isometric isotonic position control
+    (23, "NIERC", "spacemouse"), # key 8: non-isomorphic elastic rate control
+    ]
    
+
 class ManipulationManager(avango.script.Script):
 
     ### input fields
-    sf_key_1 = avango.SFBool()
-    sf_key_2 = avango.SFBool()
-    sf_key_3 = avango.SFBool()
-    sf_key_4 = avango.SFBool()
-    sf_key_5 = avango.SFBool()
-    sf_key_6 = avango.SFBool()
-    sf_key_7 = avango.SFBool()
-    sf_key_8 = avango.SFBool()          
-
     sf_hand_mat = avango.gua.SFMatrix4()
     sf_dragging_trigger = avango.SFBool()
 
@@ -57,8 +97,45 @@ class ManipulationManager(avango.script.Script):
 
         ### variables ###
         self.dragged_objects_list = []
+        self.near_objects_list = [] # nodes within the highlight release distance of the hand
         self.lf_hand_mat = avango.gua.make_identity_mat() # last frame hand matrix
 
+        ## init frame clock (rate and acceleration control integrate frame time)
+        self.time_sensor = avango.nodes.TimeSensor()
+        self.lf_time = self.get_frame_time() # frame time of last frame
+
+        self.manipulation_technique = None
+        self.active_manipulation = None
+
+        ## init spatial index over target positions (radius queries for dragging candidates)
+        self.spatial_index = SpatialIndex(CELL_SIZE = 0.03)
+
+        for _node in self.TARGET_LIST:
+            self.spatial_index.insert(_node, _node.Transform.value.get_translate())
+
+        ## init group dragging (dragged objects follow one shared drag transformation)
+        self.groupDragging = GroupDragging(PARENT_NODE = self.SCENE_ROOT)
+
+        ## init target arrays (alternative vectorized candidate search)
+        if CANDIDATE_SEARCH == "NumPy" and TargetArray is not None:
+            self.target_array = TargetArray(NODES = self.TARGET_LIST)
+        else:
+            self.target_array = None
+
+        ## init interaction state table (indexed by target id); colors are only derived on state transitions
+        self.target_ids = dict([(_node, _i) for _i, _node in enumerate(self.TARGET_LIST)]) # node -> target id
+
+        if self.target_array is not None:
+            self.target_states = self.target_array.create_state_table(IDLE_STATE)
+        else:
+            self.target_states = [IDLE_STATE] * len(self.TARGET_LIST)
+
+        self.state_colors = [
+            avango.gua.Vec4(1.0, 1.0, 1.0, 1.0), # default material
+            avango.gua.Vec4(0.0, 1.0, 0.0, 1.0), # highlight material
+            avango.gua.Vec4(1.0, 0.0, 0.0, 1.0), # dragging material
+            ]
+
         
         ## init hand geometry
         _loader = avango.gua.nodes.TriMeshLoader() # init trimesh loader to load external meshes
@@ -93,44 +170,19 @@ class ManipulationManager(avango.script.Script):
             self.spacemouseInput.my_constructor("gua-device-spacemouse")
         
 
-        ## init manipulation techniques
-        self.IPCManipulation = IsotonicPositionControlManipulation()
-        self.IPCManipulation.my_constructor(self.mouseInput.mf_dof, self.mouseInput.mf_buttons)
-
-        self.EPCManipulation = ElasticPositionControlManipulation()
-        self.EPCManipulation.my_constructor(self.spacemouseInput.mf_dof, self.spacemouseInput.mf_buttons)
-
-        self.IRCManipulation = IsotonicRateControlManipulation()
-        self.IRCManipulation.my_constructor(self.mouseInput.mf_dof, self.mouseInput.mf_buttons)
-
-        self.ERCManipulation = ElasticRateControlManipulation()
-        self.ERCManipulation.my_constructor(self.spacemouseInput.mf_dof, self.spacemouseInput.mf_buttons)
+        self.inputs = {"mouse": self.mouseInput, "spacemouse": self.spacemouseInput}
 
-        self.IACManipulation = IsotonicAccelerationControlManipulation()
-        self.IACManipulation.my_constructor(self.mouseInput.mf_dof, self.mouseInput.mf_buttons)
 
-        self.EACManipulation = ElasticAccelerationControlManipulation()
-        self.EACManipulation.my_constructor(self.spacemouseInput.mf_dof, self.spacemouseInput.mf_buttons)
-        
-        self.NIIPCManipulation = NonIsomorphicIsotonicPositionControlManipulation()
-        self.NIIPCManipulation.my_constructor(self.mouseInput.mf_dof, self.mouseInput.mf_buttons)
-
-        self.NIERCManipulation = NonIsomorphicElasticRateControlManipulation()
-        self.NIERCManipulation.my_constructor(self.spacemouseInput.mf_dof, self.spacemouseInput.mf_buttons)
+        ## init manipulation techniques (constructed on first activation)
+        self.manipulations = {} # technique number -> manipulation
 
 
         ## init keyboard sensor for system control
         self.keyboard_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
         self.keyboard_sensor.Station.value = "gua-device-keyboard0"
 
-        self.sf_key_1.connect_from(self.keyboard_sensor.Button16) # key 1
-        self.sf_key_2.connect_from(self.keyboard_sensor.Button17) # key 2
-        self.sf_key_3.connect_from(self.keyboard_sensor.Button18) # key 3
-        self.sf_key_4.connect_from(self.keyboard_sensor.Button19) # key 4
-        self.sf_key_5.connect_from(self.keyboard_sensor.Button20) # key 5
-        self.sf_key_6.connect_from(self.keyboard_sensor.Button21) # key 6
-        self.sf_key_7.connect_from(self.keyboard_sensor.Button22) # key 7
-        self.sf_key_8.connect_from(self.keyboard_sensor.Button23) # key 8
+        self.technique_keys = dict([(_entry[0], _i + 1) for _i, _entry in enumerate(MANIPULATION_TECHNIQUES)]) # keyboard button -> technique number
+        self.key_queue = ButtonEventQueue(DEVICE_SENSOR = self.keyboard_sensor, BUTTONS = sorted(self.technique_keys.keys()), CALLBACK = self.key_event)
 
 
         ### set initial states ###
@@ -138,190 +190,134 @@ class ManipulationManager(avango.script.Script):
 
 
     ### functions ###
-    def set_manipulation_technique(self, INT):
-        self.manipulation_technique = INT
+    def create_manipulation(self, INPUT, NAME):
+        _manipulation = TransferFunctionManipulation()
+        _manipulation.my_constructor(INPUT.mf_dof, INPUT.mf_buttons, TransferFunction(CLOCK = self.get_frame_time, **TRANSFER_FUNCTIONS[NAME]))
 
-        # disable prior manipulation technique
-        self.IPCManipulation.enable_manipulation(False)
-        self.EPCManipulation.enable_manipulation(False)
-        self.IRCManipulation.enable_manipulation(False)
-        self.ERCManipulation.enable_manipulation(False)
-        self.IACManipulation.enable_manipulation(False)      
-        self.EACManipulation.enable_manipulation(False)
-        self.NIIPCManipulation.enable_manipulation(False)
-        self.NIERCManipulation.enable_manipulation(False)
-        
-        # remove existing field connections    
-        self.sf_hand_mat.disconnect()
-        self.sf_dragging_trigger.disconnect()
-        
-        if self.manipulation_technique == 1: # isotonic position control     
-            self.IPCManipulation.enable_manipulation(True)
+        return _manipulation
 
-            # init field connections      
-            self.sf_hand_mat.connect_from(self.IPCManipulation.sf_mat)
-            self.sf_dragging_trigger.connect_from(self.IPCManipulation.sf_action_trigger)
-        
-        elif self.manipulation_technique == 2: # elastic position control        
-            self.EPCManipulation.enable_manipulation(True)
 
-            # init field connections
-            self.sf_hand_mat.connect_from(self.EPCManipulation.sf_mat)
-            self.sf_dragging_trigger.connect_from(self.EPCManipulation.sf_action_trigger)            
-        
-        elif self.manipulation_technique == 3: # isotonic rate control        
-            self.IRCManipulation.enable_manipulation(True)
-        
-            # init field connections
-            self.sf_hand_mat.connect_from(self.IRCManipulation.sf_mat)
-            self.sf_dragging_trigger.connect_from(self.IRCManipulation.sf_action_trigger)
-        
-        elif self.manipulation_technique == 4: # elastic rate control
-            self.ERCManipulation.enable_manipulation(True)
+    ## time of the current frame (in sec)
+    def get_frame_time(self):
+        return self.time_sensor.Time.value
 
-            # init field connections      
-            self.sf_hand_mat.connect_from(self.ERCManipulation.sf_mat)
-            self.sf_dragging_trigger.connect_from(self.ERCManipulation.sf_action_trigger)
-        
-        elif self.manipulation_technique == 5: # isotonic acceleration control
-            self.IACManipulation.enable_manipulation(True)
 
-            # init field connections      
-            self.sf_hand_mat.connect_from(self.IACManipulation.sf_mat)
-            self.sf_dragging_trigger.connect_from(self.IACManipulation.sf_action_trigger)
+    ## manipulation technique INT (1-8) of MANIPULATION_TECHNIQUES (constructed on first use)
+    def get_manipulation(self, INT):
+        if INT not in self.manipulations:
+            _button, _name, _input = MANIPULATION_TECHNIQUES[INT - 1]
+            self.manipulations[INT] = self.create_manipulation(self.inputs[_input], _name)
 
-        elif self.manipulation_technique == 6: # elastic acceleration control        
-            self.EACManipulation.enable_manipulation(True)
+        return self.manipulations[INT]
 
-            # init field connections      
-            self.sf_hand_mat.connect_from(self.EACManipulation.sf_mat)
-            self.sf_dragging_trigger.connect_from(self.EACManipulation.sf_action_trigger)
 
-        elif self.manipulation_technique == 7:
-            self.NIIPCManipulation.enable_manipulation(True)
+    def set_manipulation_technique(self, INT):
+        self.manipulation_technique = INT
 
-            # init field connections      
-            self.sf_hand_mat.connect_from(self.NIIPCManipulation.sf_mat)
-            self.sf_dragging_trigger.connect_from(self.NIIPCManipulation.sf_action_trigger)
+        # disable prior manipulation technique and remove its field connections
+        if self.active_manipulation is not None:
+            self.active_manipulation.enable_manipulation(False)
 
-        elif self.manipulation_technique == 8:
-            self.NIERCManipulation.enable_manipulation(True)
+            self.sf_hand_mat.disconnect()
+            self.sf_dragging_trigger.disconnect()
 
-            # init field connections      
-            self.sf_hand_mat.connect_from(self.NIERCManipulation.sf_mat)
-            self.sf_dragging_trigger.connect_from(self.NIERCManipulation.sf_action_trigger)
+        self.active_manipulation = self.get_manipulation(INT)
+        self.active_manipulation.enable_manipulation(True)
+
+        # init field connections
+        self.sf_hand_mat.connect_from(self.active_manipulation.sf_mat)
+        self.sf_dragging_trigger.connect_from(self.active_manipulation.sf_action_trigger)
 
 
     def start_dragging(self):  
         _hand_mat = self.hand_transform.WorldTransform.value
 
         for _node in self.TARGET_LIST:
-            if self.is_highlight_material(_node.CurrentColor.value) == True: # a monkey node in close proximity
-                _node.CurrentColor.value = avango.gua.Vec4(1.0, 0.0, 0.0, 1.0)
-                _node.Material.value.set_uniform("Color", _node.CurrentColor.value) # switch to dragging material
+            if self.target_states[self.target_ids[_node]] == HIGHLIGHT_STATE: # a monkey node in close proximity
+                self.set_target_state(_node, DRAGGING_STATE) # switch to dragging material
 
                 self.dragged_objects_list.append(_node) # add node for dragging
-          
-                ## dragging without snapping
 
-                # clac tool-hand offset
-                _dragging_offset_mat = avango.gua.make_inverse_mat(_hand_mat) * _node.Transform.value # object transformation in hand coordinate system
-                _node.DraggingOffsetMatrix.value = _dragging_offset_mat # here you can store node dependent dragging transformations 
+        ## dragging without snapping (tool-hand offsets are stored as object transformations below the drag node)
+        self.groupDragging.start(self.dragged_objects_list, _hand_mat)
 
       
     def update_dragging_candidates(self):
+        if self.target_array is not None:
+            self.update_dragging_candidates_vectorized()
+            return
+
         _hand_pos = self.hand_transform.WorldTransform.value.get_translate()
-    
-        for _node in self.TARGET_LIST:
-            _pos = _node.Transform.value.get_translate() # a monkey position
 
-            _dist = (_hand_pos - _pos).length() # hand-object distance
-            _color = _node.CurrentColor.value
+        _near_list = self.spatial_index.query_radius(_hand_pos, 0.03) # (node, hand-object distance) tuples within release distance
 
+        for _node, _dist in _near_list:
             ## toggle object highlight
-            if _dist < 0.025 and self.is_default_material(_color) == True:
-                _node.CurrentColor.value = avango.gua.Vec4(0.0, 1.0, 0.0, 1.0)
-                _node.Material.value.set_uniform("Color", _node.CurrentColor.value) # switch to highlight material
+            if _dist < 0.025 and self.target_states[self.target_ids[_node]] == IDLE_STATE:
+                self.set_target_state(_node, HIGHLIGHT_STATE) # switch to highlight material
 
-            elif _dist > 0.03 and self.is_highlight_material(_color) == True:
-                _node.CurrentColor.value = avango.gua.Vec4(1.0, 1.0, 1.0, 1.0)
-                _node.Material.value.set_uniform("Color", _node.CurrentColor.value) # switch to default material
-    
+        _near_nodes = set([_node for _node, _dist in _near_list])
 
-    def object_dragging(self):
-        # apply hand movement to (all) dragged objects
-        for _node in self.dragged_objects_list:
-            _node.Transform.value = self.hand_transform.WorldTransform.value * _node.DraggingOffsetMatrix.value # apply tool-hand offset to absolute hand transformation            
+        for _node in self.near_objects_list: # nodes that left the release distance since the last frame
+            if _node not in _near_nodes and self.target_states[self.target_ids[_node]] == HIGHLIGHT_STATE:
+                self.set_target_state(_node, IDLE_STATE) # switch to default material
 
-  
-    def stop_dragging(self):  
-        ## handle all dragged objects
-        for _node in self.dragged_objects_list:      
-            _node.CurrentColor.value = avango.gua.Vec4(0.0, 1.0, 0.0, 1.0)
-            _node.Material.value.set_uniform("Color", _node.CurrentColor.value) # switch to highlight material
-    
-        self.dragged_objects_list = [] # clear list
+        self.near_objects_list = list(_near_nodes)
 
 
-    def is_default_material(self, VEC4):
-        return VEC4.x == 1.0 and VEC4.y == 1.0 and VEC4.z == 1.0 and VEC4.w == 1.0
+    def update_dragging_candidates_vectorized(self):
+        _hand_pos = self.hand_transform.WorldTransform.value.get_translate()
 
+        _dist = self.target_array.get_distances(_hand_pos) # all hand-object distances
 
-    def is_highlight_material(self, VEC4):
-        return VEC4.x == 0.0 and VEC4.y == 1.0 and VEC4.z == 0.0 and VEC4.w == 1.0
+        ## toggle object highlight (state changes only)
+        _highlight_mask = self.target_states == HIGHLIGHT_STATE
+        _new_highlight_mask = (_highlight_mask | ((_dist < 0.025) & (self.target_states == IDLE_STATE))) & ~(_dist > 0.03)
+        _on_list, _off_list = self.target_array.get_mask_changes(_highlight_mask, _new_highlight_mask)
 
+        for _node in _on_list:
+            self.set_target_state(_node, HIGHLIGHT_STATE) # switch to highlight material
 
-    def is_dragging_material(self, VEC4):
-        return VEC4.x == 1.0 and VEC4.y == 0.0 and VEC4.z == 0.0 and VEC4.w == 1.0
-      
+        for _node in _off_list:
+            self.set_target_state(_node, IDLE_STATE) # switch to default material
     
-    ### callback functions ###
 
-    @field_has_changed(sf_key_1)
-    def sf_key_1_changed(self):
-        if self.sf_key_1.value == True: # key is pressed
-            self.set_manipulation_technique(1) # switch to isotonic position control
-           
+    def object_dragging(self):
+        # apply hand movement to (all) dragged objects (one matrix update for the whole group)
+        self.groupDragging.update(self.hand_transform.WorldTransform.value)
 
-    @field_has_changed(sf_key_2)
-    def sf_key_2_changed(self):
-        if self.sf_key_2.value == True: # key is pressed
-            self.set_manipulation_technique(2) # switch to elastic position control
+  
+    def stop_dragging(self):  
+        self.groupDragging.stop() # move dropped objects back to their original parents
 
+        ## handle all dragged objects
+        for _node in self.dragged_objects_list:      
+            self.set_target_state(_node, HIGHLIGHT_STATE) # switch to highlight material
 
-    @field_has_changed(sf_key_3)
-    def sf_key_3_changed(self):
-        if self.sf_key_3.value == True: # key is pressed
-            self.set_manipulation_technique(3) # switch to isotonic rate control
+            if _node not in self.near_objects_list: # released nodes are un-highlighted once the hand moves away
+                self.near_objects_list.append(_node)
 
+        for _node in self.dragged_objects_list: # re-insert dropped nodes into spatial index
+            self.spatial_index.update(_node, _node.Transform.value.get_translate())
 
-    @field_has_changed(sf_key_4)
-    def sf_key_4_changed(self):
-        if self.sf_key_4.value == True: # key is pressed
-            self.set_manipulation_technique(4) # switch to elastic rate control
-      
+            if self.target_array is not None:
+                self.target_array.update_position(_node)
+    
+        self.dragged_objects_list = [] # clear list
 
-    @field_has_changed(sf_key_5)
-    def sf_key_5_changed(self):
-        if self.sf_key_5.value == True: # key is pressed
-            self.set_manipulation_technique(5) # switch to isotonic acceleration control
 
+    def set_target_state(self, NODE, STATE):
+        self.target_states[self.target_ids[NODE]] = STATE
 
-    @field_has_changed(sf_key_6)
-    def sf_key_6_changed(self):
-        if self.sf_key_6.value == True: # key is pressed
-            self.set_manipulation_technique(6) # switch to elastic acceleration control
+        NODE.CurrentColor.value = self.state_colors[STATE]
+        NODE.Material.value.set_uniform("Color", NODE.CurrentColor.value)
 
-    @field_has_changed(sf_key_7)
-    def sf_key_7_changed(self):
-        print("field_has_changed")
-        if self.sf_key_7.value == True: # key is pressed
-            self.set_manipulation_technique(7) # switch to elastic acceleration control
+    
+    ### callback functions ###
 
-    @field_has_changed(sf_key_8)
-    def sf_key_8_changed(self):
-        if self.sf_key_8.value == True: # key is pressed
-            self.set_manipulation_technique(8) # switch to elastic acceleration control
+    def key_event(self, BUTTON, PRESSED, TIME):
+        if PRESSED == True: # key is pressed
+            self.set_manipulation_technique(self.technique_keys[BUTTON])
 
 
     @field_has_changed(sf_dragging_trigger)
@@ -335,12 +331,16 @@ class ManipulationManager(avango.script.Script):
     def evaluate(self): # evaluated every frame if any input field has changed (incl. dependency evaluation)
         self.update_dragging_candidates()
 
-        self.object_dragging() # possibly drag object with hand input
+        self.object_dragging() # possibly drag object with hand input (dragged nodes are re-inserted into the spatial index when dropped)
 
 
         ## print covered distance and hand velocity as debug output
+        _time = self.get_frame_time()
+        _frame_time = _time - self.lf_time
+        self.lf_time = _time
+
         _distance = (self.sf_hand_mat.value.get_translate() - self.lf_hand_mat.get_translate()).length()
-        _velocity = _distance * 60.0 # application loop runs with 60Hz
+        _velocity = _distance / max(_frame_time, 0.001) # measured frame time (application loop may drop below 60Hz)
         self.lf_hand_mat = self.sf_hand_mat.value
         
         #print(round(_distance, 3), "m/frame  ", round(_velocity, 2), "m/s")
@@ -404,605 +404,36 @@ class Manipulation(avango.script.Script):
 
     def reset(self):
         raise NotImplementedError("To be implemented by a subclass.")
-    
-    
-    def clamp_matrix(self, MATRIX):    
-        # clamp translation to certain range (within screen space)
-        _x_range = 0.3 # in meter
-        _y_range = 0.15 # in meter
-        _z_range = 0.15 # in meter    
-
-        MATRIX.set_element(0,3, min(_x_range, max(-_x_range, MATRIX.get_element(0,3)))) # clamp x-axis
-        MATRIX.set_element(1,3, min(_y_range, max(-_y_range, MATRIX.get_element(1,3)))) # clamp y-axis
-        MATRIX.set_element(2,3, min(_z_range, max(-_z_range, MATRIX.get_element(2,3)))) # clamp z-axis
-         
-        return MATRIX
-
-
-
-### ISOTONIC DEVICE MAPPINGS ##
-#1
-class IsotonicPositionControlManipulation(Manipulation):
-
-    def my_constructor(self, MF_DOF, MF_BUTTONS):
-        self.type = "isotonic-position-control"
-    
-        # init field connections
-        self.mf_dof.connect_from(MF_DOF)
-        self.mf_buttons.connect_from(MF_BUTTONS)
-
-
-    ## implement respective base-class function
-    def manipulate(self):
-        _x = self.mf_dof.value[0]
-        _y = self.mf_dof.value[1]
-        _z = self.mf_dof.value[2]
-          
-        _x *= 0.1
-        _y *= 0.1
-        _z *= 0.1
-       
-        # accumulate input
-        _new_mat = avango.gua.make_trans_mat(_x, _y, _z) * self.sf_mat.value
-
-        # possibly clamp matrix (to screen space borders)
-        _new_mat = self.clamp_matrix(_new_mat)
-
-        self.sf_mat.value = _new_mat # apply new matrix to field
-    
-
-    ## implement respective base-class function    
-    def reset(self):
-        self.sf_mat.value = avango.gua.make_identity_mat() # snap hand back to screen center
-
-#2
-class IsotonicRateControlManipulation(Manipulation):
-
-    def my_constructor(self, MF_DOF, MF_BUTTONS):
-        self.type = "isotonic-rate-control"
-
-        self._x_val = 0
-        self._y_val = 0
-        self._z_val = 0
-        self._x_pos = 0
-        self._y_pos = 0
-        self._z_pos = 0
-          
-        # init field connections
-        self.mf_dof.connect_from(MF_DOF)
-        self.mf_buttons.connect_from(MF_BUTTONS)
-
-
-    ## implement respective base-class function
-    def manipulate(self):
-        self._x = self.mf_dof.value[0]
-        self._y = self.mf_dof.value[1]
-        self._z = self.mf_dof.value[2]
-
-        self._x *= 0.1
-        self._y *= 0.1
-        self._z *= 0.1
-
-
-        self._x_val = self._x + self._x_val
-
-        self._y_val = self._y + self._y_val
-
-        self._z_val = self._z + self._z_val
-
-        self._x_pos += self._x_val
-
-        self._y_pos += self._y_val
-
-        self._z_pos += self._z_val
-        
-        velocity_factor = 100
-
-
-
-         #accumulate imput
-        _new_mat = avango.gua.make_trans_mat(self._x_pos/velocity_factor, self._y_pos/velocity_factor, self._z_pos/velocity_factor)
-
-        # possibly clamp matrix (to screen space borders)
-        _new_mat = self.clamp_matrix(_new_mat)
-
-        self.sf_mat.value = _new_mat # apply new matrix to field
-
-
-
-    
-    
-    ## implement respective base-class function
-    def reset(self):
-        self.sf_mat.value = avango.gua.make_identity_mat() # snap hand back to screen center
-
-#5
-class IsotonicAccelerationControlManipulation(Manipulation):
-
-    def my_constructor(self, MF_DOF, MF_BUTTONS):
-        self.type = "isotonic-acceleration-control"
-
-        self._x_val = 0
-        self._y_val = 0
-        self._z_val = 0
-        self._x_pos = 0
-        self._y_pos = 0
-        self._z_pos = 0
-        self._x_acc = 0
-        self._y_acc = 0
-        self._z_acc = 0
-          
-        # init field connections
-        self.mf_dof.connect_from(MF_DOF)
-        self.mf_buttons.connect_from(MF_BUTTONS)
-
-
-    ## implement respective base-class function
-    def manipulate(self):
-        self._x = self.mf_dof.value[0]
-        self._y = self.mf_dof.value[1]
-        self._z = self.mf_dof.value[2]
-
-        self._x *= 0.1
-        self._y *= 0.1
-        self._z *= 0.1
-
-
-        self._x_acc = self._x + self._x_acc
-
-        self._y_acc = self._y + self._y_acc
-
-        self._z_acc = self._z + self._z_acc
-
-        self._x_val += self._x_acc
-
-        self._y_val += self._y_acc
-
-        self._z_val += self._z_acc
-
-        self._x_pos += self._x_val
-
-        self._y_pos += self._y_val
-
-        self._z_pos += self._z_val
-        
-        velocity_factor = 100
-
-
-
-         #accumulate imput
-        _new_mat = avango.gua.make_trans_mat(self._x_pos/velocity_factor, self._y_pos/velocity_factor, self._z_pos/velocity_factor)
-
-        # possibly clamp matrix (to screen space borders)
-        _new_mat = self.clamp_matrix(_new_mat)
-
-        self.sf_mat.value = _new_mat # apply new matrix to field
-
-
-
-    
-    
-    ## implement respective base-class function
-    def reset(self):
-        self.sf_mat.value = avango.gua.make_identity_mat() # snap hand back to screen center
-     
-    
 
-### ELASTIC DEVICE MAPPINGS ###
-#4
-class ElasticPositionControlManipulation(Manipulation):
 
-    def my_constructor(self, MF_DOF, MF_BUTTONS):
-        self.type = "elastic-position-control"
-      
-        # init field connections
-        self.mf_dof.connect_from(MF_DOF)
-        self.mf_buttons.connect_from(MF_BUTTONS)
 
+## Manipulation technique realized by a (declarative) transfer function.
+class TransferFunctionManipulation(Manipulation):
 
-    ## implement respective base-class function
-    def manipulate(self):
-        _x = self.mf_dof.value[0]
-        _y = self.mf_dof.value[1]
-        _z = self.mf_dof.value[2]
-        _rx = self.mf_dof.value[3]
-        _ry = self.mf_dof.value[4]
-        _rz = self.mf_dof.value[5]
-
-        _x *= 0.2
-        _y *= 0.2
-        _z *= 0.2
-        _rx *= 45
-        _ry *= 45
-        _rz *= 45
-
-        #accumulate imput
-        _new_mat = avango.gua.make_trans_mat(_x,_y,_z)*avango.gua.make_rot_mat(_rx,1,0,0)*avango.gua.make_rot_mat(_ry,0,1,0)*avango.gua.make_rot_mat(_rz, 0,0,1)
-
-        # possibly clamp matrix (to screen space borders)
-        _new_mat = self.clamp_matrix(_new_mat)
-
-        self.sf_mat.value = _new_mat # apply new matrix to field
-
-         
-    ## implement respective base-class funct        self._x_val = 0
-        self._y_val = 0
-        self._z_val = 0
-        self._rx_val = 0
-        self._ry_val = 0
-        self._rz_val = 0
-        self._x_pos = 0
-        self._y_pos = 0
-        self._z_pos = 0
-        self._rx_pos = 0
-        self._ry_pos = 0
-        self._rz_pos = 0
-        self._x_acc = 0
-        self._y_acc = 0
-        self._z_acc = 0
-        self._rx_acc = 0
-        self._ry_acc = 0
-        self._rz_acc = 0
-    def reset(self):
-         self.sf_mat.value = avango.gua.make_identity_mat() # snap hand back to screen center
-
-#4
-class ElasticRateControlManipulation(Manipulation):
+    def my_constructor(self, MF_DOF, MF_BUTTONS, TRANSFER_FUNCTION):
+        self.type = TRANSFER_FUNCTION.type
+        self.transfer_function = TRANSFER_FUNCTION
 
-    def my_constructor(self, MF_DOF, MF_BUTTONS):
-        self.type = "elastic-rate-control"
         # init field connections
         self.mf_dof.connect_from(MF_DOF)
         self.mf_buttons.connect_from(MF_BUTTONS)
-        
-       # timer = avango.nodes.TimeSensor()
-        #self.TimeIn.connect_from(timer.time)
-
-        self._x_val = 0
-        self._y_val = 0
-        self._z_val = 0
-        self._rx_val = 0
-        self._ry_val = 0
-        self._rz_val = 0
-
-
-
-    ## implement respective base-class function
-    def manipulate(self):
-        self._x = self.mf_dof.value[0]
-        self._y = self.mf_dof.value[1]
-        self._z = self.mf_dof.value[2]
-        self._rx = self.mf_dof.value[3]
-        self._ry = self.mf_dof.value[4]
-        self._rz = self.mf_dof.value[5]
 
-        self._x *= 0.1
-        self._y *= 0.1
-        self._z *= 0.1
-        self._rx *= 0.1
-        self._ry *= 0.1
-        self._rz *= 0.1
 
-        #timer = avango.nodes.TimeSensor()
-        #self.TimeIn.connect_from(timer.Time)
+    ## extend respective base-class function
+    def enable_manipulation(self, FLAG):
+        Manipulation.enable_manipulation(self, FLAG)
 
-        if(self._x != 0):
-            self._x_val = self._x + self._x_val
-
-        if(self._y != 0):
-            self._y_val = self._y + self._y_val
-
-        if(self._z != 0):
-            self._z_val = self._z + self._z_val
-
-        if(self._rx != 0):
-            self._rx_val = self._rx + self._rx_val
-
-        if(self._ry != 0):
-            self._ry_val = self._ry + self._ry_val
-
-        if(self._rz != 0):
-            self._rz_val = self._rz + self._rz_val
-
-
-
-         #accumulate imput
-        _new_mat = avango.gua.make_trans_mat(self._x_val,self._y_val,self._z_val)*avango.gua.make_rot_mat(self._rx_val,1,0,0)*avango.gua.make_rot_mat(self._ry_val,0,1,0)*avango.gua.make_rot_mat(self._rz_val, 0,0,1)
-
-        # possibly clamp matrix (to screen space borders)
-        _new_mat = self.clamp_matrix(_new_mat)
-
-        self.sf_mat.value = _new_mat # apply new matrix to field
-
-    def reset(self):
-        self.sf_mat.value = avango.gua.make_identity_mat() # snap hand back to screen center
-
-#6
-class ElasticAccelerationControlManipulation(Manipulation):
-
-    TimeIn = avango.SFFloat()
-
-    def my_constructor(self, MF_DOF, MF_BUTTONS):
-        self.type = "elastic-acceleration-control"
-      
-        self._x_val = 0
-        self._y_val = 0
-        self._z_val = 0
-        self._rx_val = 0
-        self._ry_val = 0
-        self._rz_val = 0
-        self._x_pos = 0
-        self._y_pos = 0
-        self._z_pos = 0
-        self._rx_pos = 0
-        self._ry_pos = 0
-        self._rz_pos = 0
-        self._x_acc = 0
-        self._y_acc = 0
-        self._z_acc = 0
-        self._rx_acc = 0
-        self._ry_acc = 0
-        self._rz_acc = 0
-          
-        # init field connections
-        self.mf_dof.connect_from(MF_DOF)
-        self.mf_buttons.connect_from(MF_BUTTONS)
+        ## rate and acceleration control integrate every frame (devices only forward changed input)
+        self.always_evaluate(FLAG == True and self.transfer_function.order > 0)
 
 
     ## implement respective base-class function
     def manipulate(self):
-        self._x = self.mf_dof.value[0]
-        self._y = self.mf_dof.value[1]
-        self._z = self.mf_dof.value[2]
-        self._rx = self.mf_dof.value[3]
-        self._ry = self.mf_dof.value[4]
-        self._rz = self.mf_dof.value[5]
-
-        self._x *= 0.1
-        self._y *= 0.1
-        self._z *= 0.1
-        self._rx *= 0.1
-        self._ry *= 0.1
-        self._rz *= 0.1
-
-
-        self._x_acc = self._x# + self._x_acc
-
-        self._y_acc = self._y# + self._y_acc
-
-        self._z_acc = self._z# + self._z_acc
-
-        self._rx_acc = self._rx# + self._rx_acc
-
-        self._ry_acc = self._ry# + self._ry_acc
-
-        self._rz_acc = self._rz# + self._rz_acc
-
-        self._x_val += self._x_acc
-
-        self._y_val += self._y_acc
-
-        self._z_val += self._z_acc
-
-        self._rx_val += self._rx_acc
-
-        self._ry_val += self._ry_acc
-
-        self._rz_val += self._rz_acc
-
-        self._x_pos += self._x_val
-
-        self._y_pos += self._y_val
-
-        self._z_pos += self._z_val
-
-        self._rx_pos += self._rx_val
-
-        self._ry_pos += self._ry_val
-
-        self._rz_pos += self._rz_val
-        
-        velocity_factor = 100
-
-        '''
-        self._x_acc = self._x + self._x_acc
-
-        self._y_acc = self._y + self._y_acc
-
-        self._z_acc = self._z + self._z_acc
-
-        self._x_val += self._x_acc
-
-        self._y_val += self._y_acc
-
-        self._z_val += self._z_acc
-
-        self._x_pos += self._x_val
-
-        self._y_pos += self._y_val
-
-        self._z_pos += self._z_val
-
-        '''
-
-
-
-         #accumulate imput
-        _new_mat = avango.gua.make_trans_mat(self._x_pos/velocity_factor, self._y_pos/velocity_factor, self._z_pos/velocity_factor)*avango.gua.make_rot_mat(self._rx_pos/velocity_factor,1,0,0)*avango.gua.make_rot_mat(self._ry_pos/velocity_factor,0,1,0)*avango.gua.make_rot_mat(self._rz_pos/velocity_factor, 0,0,1)
-
-        # possibly clamp matrix (to screen space borders)
-        _new_mat = self.clamp_matrix(_new_mat)
-
-        self.sf_mat.value = _new_mat # apply new matrix to field
-
-
-
-    
-    
-    ## implement respective base-class function
-    def reset(self):
-        self.sf_mat.value = avango.gua.make_identity_mat() # snap hand back to screen center
-
-        self._x_val = 0
-        self._y_val = 0
-        self._z_val = 0
-        self._rx_val = 0
-        self._ry_val = 0
-        self._rz_val = 0
-        self._x_pos = 0
-        self._y_pos = 0
-        self._z_pos = 0
-        self._rx_pos = 0
-        self._ry_pos = 0
-        self._rz_pos = 0
-        self._x_acc = 0
-        self._y_acc = 0
-        self._z_acc = 0
-        self._rx_acc = 0
-        self._ry_acc = 0
-        self._rz_acc = 0
-
-
-class NonIsomorphicIsotonicPositionControlManipulation(Manipulation):
-
-    def my_constructor(self, MF_DOF, MF_BUTTONS):
-        self.type = "non-isometric-isotonic-position-control"
-    
-        # init field connections
-        self.mf_dof.connect_from(MF_DOF)
-        self.mf_buttons.connect_from(MF_BUTTONS)
-
-
-    ## implement respective base-class function
-    def manipulate(self):
-        _x = self.mf_dof.value[0]
-        _y = self.mf_dof.value[1]
-        _z = self.mf_dof.value[2]
-
-        _mag = math.hypot(_x,_y)
-
-        if _x != 0 and _y != 0:
-            #Kosinussatz
-            alpha = math.acos((_x * _x - _y * _y - _mag * _mag)/(-2 * _y * _mag))
-            beta = math.acos((_y * _y - _mag * _mag - _x * _x)/(-2 * _mag * _x))
-
-            _mag = 2* math.pow(_mag, 3)
-
-            #print(_mag)
-
-            #Sinussatz
-            if _x > 0:
-                _x = _mag * math.sin(alpha) / math.sin(90)
-            else:
-                _x = (_mag * math.sin(alpha) / math.sin(90))*-1
-
-            if _y > 0:
-                _y = _mag * math.sin(beta) / math.sin(90)
-            else:
-                _y = (_mag * math.sin(beta) / math.sin(90))*-1
-
-        _x *= 0.1
-        _y *= 0.1
-        _z *= 0.1
-
-        #print('_x : ', _x)
-        #print('_y : ', _y)
-       
-        # accumulate input
-        _new_mat = avango.gua.make_trans_mat(_x, _y, _z) * self.sf_mat.value
-
-        # possibly clamp matrix (to screen space borders)
-        _new_mat = self.clamp_matrix(_new_mat)
-
-        self.sf_mat.value = _new_mat # apply new matrix to field
-
-        #print('trans-vec: ', self.sf_mat.value.get_translate())
-    
-
-    ## implement respective base-class function    
-    def reset(self):
-        self.sf_mat.value = avango.gua.make_identity_mat() # snap hand back to screen center
-
-class NonIsomorphicElasticRateControlManipulation(Manipulation):
-
-    def my_constructor(self, MF_DOF, MF_BUTTONS):
-        self.type = "non-isomorphic-elastic-rate-control"
-        # init field connections
-        self.mf_dof.connect_from(MF_DOF)
-        self.mf_buttons.connect_from(MF_BUTTONS)
-        
-       # timer = avango.nodes.TimeSensor()
-        #self.TimeIn.connect_from(timer.time)
-
-        self._x_val = 0
-        self._y_val = 0
-        self._z_val = 0
-
-
+        self.sf_mat.value = self.transfer_function.apply(self.mf_dof.value) # apply new matrix to field
 
 
     ## implement respective base-class function
-    def manipulate(self):
-        _x = self.mf_dof.value[0]
-        _y = self.mf_dof.value[1]
-        _z = self.mf_dof.value[2]
-
-
-
-
-        _x *= 0.1
-        _y *= 0.1
-        _z *= 0.1
-
-
-
-    #für X-Y-Achse
-        if _x != 0 and _y != 0:
-            _mag = math.hypot(_x,_y)
-
-            _mag = math.pow(_mag, 3)
-            _x = _x*math.pow(_mag,2)
-            _y = _y*math.pow(_mag,2)
-
-        
-    
-        #für X-Z-Achse
-        if _x != 0 and _z != 0:
-            _mag = math.hypot(_x,_z)
-
-            _mag = math.pow(_mag, 3)
-            _x = _x*math.pow(_mag,2)
-            _z = _z*math.pow(_mag,2)
-
-
-        #für Y-Z-Achse
-        if _z != 0 and _y != 0:
-            _mag = math.hypot(_z,_y)
-
-            _mag = math.pow(_mag, 3)
-            _z = _z*math.pow(_mag,2)
-            _y = _y*math.pow(_mag,2)
-
-
-        if(_x != 0):
-            self._x_val = _x + self._x_val
-
-        if(_y != 0):
-            self._y_val = _y + self._y_val
-
-        if(_z != 0):
-            self._z_val = _z + self._z_val
-
-
-         #accumulate imput
-        _new_mat = avango.gua.make_trans_mat(self._x_val,self._y_val,self._z_val)
-
-        # possibly clamp matrix (to screen space borders)
-        _new_mat = self.clamp_matrix(_new_mat)
-
-        self.sf_mat.value = _new_mat # apply new matrix to field
-
     def reset(self):
         self.sf_mat.value = avango.gua.make_identity_mat() # snap hand back to screen center
 
-        
+        self.transfer_function.reset()
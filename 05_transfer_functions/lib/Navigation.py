@@ -6,6 +6,10 @@ import avango.gua
 import avango.script
 from avango.script import field_has_changed
 
+### import application libraries
+from lib.Pose import Pose
+from lib.GainCurve import GainCurve
+
 ### import python libraries
 # ...
    
@@ -32,13 +36,27 @@ class SteeringNavigation(avango.script.Script):
         self.translation_factor = 1.0
         self.rotation_factor = 1.0        
 
+        ### variables ###
+        self.nav_pose = Pose() # accumulated navigation transformation (converted to sf_nav_mat once per update)
+
+        ## transfer-functions (closed form; replaced by curve files given to my_constructor)
+        self.translation_curve = lambda _input: _input * _input if _input < 1.0 else 1.0
+        self.rotation_curve = lambda _input: _input * _input
 
-    def my_constructor(self, MF_DOF, MF_BUTTONS, TRANSLATION_FACTOR = 1.0, ROTATION_FACTOR = 1.0):
+
+    def my_constructor(self, MF_DOF, MF_BUTTONS, TRANSLATION_FACTOR = 1.0, ROTATION_FACTOR = 1.0, TRANSLATION_CURVE = None, ROTATION_CURVE = None):
         self.mf_dof.connect_from(MF_DOF)
         
         self.translation_factor = TRANSLATION_FACTOR
         self.rotation_factor = ROTATION_FACTOR
 
+        ## curve function or file, e.g. "data/curves/steering_translation.txt" (see GainCurve.load)
+        if TRANSLATION_CURVE is not None:
+            self.translation_curve = GainCurve.resolve(TRANSLATION_CURVE)
+
+        if ROTATION_CURVE is not None:
+            self.rotation_curve = GainCurve.resolve(ROTATION_CURVE)
+
     
     ### callback functions ###
     @field_has_changed(mf_dof)
@@ -55,7 +73,7 @@ class SteeringNavigation(avango.script.Script):
          
         if _trans_input > 0.0:
             ## transfer-function for translation
-            _factor = pow(min(_trans_input,1.0), 2)
+            _factor = self.translation_curve(_trans_input)
 
             _trans_vec.normalize()
             _trans_vec *= _factor
@@ -71,27 +89,32 @@ class SteeringNavigation(avango.script.Script):
 
         if _rot_input > 0.0:
             ## transfer-function for rotation
-            _factor = pow(_rot_input, 2)
+            _factor = self.rotation_curve(_rot_input)
 
             _rot_vec.normalize()
             _rot_vec *= _factor
 
              
         if _trans_input or _rot_input > 0.0:
+            ## input transformation: translation and rotation around the rotation center
+            _rot_pose = Pose.make_rotation(_rot_vec.y,0,1,0).multiply(Pose.make_rotation(_rot_vec.x,1,0,0)).multiply(Pose.make_rotation(_rot_vec.z,0,0,1))
+
+            _offset = self.rot_center_offset
+            _rx, _ry, _rz = _rot_pose.rotate_vector(_offset.x, _offset.y, _offset.z)
+
+            _rot_pose.tx = _trans_vec.x + _offset.x - _rx
+            _rot_pose.ty = _trans_vec.y + _offset.y - _ry
+            _rot_pose.tz = _trans_vec.z + _offset.z - _rz
+
             ## accumulate input
-            self.sf_nav_mat.value = \
-                self.sf_nav_mat.value * \
-                avango.gua.make_trans_mat(_trans_vec) * \
-                avango.gua.make_trans_mat(self.rot_center_offset) * \
-                avango.gua.make_rot_mat(_rot_vec.y,0,1,0) * \
-                avango.gua.make_rot_mat(_rot_vec.x,1,0,0) * \
-                avango.gua.make_rot_mat(_rot_vec.z,0,0,1) * \
-                avango.gua.make_trans_mat(self.rot_center_offset * -1)
+            self.nav_pose = self.nav_pose.multiply(_rot_pose)
+            self.sf_nav_mat.value = self.nav_pose.get_matrix()
 
         
 
     ### functions ###
     def set_start_transformation(self, MAT4):
+        self.nav_pose = Pose.from_matrix(MAT4)
         self.sf_nav_mat.value = MAT4
 
   
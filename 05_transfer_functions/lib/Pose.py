@@ -0,0 +1,110 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+
+### import python libraries
+import math
+
+
+## Rigid transformation stored as translation and unit quaternion. Poses are
+# composed like matrices (A * B applies B first) and renormalized on
+# composition, so accumulated orientations do not drift or shear. Convert to
+# a matrix once per frame with get_matrix().
+class Pose:
+
+    __slots__ = ("tx", "ty", "tz", "qw", "qx", "qy", "qz")
+
+    ## constructor
+    def __init__(self, TX = 0.0, TY = 0.0, TZ = 0.0, QW = 1.0, QX = 0.0, QY = 0.0, QZ = 0.0):
+        self.tx = TX
+        self.ty = TY
+        self.tz = TZ
+        self.qw = QW
+        self.qx = QX
+        self.qy = QY
+        self.qz = QZ
+
+
+    ### functions ###
+    ## rotation by ANGLE (in degrees) around axis (X,Y,Z), as avango.gua.make_rot_mat
+    @staticmethod
+    def make_rotation(ANGLE, X, Y, Z):
+        _length = math.sqrt(X * X + Y * Y + Z * Z)
+
+        if _length == 0.0 or ANGLE == 0.0:
+            return Pose()
+
+        _half = math.radians(ANGLE) * 0.5
+        _s = math.sin(_half) / _length
+
+        return Pose(QW = math.cos(_half), QX = X * _s, QY = Y * _s, QZ = Z * _s)
+
+
+    ## rigid part of a matrix (translation and rotation)
+    @staticmethod
+    def from_matrix(MAT4):
+        _t = MAT4.get_translate()
+        _q = MAT4.get_rotate()
+
+        _pose = Pose(_t.x, _t.y, _t.z, _q.w, _q.x, _q.y, _q.z)
+        _pose.normalize()
+
+        return _pose
+
+
+    def normalize(self):
+        _length = math.sqrt(self.qw * self.qw + self.qx * self.qx + self.qy * self.qy + self.qz * self.qz)
+
+        if _length > 0.0:
+            _inv = 1.0 / _length
+            self.qw *= _inv
+            self.qx *= _inv
+            self.qy *= _inv
+            self.qz *= _inv
+        else:
+            self.qw, self.qx, self.qy, self.qz = 1.0, 0.0, 0.0, 0.0
+
+
+    def rotate_vector(self, X, Y, Z):
+        _w, _x, _y, _z = self.qw, self.qx, self.qy, self.qz
+
+        ## v + 2w (q x v) + 2 q x (q x v)
+        _cx = _y * Z - _z * Y
+        _cy = _z * X - _x * Z
+        _cz = _x * Y - _y * X
+
+        return (
+            X + 2.0 * (_w * _cx + _y * _cz - _z * _cy),
+            Y + 2.0 * (_w * _cy + _z * _cx - _x * _cz),
+            Z + 2.0 * (_w * _cz + _x * _cy - _y * _cx))
+
+
+    ## self * OTHER (OTHER is applied first)
+    def multiply(self, OTHER):
+        _tx, _ty, _tz = self.rotate_vector(OTHER.tx, OTHER.ty, OTHER.tz)
+
+        _w1, _x1, _y1, _z1 = self.qw, self.qx, self.qy, self.qz
+        _w2, _x2, _y2, _z2 = OTHER.qw, OTHER.qx, OTHER.qy, OTHER.qz
+
+        _pose = Pose(
+            self.tx + _tx, self.ty + _ty, self.tz + _tz,
+            _w1 * _w2 - _x1 * _x2 - _y1 * _y2 - _z1 * _z2,
+            _w1 * _x2 + _x1 * _w2 + _y1 * _z2 - _z1 * _y2,
+            _w1 * _y2 - _x1 * _z2 + _y1 * _w2 + _z1 * _x2,
+            _w1 * _z2 + _x1 * _y2 - _y1 * _x2 + _z1 * _w2)
+        _pose.normalize()
+
+        return _pose
+
+
+    def get_matrix(self):
+        _mat = avango.gua.make_trans_mat(self.tx, self.ty, self.tz)
+
+        _s = math.sqrt(self.qx * self.qx + self.qy * self.qy + self.qz * self.qz) # sine of half angle
+
+        if _s < 1.0e-12: # no rotation
+            return _mat
+
+        return _mat * avango.gua.make_rot_mat(math.degrees(2.0 * math.atan2(_s, self.qw)), self.qx / _s, self.qy / _s, self.qz / _s)
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+
+### import python libraries
+import math
+
+
+## Uniform grid over node positions for proximity (radius) queries.
+# Nodes are stored in the cell containing their position; moving nodes have to
+# be re-inserted with update(). A query only visits the cells overlapping the
+# query sphere, so its cost depends on the local node density instead of the
+# total number of nodes.
+class SpatialIndex:
+
+    ## constructor
+    def __init__(self,
+        CELL_SIZE = 0.03, # in meter (should be close to the largest query radius)
+        ):
+
+        ### parameters ###
+        self.cell_size = CELL_SIZE
+
+
+        ### variables ###
+        self.cells = {} # cell key -> list of nodes
+        self.node_entries = {} # node -> (cell key, position)
+
+
+    ### functions ###
+    def get_cell_key(self, X, Y, Z):
+        return (int(math.floor(X / self.cell_size)), int(math.floor(Y / self.cell_size)), int(math.floor(Z / self.cell_size)))
+
+
+    def insert(self, NODE, POS):
+        _key = self.get_cell_key(POS.x, POS.y, POS.z)
+
+        self.cells.setdefault(_key, []).append(NODE)
+        self.node_entries[NODE] = (_key, avango.gua.Vec3(POS.x, POS.y, POS.z))
+
+
+    def remove(self, NODE):
+        _entry = self.node_entries.pop(NODE, None)
+
+        if _entry is None:
+            return
+
+        _cell = self.cells[_entry[0]]
+        _cell.remove(NODE)
+
+        if len(_cell) == 0:
+            del self.cells[_entry[0]]
+
+
+    ## re-insert a (moved) node; only touches the cell lists if the node changed its cell
+    def update(self, NODE, POS):
+        _entry = self.node_entries.get(NODE)
+
+        if _entry is None:
+            self.insert(NODE, POS)
+            return
+
+        _key = self.get_cell_key(POS.x, POS.y, POS.z)
+
+        if _key != _entry[0]:
+            self.remove(NODE)
+            self.insert(NODE, POS)
+        else:
+            self.node_entries[NODE] = (_key, avango.gua.Vec3(POS.x, POS.y, POS.z))
+
+
+    ## returns a list of (node, distance) tuples for all nodes closer than RADIUS to POS
+    def query_radius(self, POS, RADIUS):
+        _min_key = self.get_cell_key(POS.x - RADIUS, POS.y - RADIUS, POS.z - RADIUS)
+        _max_key = self.get_cell_key(POS.x + RADIUS, POS.y + RADIUS, POS.z + RADIUS)
+
+        _result = []
+
+        for _i in range(_min_key[0], _max_key[0] + 1):
+            for _j in range(_min_key[1], _max_key[1] + 1):
+                for _k in range(_min_key[2], _max_key[2] + 1):
+                    _cell = self.cells.get((_i, _j, _k))
+
+                    if _cell is None:
+                        continue
+
+                    for _node in _cell:
+                        _dist = (POS - self.node_entries[_node][1]).length() # node-query distance
+
+                        if _dist < RADIUS:
+                            _result.append((_node, _dist))
+
+        return _result
+
+
+    def get_num_nodes(self):
+        return len(self.node_entries)
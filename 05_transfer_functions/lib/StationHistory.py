@@ -0,0 +1,288 @@
+#!/usr/bin/python
+
+### import python libraries
+import mmap
+import os
+import struct
+import time
+
+
+### global variables ###
+## Shared-memory history of a device station: a ring buffer of the last
+# CAPACITY timestamped samples, written by the daemon (one writer per station)
+# and read by any number of applications without locks. The file starts with
+#   magic, version, capacity (uint), generation (uint), write count (uint64)
+# followed by CAPACITY slots of
+#   sequence (uint64), time (double, sec as time.time()), 16 values (doubles),
+#   button states as bitmask (uint), 16 matrix elements (doubles, row-major).
+# A slot's sequence is the write count after the sample was written (0 while
+# it is written), so a reader detects samples overwritten during the copy.
+# A restarted daemon continues the write count of the file and increments the
+# generation (readers then re-read the capacity); the file is never truncated,
+# as applications may have it mapped.
+HISTORY_DIR = "/dev/shm"
+RETRY_INTERVAL = 1.0 # in sec; missing histories are probed at most once per interval
+
+MAGIC = b"AVSH"
+VERSION = 2
+
+HEADER = struct.Struct("<4sHxxIIQ")
+GENERATION = struct.Struct("<I")
+GENERATION_OFFSET = 12
+COUNT = struct.Struct("<Q")
+COUNT_OFFSET = 16
+SEQUENCE = struct.Struct("<Q")
+SAMPLE = struct.Struct("<Qd16dI16d")
+SAMPLE_TIME = struct.Struct("<Qd") # sequence and time of a sample
+
+NUM_VALUES = 16
+NUM_BUTTONS = 32
+IDENTITY = (1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+
+
+
+### helper functions ###
+def get_history_filename(STATION):
+    return os.path.join(HISTORY_DIR, "avango-station-history-" + STATION.replace("/", "_"))
+
+
+def get_button_mask(BUTTONS):
+    _mask = 0
+
+    for _i, _button in enumerate(BUTTONS):
+        if _button == True:
+            _mask |= 1 << _i
+
+    return _mask
+
+
+
+## Daemon side: appends samples of one station (single writer).
+class StationHistoryWriter:
+
+    ## constructor
+    def __init__(self,
+        STATION,
+        CAPACITY = 256, # number of samples
+        ):
+
+        ### parameters ###
+        self.station = STATION
+        self.capacity = CAPACITY
+
+
+        ### variables ###
+        self.count = 0 # samples written
+
+
+        ### resources ###
+        _size = HEADER.size + CAPACITY * SAMPLE.size
+        _generation = 0
+
+        self.file = os.fdopen(os.open(get_history_filename(STATION), os.O_RDWR | os.O_CREAT, 0o666), "r+b") # no truncation (mapped by readers)
+
+        if os.fstat(self.file.fileno()).st_size >= HEADER.size: # history of a previous daemon
+            _magic, _version, _capacity, _generation, _count = HEADER.unpack(self.file.read(HEADER.size))
+
+            if _magic == MAGIC and _version == VERSION:
+                self.count = _count # readers keep their read position
+                _generation += 1
+            else:
+                _generation = 0
+
+        if os.fstat(self.file.fileno()).st_size < _size: # grow only (readers get SIGBUS beyond a shrunk file)
+            os.ftruncate(self.file.fileno(), _size)
+
+        self.buffer = mmap.mmap(self.file.fileno(), _size)
+
+        self.buffer[0:HEADER.size] = HEADER.pack(MAGIC, VERSION, CAPACITY, _generation & 0xffffffff, self.count)
+
+
+    ### functions ###
+    ## VALUES: up to 16 floats, BUTTONS: button states, MATRIX: 16 elements (row-major)
+    def append(self, TIME, VALUES = (), BUTTONS = (), MATRIX = IDENTITY):
+        _values = list(VALUES[:NUM_VALUES]) + [0.0] * (NUM_VALUES - len(VALUES))
+        _offset = HEADER.size + (self.count % self.capacity) * SAMPLE.size
+
+        self.buffer[_offset:_offset + SEQUENCE.size] = SEQUENCE.pack(0) # invalid while written
+        self.buffer[_offset + SEQUENCE.size:_offset + SAMPLE.size] = SAMPLE.pack(0, TIME, *(_values + [get_button_mask(BUTTONS)] + list(MATRIX)))[SEQUENCE.size:]
+
+        self.count += 1
+        self.buffer[_offset:_offset + SEQUENCE.size] = SEQUENCE.pack(self.count)
+        self.buffer[COUNT_OFFSET:COUNT_OFFSET + COUNT.size] = COUNT.pack(self.count)
+
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+
+
+## Application side: Python view on the history of a station. Samples are
+# (time, values, buttons, matrix elements) tuples, oldest first. The view
+# attaches once the daemon created the history (is_available).
+class StationHistory:
+
+    ## constructor
+    def __init__(self, STATION):
+
+        ### parameters ###
+        self.station = STATION
+
+
+        ### variables ###
+        self.buffer = None
+        self.capacity = 0
+        self.generation = 0
+        self.read_count = 0 # write count at the last read()
+        self.retry_time = 0.0 # no attach attempt before (time.monotonic)
+
+
+    ### functions ###
+    def is_available(self):
+        if self.buffer is not None:
+            return True
+
+        if self.station is None or self.station == "":
+            return False
+
+        _now = time.monotonic()
+
+        if _now < self.retry_time: # missed recently
+            return False
+
+        self.retry_time = _now + RETRY_INTERVAL
+
+        try:
+            with open(get_history_filename(self.station), "rb") as _file:
+                _buffer = mmap.mmap(_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        except (IOError, ValueError): # not created (yet) resp. empty
+            return False
+
+        _magic, _version, _capacity, _generation, _count = HEADER.unpack_from(_buffer, 0)
+
+        if _magic != MAGIC or _version != VERSION or len(_buffer) < HEADER.size + _capacity * SAMPLE.size:
+            _buffer.close()
+            return False
+
+        self.buffer = _buffer
+        self.capacity = _capacity
+        self.generation = _generation
+        self.read_count = _count
+
+        return True
+
+
+    ## re-attach after the daemon restarted (capacity and file size may have changed)
+    def check_generation(self):
+        if GENERATION.unpack_from(self.buffer, GENERATION_OFFSET)[0] == self.generation:
+            return True
+
+        _read_count = self.read_count
+
+        self.close()
+
+        if self.is_available() == False:
+            return False
+
+        self.read_count = min(_read_count, self.read_count)
+
+        return True
+
+
+    ## samples with write numbers FIRST..LAST-1 that were not overwritten meanwhile
+    def get_range(self, FIRST, LAST):
+        _buffer = self.buffer
+        _samples = []
+
+        for _n in range(max(FIRST, LAST - self.capacity), LAST):
+            _offset = HEADER.size + (_n % self.capacity) * SAMPLE.size
+            _data = SAMPLE.unpack_from(_buffer, _offset)
+
+            if _data[0] != _n + 1 or SEQUENCE.unpack_from(_buffer, _offset)[0] != _n + 1: # overwritten (during the copy)
+                continue
+
+            _buttons = _data[18]
+            _samples.append((_data[1], _data[2:18], [(_buttons >> _i) & 1 == 1 for _i in range(NUM_BUTTONS)], _data[19:35]))
+
+        return _samples
+
+
+    def get_count(self):
+        return COUNT.unpack_from(self.buffer, COUNT_OFFSET)[0]
+
+
+    ## all samples written since the last call
+    def read(self):
+        if self.is_available() == False or self.check_generation() == False:
+            return []
+
+        _count = self.get_count()
+        _samples = self.get_range(self.read_count, _count)
+        self.read_count = _count
+
+        return _samples
+
+
+    ## buffered samples taken after SINCE (in sec as time.time())
+    def get_samples(self, SINCE = 0.0):
+        if self.is_available() == False or self.check_generation() == False:
+            return []
+
+        _count = self.get_count()
+
+        return [_sample for _sample in self.get_range(_count - self.capacity, _count) if _sample[0] > SINCE]
+
+
+    ## latest buffered sample taken at or before TIME, None if there is none (binary search over the slot times)
+    def get_sample_at(self, TIME):
+        if self.is_available() == False or self.check_generation() == False:
+            return None
+
+        _buffer = self.buffer
+        _count = self.get_count()
+        _low = max(0, _count - self.capacity) # oldest write number with time <= TIME is searched in _low.._high-1
+        _high = _count
+
+        while _low < _high:
+            _n = (_low + _high) // 2
+            _sequence, _time = SAMPLE_TIME.unpack_from(_buffer, HEADER.size + (_n % self.capacity) * SAMPLE.size)
+
+            if _sequence != _n + 1 or _time <= TIME: # overwritten samples are older than TIME
+                _low = _n + 1
+            else:
+                _high = _n
+
+        for _sample in reversed(self.get_range(max(0, _low - 1), _low)):
+            if _sample[0] <= TIME:
+                return _sample
+
+        return None
+
+
+    ## sum of value INDEX over the samples after SINCE (e.g. mouse motion between two frames)
+    def integrate(self, INDEX, SINCE):
+        return sum([_sample[1][INDEX] for _sample in self.get_samples(SINCE)])
+
+
+    ## linear velocity (in units per sec) of the matrix translation over the last WINDOW sec, None if unknown
+    def get_velocity(self, WINDOW = 0.05):
+        _samples = self.get_samples(time.time() - WINDOW)
+
+        if len(_samples) < 2 or _samples[-1][0] <= _samples[0][0]:
+            return None
+
+        _dt = _samples[-1][0] - _samples[0][0]
+        _first = _samples[0][3]
+        _last = _samples[-1][3]
+
+        return ((_last[3] - _first[3]) / _dt, (_last[7] - _first[7]) / _dt, (_last[11] - _first[11]) / _dt)
+
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+        self.retry_time = 0.0 # re-attach immediately
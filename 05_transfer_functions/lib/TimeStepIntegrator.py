@@ -0,0 +1,66 @@
+#!/usr/bin/python
+
+### import python libraries
+import time
+
+
+## Frame-rate independent integration of rate and acceleration input. The
+# elapsed frame time is measured in (fractional) steps of STEP_SIZE (the 60Hz
+# frame the transfer functions were tuned for), so velocities and accelerations
+# are given per step. Acceleration is integrated semi-implicitly (velocity
+# first, then position with the new velocity), whole steps first, then the
+# remaining fraction of a step.
+class TimeStepIntegrator:
+
+    ## constructor
+    def __init__(self,
+        CHANNELS = 3,
+        STEP_SIZE = 1.0 / 60.0, # in sec
+        MAX_STEPS = 6, # limits catch-up after stalls (e.g. loading)
+        CLOCK = time.monotonic, # frame time in sec (e.g. of an avango.nodes.TimeSensor)
+        ):
+
+        ### parameters ###
+        self.channels = CHANNELS
+        self.step_size = STEP_SIZE
+        self.max_steps = MAX_STEPS
+        self.clock = CLOCK
+
+
+        ### variables ###
+        self.position = [0.0] * self.channels
+        self.velocity = [0.0] * self.channels
+
+        self.lf_time = self.clock() # clock time of last frame
+
+
+    ### functions ###
+    def reset(self):
+        self.position = [0.0] * self.channels
+        self.velocity = [0.0] * self.channels
+
+        self.lf_time = self.clock()
+
+
+    ## frame time since the last call (resp. since reset) in steps, incl. the fraction of a step
+    def get_steps(self):
+        _time = self.clock()
+
+        _steps = (_time - self.lf_time) / self.step_size
+        self.lf_time = _time
+
+        return min(max(_steps, 0.0), self.max_steps) # drop time beyond MAX_STEPS instead of spiraling
+
+
+    def integrate_velocity(self, VELOCITY, STEPS):
+        for _i in range(self.channels):
+            self.position[_i] += VELOCITY[_i] * STEPS
+
+
+    def integrate_acceleration(self, ACCELERATION, STEPS):
+        _fraction = STEPS - int(STEPS)
+
+        for _dt in [1.0] * int(STEPS) + ([_fraction] if _fraction > 0.0 else []):
+            for _i in range(self.channels):
+                self.velocity[_i] += ACCELERATION[_i] * _dt
+                self.position[_i] += self.velocity[_i] * _dt
@@ -0,0 +1,158 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+
+### import application libraries
+from lib.TimeStepIntegrator import TimeStepIntegrator
+from lib.Pose import Pose
+from lib.GainCurve import GainCurve
+
+### import python libraries
+import math
+import time
+
+
+## Declarative transfer function from device input (channels x, y, z, rx, ry, rz)
+# to a hand matrix. The stages
+#   deadzone -> gain curves -> gain -> integration -> output scale -> clamp -> pose -> matrix
+# are configured once and compiled into a single function (see apply).
+#
+# ISOTONIC devices deliver displacements per frame, which are accumulated to a
+# device position; elastic devices deliver deflections. ORDER selects position
+# (0), rate (1) or acceleration (2) control.
+class TransferFunction:
+
+    ## constructor
+    def __init__(self,
+        TYPE = "",
+        CHANNELS = 3, # 3: translation only, 6: translation and rotation
+        DEADZONE = 0.0, # input values below are ignored
+        GAIN_CURVES = [], # (channel tuple, function of the channels' magnitude returning a gain factor or curve file)
+        GAIN = 1.0, # linear gain (per channel or for all channels)
+        ISOTONIC = False,
+        ORDER = 0,
+        OUTPUT_SCALE = 1.0,
+        CLAMP_RANGE = (0.3, 0.15, 0.15), # in meter (screen space borders)
+        CLOCK = time.monotonic, # frame time in sec for rate and acceleration control
+        ):
+
+        ### parameters ###
+        self.type = TYPE
+        self.channels = CHANNELS
+        self.deadzone = DEADZONE
+        self.gain_curves = [(_axes, GainCurve.resolve(_curve)) for _axes, _curve in GAIN_CURVES]
+
+        if isinstance(GAIN, (list, tuple)):
+            self.gains = list(GAIN)
+        else:
+            self.gains = [GAIN] * self.channels
+
+        self.isotonic = ISOTONIC
+        self.order = ORDER
+        self.output_scale = OUTPUT_SCALE
+        self.clamp_range = CLAMP_RANGE
+        self.clock = CLOCK
+
+
+        ### variables ###
+        self.device_position = [0.0] * self.channels # accumulated isotonic input
+        self.integrator = None
+
+        self.apply = self.compile() # DOF list -> hand matrix
+
+
+    ### functions ###
+    def reset(self):
+        for _i in range(self.channels):
+            self.device_position[_i] = 0.0
+
+        self.integrator.reset()
+
+
+    def compile(self):
+        ## bind all configuration to locals of the compiled function
+        _channels = range(self.channels)
+        _deadzone = self.deadzone
+        _gain_curves = tuple([(tuple(_axes), _curve) for _axes, _curve in self.gain_curves])
+        _gains = tuple(self.gains)
+        _order = self.order
+        _out = self.output_scale
+        _x_range, _y_range, _z_range = self.clamp_range
+        _device_position = self.device_position
+        _integrator = self.integrator = TimeStepIntegrator(CHANNELS = self.channels, CLOCK = self.clock) # frame-rate independent integration
+        _rotation_axes = tuple([(3 + _i, _axis) for _i, _axis in enumerate([(1,0,0), (0,1,0), (0,0,1)]) if 3 + _i < self.channels])
+
+        ## integration stage (chosen once)
+        if _order == 0 and self.isotonic == True: # accumulate displacements (clamped feedback keeps the hand at screen space borders)
+            _x_limit, _y_limit, _z_limit = _x_range / _out, _y_range / _out, _z_range / _out
+
+            def _integrate(INPUT):
+                _pos = _integrator.position
+
+                for _i in _channels:
+                    _pos[_i] += INPUT[_i]
+
+                _pos[0] = min(_x_limit, max(-_x_limit, _pos[0]))
+                _pos[1] = min(_y_limit, max(-_y_limit, _pos[1]))
+                _pos[2] = min(_z_limit, max(-_z_limit, _pos[2]))
+                return _pos
+
+        elif _order == 0: # deflection maps to position
+            def _integrate(INPUT):
+                return INPUT
+
+        else:
+            if _order == 1:
+                _step = _integrator.integrate_velocity
+            else:
+                _step = _integrator.integrate_acceleration
+
+            if self.isotonic == True: # device position drives rate resp. acceleration
+                def _integrate(INPUT):
+                    for _i in _channels:
+                        _device_position[_i] += INPUT[_i]
+
+                    _step(_device_position, _integrator.get_steps())
+                    return _integrator.position
+
+            else:
+                def _integrate(INPUT):
+                    _step(INPUT, _integrator.get_steps())
+                    return _integrator.position
+
+
+        def apply(DOF):
+            _input = [DOF[_i] for _i in _channels]
+
+            if _deadzone > 0.0:
+                _input = [_v if abs(_v) > _deadzone else 0.0 for _v in _input]
+
+            for _axes, _curve in _gain_curves: # applied to non-zero channel groups only
+                _mag_sq = 0.0
+
+                for _a in _axes:
+                    if _input[_a] == 0.0:
+                        break
+                    _mag_sq += _input[_a] * _input[_a]
+                else:
+                    _factor = _curve(math.sqrt(_mag_sq))
+
+                    for _a in _axes:
+                        _input[_a] *= _factor
+
+            _pos = _integrate([_input[_i] * _gains[_i] for _i in _channels])
+
+            _pose = Pose(
+                min(_x_range, max(-_x_range, _pos[0] * _out)),
+                min(_y_range, max(-_y_range, _pos[1] * _out)),
+                min(_z_range, max(-_z_range, _pos[2] * _out)))
+
+            for _i, _axis in _rotation_axes: # rotations are composed as quaternions (one rotation matrix per frame)
+                if _pos[_i] != 0.0:
+                    _pose = _pose.multiply(Pose.make_rotation(_pos[_i] * _out, _axis[0], _axis[1], _axis[2]))
+
+            return _pose.get_matrix()
+
+        return apply
@@ -11,6 +11,7 @@ from lib.Scene import Scene
 from lib.Device import KeyboardInput
 from lib.Navigation import SteeringNavigation
 from lib.Manipulation import ManipulationManager
+from lib.TriMeshLoadReport import TRIMESH_LOADER
 
 
 def start():
@@ -36,6 +37,7 @@ def start():
     #viewingSetup = SimpleViewingSetup(SCENEGRAPH = scenegraph, STEREO_MODE = "anaglyph")
     viewingSetup.connect_navigation_matrix(steeringNavigation.sf_nav_mat)
     steeringNavigation.set_rotation_center_offset(viewingSetup.get_head_position())
+    viewingSetup.viewer.DesiredFPS.connect_from(keyboardInput.sf_max_fps) # change viewer FPS during runtime (stress test)
 
 
     ## init manipulation techniques    
@@ -44,6 +46,7 @@ def start():
 
 
     print_graph(scenegraph.Root.value)
+    TRIMESH_LOADER.print_report() # load time and resident memory per mesh file
 
     ## start application/render loop
     viewingSetup.run(locals(), globals())
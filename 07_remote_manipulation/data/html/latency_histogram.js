@@ -0,0 +1,75 @@
+
+var numBins = 51;
+var binSize = 1.0; // in ms
+
+var margin = {left: 30, right: 140, top: 8, bottom: 14};
+var width = 512;
+var height = 96;
+
+var counts = Array.apply(null, new Array(numBins))
+    .map(Number.prototype.valueOf, 0);
+
+var x = d3.scale.linear()
+    .domain([0, numBins])
+    .range([0, width - margin.left - margin.right]);
+var y = d3.scale.linear()
+    .domain([0, 1])
+    .range([height - margin.bottom, margin.top]);
+
+var axis = d3.svg.axis()
+    .scale(x)
+    .orient("bottom")
+    .ticks(5)
+    .tickFormat(function(d) { return d3.round(d * binSize, 0) + "ms"; })
+    .outerTickSize(3);
+
+var svg = d3.select("body")
+    .append("svg")
+        .attr("width", width)
+        .attr("height", height);
+
+var xAxis = svg.append("g")
+    .attr("class", "axis")
+    .attr("transform", "translate(" + margin.left + ", " + (height - margin.bottom) + ")")
+    .call(axis);
+
+var chart = svg.append("g")
+    .attr("transform", "translate(" + margin.left + ", 0)");
+
+var bars = chart.selectAll("rect")
+    .data(counts)
+    .enter().append("rect")
+        .attr("class", "bar")
+        .attr("x", function(d, i) { return x(i); })
+        .attr("width", Math.max(1, x(1) - 1))
+        .attr("y", y(0))
+        .attr("height", 0);
+
+var labels = ["sensor-evaluate", "evaluate-write", "write-submit", "sensor-submit"].map(function(name, i) {
+    return svg.append("text")
+        .attr("class", "numText")
+        .attr("x", width - 10)
+        .attr("y", margin.top + 10 + i * 0.22 * height)
+        .style("font-size", 11)
+        .text(name);
+});
+
+// counts: comma separated bin counts of the motion-to-photon histogram,
+// stats: "|" separated p95 labels of the latency stages
+function set_histogram(binSizeString, countsString, statsString) {
+    binSize = parseFloat(binSizeString);
+    counts = countsString.split(",").map(parseFloat);
+
+    y.domain([0, Math.max(1, d3.max(counts))]);
+    xAxis.call(axis);
+
+    bars.data(counts)
+        .attr("y", function(d) { return y(d); })
+        .attr("height", function(d) { return y(0) - y(d); });
+
+    statsString.split("|").forEach(function(text, i) {
+        if (i < labels.length) {
+            labels[i].text(text);
+        }
+    });
+}
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.script
+
+### import application libraries
+from lib.StationHistory import StationHistory
+
+### import python libraries
+import time
+
+
+
+## Button edges of a device station in the order they happened. Every press
+# and release is delivered with its timestamp (in sec as time.time()), also
+# when both fall between two frames. The edges are taken from the station
+# history kept by the daemon (see lib/StationHistory.py); without a history
+# they are detected on the DeviceSensor fields once per frame (the history
+# file is then probed at most once per StationHistory.RETRY_INTERVAL).
+class ButtonEventQueue:
+
+    ## constructor
+    def __init__(self,
+        DEVICE_SENSOR = None,
+        BUTTONS = [0], # button indices to watch
+        CALLBACK = None, # CALLBACK(BUTTON, PRESSED, TIME) per edge, called every frame (otherwise call poll())
+        ):
+
+        ### parameters ###
+        self.device_sensor = DEVICE_SENSOR
+        self.buttons = BUTTONS
+        self.callback = CALLBACK
+
+
+        ### resources ###
+        self.history = StationHistory(DEVICE_SENSOR.Station.value)
+        self.button_fields = dict([(_button, getattr(DEVICE_SENSOR, "Button" + str(_button))) for _button in BUTTONS])
+        self.states = dict([(_button, _field.value) for _button, _field in self.button_fields.items()]) # buttons held at start
+
+        if CALLBACK is not None:
+            self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
+
+
+    ### functions ###
+    ## edges since the last call as (time, button, pressed) tuples, oldest first
+    def poll(self):
+        _events = []
+        _states = self.states
+
+        if self.history.is_available() == True:
+            for _time, _values, _buttons, _matrix in self.history.read():
+                for _button in self.buttons:
+                    if _buttons[_button] != _states[_button]:
+                        _states[_button] = _buttons[_button]
+                        _events.append((_time, _button, _buttons[_button]))
+
+        else: # state at frame time (no file access until the next history probe)
+            _time = time.time()
+
+            for _button, _field in self.button_fields.items():
+                if _field.value != _states[_button]:
+                    _states[_button] = _field.value
+                    _events.append((_time, _button, _field.value))
+
+        return _events
+
+
+    def is_pressed(self, BUTTON):
+        return self.states[BUTTON]
+
+
+    ### callback functions ###
+    def frame_callback(self): # evaluated every frame
+        for _time, _button, _pressed in self.poll():
+            self.callback(_button, _pressed, _time)
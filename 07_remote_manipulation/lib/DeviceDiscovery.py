@@ -0,0 +1,268 @@
+#!/usr/bin/python
+
+### import python libraries
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import subprocess
+import threading
+
+
+### global variables ###
+DEVICES_FILE = "/proc/bus/input/devices"
+INPUT_DIR = "/dev/input"
+BY_ID_DIR = "/dev/input/by-id"
+
+## inotify flags (see inotify.h)
+IN_ATTRIB = 0x00000004 # device node permissions set by udev
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+INOTIFY_EVENT = struct.Struct("iIII") # wd, mask, cookie, name length
+
+
+
+## Input devices of /proc/bus/input/devices, parsed once and indexed by name.
+class InputDeviceTable:
+
+    ## constructor
+    def __init__(self, TEXT = ""):
+
+        ### variables ###
+        self.devices = [] # dicts with name, phys, handlers and event path per device
+        self.by_name = {} # device name -> devices in file order
+
+        self.parse(TEXT)
+
+
+    ### functions ###
+    @staticmethod
+    def load(FILENAME = DEVICES_FILE):
+        try:
+            with open(FILENAME) as _file:
+                return InputDeviceTable(_file.read())
+
+        except IOError:
+            return InputDeviceTable()
+
+
+    def parse(self, TEXT):
+        _device = {}
+
+        for _line in TEXT.split("\n") + [""]:
+            if len(_line.strip()) == 0: # blank line ends a device block
+                if "name" in _device:
+                    self.add(_device)
+                _device = {}
+                continue
+
+            _type, _, _value = _line.partition(": ")
+
+            if _type == "N": # N: Name="..."
+                _device["name"] = _value.partition("=")[2].strip().strip('"')
+            elif _type == "P": # P: Phys=...
+                _device["phys"] = _value.partition("=")[2].strip()
+            elif _type == "H": # H: Handlers=kbd event3
+                _device["handlers"] = _value.partition("=")[2].split()
+
+
+    def add(self, DEVICE):
+        DEVICE.setdefault("phys", "")
+        DEVICE.setdefault("handlers", [])
+        DEVICE["event"] = ""
+
+        for _handler in DEVICE["handlers"]:
+            if _handler.startswith("event"):
+                DEVICE["event"] = os.path.join(INPUT_DIR, _handler)
+                break
+
+        self.devices.append(DEVICE)
+        self.by_name.setdefault(DEVICE["name"], []).append(DEVICE)
+
+
+    ## event path (/dev/input/eventX) of the NUMBER-th device with the given name ("" if not found)
+    def get_event_path(self, NAME, NUMBER = 1):
+        _devices = self.by_name.get(NAME, [])
+
+        if NUMBER > len(_devices):
+            return ""
+
+        return _devices[NUMBER - 1]["event"]
+
+
+    ## first event path found for each name: {name: event path} in one pass over the device list
+    def match(self, NAMES):
+        _names = set(NAMES)
+        _matches = {}
+
+        for _device in self.devices:
+            if _device["name"] in _names and _device["name"] not in _matches:
+                _matches[_device["name"]] = _device["event"]
+
+        return _matches
+
+
+    def get_event_paths(self):
+        return set([_device["event"] for _device in self.devices if _device["event"] != ""])
+
+
+
+## keyboard event devices (/dev/input/by-id/*-event-kbd), sorted as listed by ls
+def get_keyboard_paths(DIRECTORY = BY_ID_DIR):
+    try:
+        _names = sorted([_name for _name in os.listdir(DIRECTORY) if _name.endswith("-event-kbd")])
+    except OSError:
+        return []
+
+    return [os.path.join(DIRECTORY, _name) for _name in _names]
+
+
+
+## Watches /dev/input for event devices being plugged in or removed (inotify)
+# and calls CALLBACK(TABLE, ADDED_PATHS, REMOVED_PATHS) from a background
+# thread with the re-parsed device table.
+class HotplugWatcher:
+
+    ## constructor
+    def __init__(self,
+        CALLBACK = None,
+        DIRECTORY = INPUT_DIR,
+        ):
+
+        ### parameters ###
+        self.callback = CALLBACK
+        self.directory = DIRECTORY
+
+
+        ### variables ###
+        self.known_paths = InputDeviceTable.load().get_event_paths()
+        self.running = False
+
+
+        ### resources ###
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno = True)
+        self.fd = self.libc.inotify_init()
+
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init failed")
+
+        if self.libc.inotify_add_watch(self.fd, self.directory.encode(), IN_CREATE | IN_DELETE | IN_ATTRIB) < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed for " + self.directory)
+
+        self.thread = threading.Thread(target = self.run)
+        self.thread.daemon = True
+
+
+    ### functions ###
+    def start(self):
+        self.running = True
+        self.thread.start()
+
+
+    def stop(self):
+        self.running = False
+
+
+    def run(self):
+        while self.running == True:
+            _readable, _, _ = select.select([self.fd], [], [], 0.5)
+
+            if len(_readable) == 0:
+                continue
+
+            _buffer = os.read(self.fd, 4096)
+            _offset = 0
+            _changed = False
+
+            while _offset + INOTIFY_EVENT.size <= len(_buffer):
+                _wd, _mask, _cookie, _length = INOTIFY_EVENT.unpack_from(_buffer, _offset)
+                _name = _buffer[_offset + INOTIFY_EVENT.size:_offset + INOTIFY_EVENT.size + _length].rstrip(b"\0").decode()
+                _offset += INOTIFY_EVENT.size + _length
+
+                if _name.startswith("event"):
+                    _changed = True
+
+            if _changed == True: # re-parse once per burst of events
+                self.update()
+
+
+    def update(self):
+        _table = InputDeviceTable.load()
+        _paths = _table.get_event_paths()
+
+        _added = set([_path for _path in _paths - self.known_paths if os.access(_path, os.R_OK)]) # readable once udev set the permissions
+        _removed = self.known_paths - _paths
+        self.known_paths = (self.known_paths - _removed) | _added
+
+        if (len(_added) > 0 or len(_removed) > 0) and self.callback is not None:
+            self.callback(_table, _added, _removed)
+
+
+
+## Starts configured devices that are plugged in while the daemon runs.
+# avango.daemon.run blocks with the devices it was started with, so each new
+# device is run by a child daemon process (terminated when it is unplugged).
+# The child is a new interpreter (the watcher thread must not fork the
+# running daemon) and opens exactly the added event device. Stations already
+# run by the daemon or another child are not started twice.
+class HotplugAttacher:
+
+    ## constructor
+    def __init__(self,
+        DEVICES = {}, # device name -> configuration entry (with "station")
+        COMMAND = None, # COMMAND(DEVICES[name], EVENT_PATH) -> argument list of the child daemon process
+        WORKING_DIR = None, # of the child daemon processes
+        STARTED = {}, # station name -> event path of the stations run by the daemon itself
+        ):
+
+        ### parameters ###
+        self.devices = DEVICES
+        self.command = COMMAND
+        self.working_dir = WORKING_DIR
+
+
+        ### variables ###
+        self.station_paths = dict(STARTED) # station name -> event path of all running stations
+        self.processes = {} # event path -> (child process, station name)
+
+
+        ### resources ###
+        self.watcher = HotplugWatcher(CALLBACK = self.attach)
+
+
+    ### functions ###
+    def start(self):
+        self.watcher.start()
+        print("Hot-plug watcher started for:", ", ".join(sorted(self.devices.keys())))
+
+
+    def attach(self, TABLE, ADDED, REMOVED):
+        for _path in REMOVED:
+            for _station, _station_path in list(self.station_paths.items()):
+                if _station_path == _path: # station can be started again
+                    del self.station_paths[_station]
+
+            _process, _station = self.processes.pop(_path, (None, None))
+
+            if _process is not None:
+                _process.terminate()
+                _process.wait()
+                print("Device removed:", _path)
+
+        for _name, _entry in self.devices.items():
+            for _device in TABLE.by_name.get(_name, []):
+                _path = _device["event"]
+
+                if _path not in ADDED or _path in self.processes:
+                    continue
+
+                _station = _entry["station"]
+
+                if _station in self.station_paths:
+                    print("Device", _name, "at", _path, "not attached:", _station, "already runs at", self.station_paths[_station])
+                    continue
+
+                self.processes[_path] = (subprocess.Popen(self.command(_entry, _path), cwd = self.working_dir), _station)
+                self.station_paths[_station] = _path
+                print("Device attached:", _name, "at", _path)
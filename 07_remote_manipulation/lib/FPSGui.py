@@ -9,6 +9,7 @@ import avango.gua
 import avango.gua.gui
 
 ### import python libraries
+import os
 import time
 
 
@@ -19,6 +20,8 @@ class FPSGui:
                 , PARENT_NODE = None
                 , WINDOW = None
                 , VIEWER = None
+                , LATENCY_MONITOR = None # optional, shows the motion-to-photon histogram above the FPS chart
+                , SHOW_FPS = True # False: motion-to-photon histogram only
                 ):
 
         ### guard ###
@@ -30,10 +33,13 @@ class FPSGui:
         ### external references ###
         self.WINDOW = WINDOW
         self.VIEWER = VIEWER
+        self.LATENCY_MONITOR = LATENCY_MONITOR
 
 
         ### parameters ###
+        self.show_fps = SHOW_FPS
         self.size = avango.gua.Vec2(512, 64) # in pixel
+        self.latency_size = avango.gua.Vec2(512, 96) # in pixel
 
 
         ### variables ###
@@ -43,19 +49,39 @@ class FPSGui:
 
         ### resources ###
         
-        self.gui = avango.gua.gui.nodes.GuiResourceNode(
-            TextureName = "fps_gui",
-            URL = "asset://gua/data/html/fps_chart.html",
-            Size = self.size
-            )
-        
-        self.quad = avango.gua.nodes.TexturedScreenSpaceQuadNode()
-        self.quad.Name.value = "fps_quad"
-        self.quad.Texture.value = "fps_gui"
-        self.quad.Width.value = int(self.size.x)
-        self.quad.Height.value = int(self.size.y)        
-        self.quad.Anchor.value = avango.gua.Vec2(1.0, -1.0)
-        PARENT_NODE.Children.value.append(self.quad)
+        if self.show_fps == True:
+            self.gui = avango.gua.gui.nodes.GuiResourceNode(
+                TextureName = "fps_gui",
+                URL = "asset://gua/data/html/fps_chart.html",
+                Size = self.size
+                )
+            
+            self.quad = avango.gua.nodes.TexturedScreenSpaceQuadNode()
+            self.quad.Name.value = "fps_quad"
+            self.quad.Texture.value = "fps_gui"
+            self.quad.Width.value = int(self.size.x)
+            self.quad.Height.value = int(self.size.y)        
+            self.quad.Anchor.value = avango.gua.Vec2(1.0, -1.0)
+            PARENT_NODE.Children.value.append(self.quad)
+
+        if self.LATENCY_MONITOR is not None:
+            self.latency_gui = avango.gua.gui.nodes.GuiResourceNode(
+                TextureName = "latency_gui",
+                URL = "file://" + os.path.abspath("data/html/latency_histogram.html"),
+                Size = self.latency_size
+                )
+
+            self.latency_quad = avango.gua.nodes.TexturedScreenSpaceQuadNode()
+            self.latency_quad.Name.value = "latency_quad"
+            self.latency_quad.Texture.value = "latency_gui"
+            self.latency_quad.Width.value = int(self.latency_size.x)
+            self.latency_quad.Height.value = int(self.latency_size.y)
+            self.latency_quad.Anchor.value = avango.gua.Vec2(1.0, -1.0)
+
+            if self.show_fps == True:
+                self.latency_quad.Offset.value = avango.gua.Vec2(0.0, self.size.y) # above the FPS chart
+
+            PARENT_NODE.Children.value.append(self.latency_quad)
 
 
         ### trigger callbacks ###
@@ -69,13 +95,21 @@ class FPSGui:
     
     def frame_callback(self):
         if (time.time() - self.time_sav) > 0.1: # plot FPS every 0.1 sec
-            _application_fps_string = "{:5.2f}".format(self.VIEWER.ApplicationFPS.value)
-            _rendering_fps_string = "{:5.2f}".format(self.WINDOW.RenderingFPS.value)
-            
-            self.gui.call_javascript("add_value_pair", [_rendering_fps_string, _application_fps_string])
+            if self.show_fps == True:
+                _application_fps_string = "{:5.2f}".format(self.VIEWER.ApplicationFPS.value)
+                _rendering_fps_string = "{:5.2f}".format(self.WINDOW.RenderingFPS.value)
+                
+                self.gui.call_javascript("add_value_pair", [_rendering_fps_string, _application_fps_string])
+
+                _max_fps = self.VIEWER.DesiredFPS.value
+                self.gui.call_javascript("set_max_fps", [str(_max_fps)])
+
+            if self.LATENCY_MONITOR is not None:
+                _histogram = self.LATENCY_MONITOR.histograms["sensor-submit"]
+                _counts_string = ",".join([str(_count) for _count in _histogram.bins])
+                _stats_string = "|".join(["{0} {1:.1f}".format(_stage, self.LATENCY_MONITOR.get_statistics(_stage)[2]) for _stage in self.LATENCY_MONITOR.histograms]) # p95 per stage (in ms)
 
-            _max_fps = self.VIEWER.DesiredFPS.value
-            self.gui.call_javascript("set_max_fps", [str(_max_fps)])
+                self.latency_gui.call_javascript("set_histogram", ["{0:.1f}".format(_histogram.bin_size * 1000.0), _counts_string, _stats_string])
         
             self.time_sav = time.time()
            
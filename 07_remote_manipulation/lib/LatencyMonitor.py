@@ -0,0 +1,163 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+import avango.script
+from avango.script import field_has_changed
+
+### import python libraries
+import collections
+import time
+
+
+### global variables ###
+## latency stages (from a tracking sample arriving at the sensor to the frame showing it)
+STAGES = ["sensor-evaluate", "evaluate-write", "write-submit", "sensor-submit"]
+
+
+
+## Rolling histogram of the last WINDOW latency samples in bins of BIN_SIZE
+# (the last bin collects all samples beyond NUM_BINS * BIN_SIZE).
+class LatencyHistogram:
+
+    ## constructor
+    def __init__(self,
+        BIN_SIZE = 0.001, # in sec
+        NUM_BINS = 50,
+        WINDOW = 600, # number of samples
+        ):
+
+        ### parameters ###
+        self.bin_size = BIN_SIZE
+        self.num_bins = NUM_BINS
+
+
+        ### variables ###
+        self.samples = collections.deque(maxlen = WINDOW)
+        self.bins = [0] * (NUM_BINS + 1)
+
+
+    ### functions ###
+    def get_bin(self, SECONDS):
+        return min(int(SECONDS / self.bin_size), self.num_bins)
+
+
+    def add(self, SECONDS):
+        if len(self.samples) == self.samples.maxlen: # oldest sample leaves the window
+            self.bins[self.get_bin(self.samples[0])] -= 1
+
+        self.samples.append(SECONDS)
+        self.bins[self.get_bin(SECONDS)] += 1
+
+
+    def get_mean(self):
+        if len(self.samples) == 0:
+            return 0.0
+
+        return sum(self.samples) / len(self.samples)
+
+
+    def get_percentile(self, PERCENT):
+        if len(self.samples) == 0:
+            return 0.0
+
+        _sorted = sorted(self.samples)
+        return _sorted[min(len(_sorted) - 1, int(len(_sorted) * PERCENT * 0.01))]
+
+
+
+## Measures the latency of tracking samples through the application: the
+# arrival of a new sensor matrix (sf_sensor_mat), the start of the technique
+# evaluation (mark_evaluate), the write of the dragged node (mark_write) and
+# the submission of the frame to the renderer (submit_frame, called after
+# Viewer.frame). Display scan-out is not included.
+class LatencyMonitor(avango.script.Script):
+
+    ## input fields
+    sf_sensor_mat = avango.gua.SFMatrix4()
+
+    ## constructor
+    def __init__(self):
+        self.super(LatencyMonitor).__init__()
+
+
+    def my_constructor(self,
+        SF_SENSOR_MAT = None, # matrix field of the tracking sensor
+        CLOCK = time.perf_counter,
+        BIN_SIZE = 0.001, # in sec
+        NUM_BINS = 50,
+        WINDOW = 600, # number of samples
+        ):
+
+        ### parameters ###
+        self.clock = CLOCK
+
+
+        ### variables ###
+        self.histograms = collections.OrderedDict([(_stage, LatencyHistogram(BIN_SIZE, NUM_BINS, WINDOW)) for _stage in STAGES])
+
+        ## timestamps of the current sample (None if the stage was not reached yet)
+        self.sample_time = None
+        self.evaluate_time = None
+        self.write_time = None
+
+
+        ### init field connections ###
+        if SF_SENSOR_MAT is not None:
+            self.sf_sensor_mat.connect_from(SF_SENSOR_MAT)
+
+
+    ### functions ###
+    def mark_evaluate(self):
+        if self.sample_time is not None and self.evaluate_time is None:
+            self.evaluate_time = self.clock()
+            self.histograms["sensor-evaluate"].add(self.evaluate_time - self.sample_time)
+
+
+    def mark_write(self):
+        if self.evaluate_time is not None and self.write_time is None:
+            self.write_time = self.clock()
+            self.histograms["evaluate-write"].add(self.write_time - self.evaluate_time)
+
+
+    def submit_frame(self):
+        if self.sample_time is None:
+            return
+
+        _time = self.clock()
+
+        if self.write_time is not None:
+            self.histograms["write-submit"].add(_time - self.write_time)
+
+        self.histograms["sensor-submit"].add(_time - self.sample_time)
+
+        self.sample_time = None
+        self.evaluate_time = None
+        self.write_time = None
+
+
+    ## stage statistics in ms: (mean, p50, p95, p99)
+    def get_statistics(self, STAGE):
+        _histogram = self.histograms[STAGE]
+
+        return (_histogram.get_mean() * 1000.0, _histogram.get_percentile(50) * 1000.0, _histogram.get_percentile(95) * 1000.0, _histogram.get_percentile(99) * 1000.0)
+
+
+    def dump(self, FILENAME):
+        with open(FILENAME, "w") as _file:
+            for _stage, _histogram in self.histograms.items():
+                _file.write("# {0}: {1} samples, mean {2:.3f} ms, p50 {3:.3f} ms, p95 {4:.3f} ms, p99 {5:.3f} ms\n".format(_stage, len(_histogram.samples), *self.get_statistics(_stage)))
+                _file.write("# bin (ms) count\n")
+
+                for _i, _count in enumerate(_histogram.bins):
+                    _file.write("{0} {1:.1f} {2}\n".format(_stage, _i * _histogram.bin_size * 1000.0, _count))
+
+        print("latency histogram written to", FILENAME)
+
+
+    ### callback functions ###
+    @field_has_changed(sf_sensor_mat)
+    def sf_sensor_mat_changed(self):
+        if self.sample_time is None: # first new sample since the last submitted frame
+            self.sample_time = self.clock()
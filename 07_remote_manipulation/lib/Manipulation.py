@@ -7,19 +7,32 @@ import avango.script
 from avango.script import field_has_changed
 import avango.daemon
 
+### import application libraries ###
+from lib.PickCache import PickCache
+from lib.PickingService import PickingService
+from lib.RayBroadPhase import RayBroadPhase
+from lib.PosePredictor import create_tracking_output
+from lib.StationHistory import StationHistory
+from lib.ButtonEvents import ButtonEventQueue
+from lib.TriMeshLoadReport import TRIMESH_LOADER
+
 import math
 
 
+### global variables ###
+PICK_CACHE_EPSILON = 0.001 # in meter; reuse the last pick result while the ray moved less (0.0 disables the pick cache)
 
+## keyboard buttons selecting the manipulation techniques (index into ManipulationManager.technique_table)
+TECHNIQUE_KEYS = {
+    16: 0, # key 1: Virtual-Ray
+    17: 1, # key 2: Virtual-Hand
+    18: 2, # key 3: Go-Go
+    19: 3, # key 4: HOMER
+    }
 
 
-class ManipulationManager(avango.script.Script):
 
-    ## input fields
-    sf_key_1 = avango.SFBool()
-    sf_key_2 = avango.SFBool()
-    sf_key_3 = avango.SFBool()
-    sf_key_4 = avango.SFBool()
+class ManipulationManager(avango.script.Script):
 
     ## constructor
     def __init__(self):
@@ -33,34 +46,50 @@ class ManipulationManager(avango.script.Script):
         TRACKING_TRANSMITTER_OFFSET = avango.gua.make_identity_mat(),
         POINTER_DEVICE_STATION = "",
         HEAD_NODE = None,
+        PICKABLE_LIST = [], # all pickable geometries (enables broad-phase ray culling)
         ):
         
 
         ### variables ###
         self.active_manipulation_technique = None
+        self.latency_monitor = None
 
         ### resources ###
-        self.keyboard_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
-        self.keyboard_sensor.Station.value = "gua-device-keyboard0"
+        if len(PICKABLE_LIST) > 0:
+            self.rayBroadPhase = RayBroadPhase()
 
-        self.sf_key_1.connect_from(self.keyboard_sensor.Button16) # key 1
-        self.sf_key_2.connect_from(self.keyboard_sensor.Button17) # key 2
-        self.sf_key_3.connect_from(self.keyboard_sensor.Button18) # key 3
-        self.sf_key_4.connect_from(self.keyboard_sensor.Button19) # key 4
+            for _node in PICKABLE_LIST:
+                self.rayBroadPhase.register(_node)
+        else:
+            self.rayBroadPhase = None
 
-    
-        ## init manipulation techniques
-        self.virtualRay = VirtualRay()
-        self.virtualRay.my_constructor(SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION)
+        self.pickingService = PickingService() # resolves the ray requests of all techniques once per frame
+        self.pickingService.my_constructor(SCENEGRAPH = SCENEGRAPH, BROAD_PHASE = self.rayBroadPhase)
 
-        self.virtualHand = VirtualHand()
-        self.virtualHand.my_constructor(SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION)
+        self.keyboard_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
+        self.keyboard_sensor.Station.value = "gua-device-keyboard0"
 
-        self.goGo = GoGo()
-        self.goGo.my_constructor(SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION, HEAD_NODE)
+        self.key_queue = ButtonEventQueue(DEVICE_SENSOR = self.keyboard_sensor, BUTTONS = sorted(TECHNIQUE_KEYS.keys()), CALLBACK = self.key_event)
 
-        self.homer = Homer()
-        self.homer.my_constructor(SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION, HEAD_NODE)
+    
+        ## init manipulation techniques (constructed on first activation, incl. their geometries)
+        self.technique_parameters = dict(
+            SCENEGRAPH = SCENEGRAPH,
+            NAVIGATION_NODE = NAVIGATION_NODE,
+            POINTER_TRACKING_STATION = POINTER_TRACKING_STATION,
+            TRACKING_TRANSMITTER_OFFSET = TRACKING_TRANSMITTER_OFFSET,
+            POINTER_DEVICE_STATION = POINTER_DEVICE_STATION,
+            PICKING_SERVICE = self.pickingService,
+            )
+
+        self.technique_table = [ # (name, class, additional constructor parameters)
+            ("Virtual-Ray", VirtualRay, {}),
+            ("Virtual-Hand", VirtualHand, {}),
+            ("Go-Go", GoGo, dict(HEAD_NODE = HEAD_NODE)),
+            ("HOMER", Homer, dict(HEAD_NODE = HEAD_NODE)),
+            ]
+
+        self.techniques = [None] * len(self.technique_table)
         
     
         ### set initial states ###
@@ -69,61 +98,55 @@ class ManipulationManager(avango.script.Script):
 
 
     ### functions ###
+    ## technique INT of the technique table (constructed on first use)
+    def get_manipulation_technique(self, INT):
+        if self.techniques[INT] is None:
+            _name, _class, _parameters = self.technique_table[INT]
+
+            _parameters = dict(self.technique_parameters, **_parameters)
+
+            _technique = _class()
+            _technique.my_constructor(**_parameters)
+
+            if self.latency_monitor is not None:
+                _technique.set_latency_monitor(self.latency_monitor)
+
+            self.techniques[INT] = _technique
+
+        return self.techniques[INT]
+
+
     def set_manipulation_technique(self, INT):
         # possibly disable prior technique
         if self.active_manipulation_technique is not None:
             self.active_manipulation_technique.enable(False)
     
         # enable new technique
-        if INT == 0: # virtual-ray
-            print("switch to Virtual-Ray technique")
-            self.active_manipulation_technique = self.virtualRay
-
-        elif INT == 1: # virtual-hand
-            print("switch to Virtual-Hand technique")
-            self.active_manipulation_technique = self.virtualHand
+        print("switch to " + self.technique_table[INT][0] + " technique")
 
-        elif INT == 2: # go-go
-            print("switch to Go-Go technique")
-            self.active_manipulation_technique = self.goGo
-
-        elif INT == 3: # HOMER
-            print("switch to HOMER technique")
-            self.active_manipulation_technique = self.homer
-            
+        self.active_manipulation_technique = self.get_manipulation_technique(INT)
         self.active_manipulation_technique.enable(True)
 
 
-    ### callback functions ###
-    @field_has_changed(sf_key_1)
-    def sf_key_1_changed(self):
-        if self.sf_key_1.value == True: # key is pressed
-            self.set_manipulation_technique(0) # switch to Virtual-Ray manipulation technique
-            
-
-    @field_has_changed(sf_key_2)
-    def sf_key_2_changed(self):
-        if self.sf_key_2.value == True: # key is pressed
-            self.set_manipulation_technique(1) # switch to Virtual-Hand manipulation technique
-
+    def set_latency_monitor(self, MONITOR):
+        self.latency_monitor = MONITOR # also applied to techniques constructed later
 
-    @field_has_changed(sf_key_3)
-    def sf_key_3_changed(self):
-        if self.sf_key_3.value == True: # key is pressed
-            self.set_manipulation_technique(2) # switch to Go-Go manipulation technique
+        for _technique in self.techniques:
+            if _technique is not None:
+                _technique.set_latency_monitor(MONITOR)
 
 
-    @field_has_changed(sf_key_4)
-    def sf_key_4_changed(self):
-        if self.sf_key_4.value == True: # key is pressed
-            self.set_manipulation_technique(3) # switch to HOMER manipulation technique
+    ### callback functions ###
+    def key_event(self, BUTTON, PRESSED, TIME):
+        if PRESSED == True: # key is pressed
+            self.set_manipulation_technique(TECHNIQUE_KEYS[BUTTON])
 
 
 
 class ManipulationTechnique(avango.script.Script):
 
-    ## input fields
-    sf_button = avango.SFBool()
+    ## internal fields
+    sf_parent_mat = avango.gua.SFMatrix4() # world matrix of the dragged node's parent
 
     ## constructor
     def __init__(self):
@@ -136,6 +159,7 @@ class ManipulationTechnique(avango.script.Script):
         POINTER_TRACKING_STATION = None,
         TRACKING_TRANSMITTER_OFFSET = avango.gua.make_identity_mat(),
         POINTER_DEVICE_STATION = None,
+        PICKING_SERVICE = None,
         ):
 
 
@@ -145,9 +169,15 @@ class ManipulationTechnique(avango.script.Script):
         ### variables ###
         self.enable_flag = False
         
+        self.latency_monitor = None # optional motion-to-photon instrumentation (see lib/LatencyMonitor.py)
+
         ## dragging
         self.dragged_node = None
         self.dragging_offset_mat = avango.gua.make_identity_mat()
+        self.button_time = None # time of the last pointer button edge
+
+        self.parent_node = None # parent of the dragged node
+        self.parent_inverse_mat = None # cached inverse parent world matrix (None if invalid)
                 
         ## picking
         self.pick_result = None
@@ -161,6 +191,18 @@ class ManipulationTechnique(avango.script.Script):
                             | avango.gua.PickingOptions.GET_WORLD_POSITIONS \
                             | avango.gua.PickingOptions.GET_WORLD_NORMALS
 
+        if PICKING_SERVICE is not None: # batched ray test (result available after the service was evaluated)
+            self.pick_request = PICKING_SERVICE.create_request(PICK_OPTIONS = self.pick_options, WHITE_LIST = self.white_list, BLACK_LIST = self.black_list, CACHE_EPSILON = PICK_CACHE_EPSILON)
+            self.pick_cache = None
+
+        else: # immediate ray test
+            self.pick_request = None
+
+            if PICK_CACHE_EPSILON > 0.0:
+                self.pick_cache = PickCache(EPSILON = PICK_CACHE_EPSILON)
+            else:
+                self.pick_cache = None
+
 
         ### resources ###
         self.mode = True
@@ -173,13 +215,15 @@ class ManipulationTechnique(avango.script.Script):
         self.pointer_device_sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
         self.pointer_device_sensor.Station.value = POINTER_DEVICE_STATION
 
-        ## init field connections
-        self.sf_button.connect_from(self.pointer_device_sensor.Button0)
+        self.pointer_history = StationHistory(POINTER_TRACKING_STATION) # sub-frame tracking samples (if the daemon keeps a history)
+
+        self.button_queue = ButtonEventQueue(DEVICE_SENSOR = self.pointer_device_sensor, BUTTONS = [0], CALLBACK = self.button_event) # every press/release, also between frames
 
 
         ## init nodes
         self.pointer_node = avango.gua.nodes.TransformNode(Name = "pointer_node")
-        self.pointer_node.Transform.connect_from(self.pointer_tracking_sensor.Matrix)
+        _sf_pointer_mat, self.pointer_predictor = create_tracking_output(self.pointer_tracking_sensor) # optional jitter filter and latency prediction
+        self.pointer_node.Transform.connect_from(_sf_pointer_mat)
         self.pointer_node.Tags.value = ["invisible"]
         NAVIGATION_NODE.Children.value.append(self.pointer_node)
         
@@ -194,6 +238,12 @@ class ManipulationTechnique(avango.script.Script):
     def enable(self, BOOL):
         self.enable_flag = BOOL
         
+        if self.pick_request is not None:
+            self.pick_request.reset()
+
+        if self.pick_cache is not None:
+            self.pick_cache.invalidate()
+
         if self.enable_flag == True:
             self.pointer_node.Tags.value = [] # set tool visible
         else:
@@ -202,30 +252,93 @@ class ManipulationTechnique(avango.script.Script):
             self.pointer_node.Tags.value = ["invisible"] # set tool invisible
 
 
+    def set_latency_monitor(self, MONITOR):
+        self.latency_monitor = MONITOR
+
+
+    ## pointer world matrix at TIME from the tracking history (current matrix if not available)
+    def get_pointer_mat(self, TIME = None):
+        _sample = self.pointer_history.get_sample_at(TIME) if TIME is not None else None
+
+        if _sample is None:
+            return self.pointer_node.WorldTransform.value
+
+        _station_mat = avango.gua.make_identity_mat()
+
+        for _i, _element in enumerate(_sample[3]):
+            _station_mat.set_element(_i // 4, _i % 4, _element)
+
+        _parent_mat = self.pointer_node.WorldTransform.value * avango.gua.make_inverse_mat(self.pointer_node.Transform.value)
+
+        return _parent_mat * self.pointer_tracking_sensor.TransmitterOffset.value * _station_mat * self.pointer_tracking_sensor.ReceiverOffset.value
+
+
+    ## pointer velocity (in m/s, tracking coordinates) over the last WINDOW sec of the station history, None if not available
+    def get_pointer_velocity(self, WINDOW = 0.05):
+        return self.pointer_history.get_velocity(WINDOW)
+
+
     def calc_pick_result(self, PICK_MAT = avango.gua.make_identity_mat(), PICK_LENGTH = 1.0):
         ## update ray parameters
-        self.ray.Origin.value = PICK_MAT.get_translate()
+        _origin = PICK_MAT.get_translate()
 
         _vec = avango.gua.make_rot_mat(PICK_MAT.get_rotate_scale_corrected()) * avango.gua.Vec3(0.0,0.0,-1.0)
         _vec = avango.gua.Vec3(_vec.x,_vec.y,_vec.z)
 
-        self.ray.Direction.value = _vec * PICK_LENGTH
+        _direction = _vec * PICK_LENGTH
+
+        ## submit to picking service (resolved for this frame's ray)
+        if self.pick_request is not None:
+            self.pick_request.set_ray(_origin, _direction)
+            return self.pick_request.get_pick_result()
+
+        ## reuse last result if the ray (almost) did not move
+        if self.pick_cache is not None:
+            _mf_pick_result = self.pick_cache.lookup(_origin, _origin + _direction)
+
+            if _mf_pick_result is not None:
+                return _mf_pick_result
+
+        self.ray.Origin.value = _origin
+        self.ray.Direction.value = _direction
 
         ## intersect
         _mf_pick_result = self.SCENEGRAPH.ray_test(self.ray, self.pick_options, self.white_list, self.black_list)
 
+        if self.pick_cache is not None:
+            self.pick_cache.store(_origin, _origin + _direction, _mf_pick_result)
+
         return _mf_pick_result    
 
     
     def start_dragging(self, NODE):
         self.dragged_node = NODE        
-        self.dragging_offset_mat = avango.gua.make_inverse_mat(self.pointer_node.WorldTransform.value) * self.dragged_node.WorldTransform.value # object transformation in pointer coordinate system
+        self.dragging_offset_mat = avango.gua.make_inverse_mat(self.get_pointer_mat(self.button_time)) * self.dragged_node.WorldTransform.value # object transformation in pointer coordinate system (at press time)
   
     def stop_dragging(self): 
         self.dragged_node = None
         self.dragging_offset_mat = avango.gua.make_identity_mat()
         self.mode = True
 
+        self.sf_parent_mat.disconnect()
+        self.parent_node = None
+        self.parent_inverse_mat = None
+
+
+    ## inverse world matrix of the dragged node's parent (recomputed only if the parent moved)
+    def get_parent_inverse_mat(self):
+        _parent = self.dragged_node.Parent.value
+
+        if _parent is not self.parent_node: # drag start or dragged node re-parented
+            self.parent_node = _parent
+            self.sf_parent_mat.connect_from(_parent.WorldTransform)
+            self.parent_inverse_mat = None
+
+        if self.parent_inverse_mat is None:
+            self.parent_inverse_mat = avango.gua.make_inverse_mat(self.sf_parent_mat.value)
+
+        return self.parent_inverse_mat
+
 
     def dragging(self, _trans_node, offset = 0.0):
         #print("before ", self.dragging_offset_mat)
@@ -236,18 +349,29 @@ class ManipulationTechnique(avango.script.Script):
         if self.dragged_node is not None: # object to drag
             #self.dragging_offset_mat = avango.gua.make_inverse_mat(self.pointer_node.WorldTransform.value) * self.dragged_node.WorldTransform.value
             _new_mat = _trans_node.WorldTransform.value * self.dragging_offset_mat # new object position in world coodinates
-            _new_mat = avango.gua.make_inverse_mat(self.dragged_node.Parent.value.WorldTransform.value) * _new_mat # transform new object matrix from global to local space
+            _new_mat = self.get_parent_inverse_mat() * _new_mat # transform new object matrix from global to local space
             #print("before: ", _new_mat)
             #_new_mat = avango.gua.make_trans_mat(0,0,offset) * _new_mat
             #print("after: ", _new_mat)
             self.dragged_node.Transform.value = _new_mat
 
+            PickCache.scene_changed() # pickable geometry moved
+
+            if self.latency_monitor is not None:
+                self.latency_monitor.mark_write()
+
 
     ### callback functions ###
 
-    @field_has_changed(sf_button)
-    def sf_button_changed(self):
-        if self.sf_button.value == True: # button pressed
+    @field_has_changed(sf_parent_mat)
+    def sf_parent_mat_changed(self):
+        self.parent_inverse_mat = None # parent moved
+
+
+    def button_event(self, BUTTON, PRESSED, TIME):
+        self.button_time = TIME
+
+        if PRESSED == True: # button pressed
             if self.pick_result is not None: # something was hit
                 _node = self.pick_result.Object.value # get intersected geometry node
                 _node = _node.Parent.value # take the parent node of the geomtry node (the whole object)
@@ -276,9 +400,10 @@ class VirtualRay(ManipulationTechnique):
         POINTER_TRACKING_STATION = None,
         TRACKING_TRANSMITTER_OFFSET = avango.gua.make_identity_mat(),
         POINTER_DEVICE_STATION = None,
+        PICKING_SERVICE = None,
         ):
 
-        ManipulationTechnique.my_constructor(self, SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION) # call base class constructor
+        ManipulationTechnique.my_constructor(self, SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION, PICKING_SERVICE) # call base class constructor
 
 
         ### additional parameters ###
@@ -291,7 +416,7 @@ class VirtualRay(ManipulationTechnique):
 
 
         ### additional resources ###
-        _loader = avango.gua.nodes.TriMeshLoader()
+        _loader = TRIMESH_LOADER # shared trimesh loader (load report)
 
         self.ray_geometry = _loader.create_geometry_from_file("ray_geometry", "data/objects/cylinder.obj", avango.gua.LoaderFlags.DEFAULTS)
         self.ray_geometry.Transform.value = \
@@ -343,6 +468,9 @@ class VirtualRay(ManipulationTechnique):
     def evaluate(self): # implement respective base-class function
         if self.enable_flag == False:
             return
+
+        if self.latency_monitor is not None:
+            self.latency_monitor.mark_evaluate() # evaluation of the current tracking sample starts
     
 
         ## calc ray intersection
@@ -391,12 +519,13 @@ class VirtualHand(ManipulationTechnique): #funktioniert
         POINTER_TRACKING_STATION = None,
         TRACKING_TRANSMITTER_OFFSET = avango.gua.make_identity_mat(),
         POINTER_DEVICE_STATION = None,
+        PICKING_SERVICE = None,
         ):
 
-        ManipulationTechnique.my_constructor(self, SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION) # call base class constructor
+        ManipulationTechnique.my_constructor(self, SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION, PICKING_SERVICE) # call base class constructor
 
         ### further resources ###
-        _loader = avango.gua.nodes.TriMeshLoader()
+        _loader = TRIMESH_LOADER # shared trimesh loader (load report)
 
 
         self.hand_geometry = _loader.create_geometry_from_file("hand_geometry", "data/objects/hand.obj", avango.gua.LoaderFlags.DEFAULTS)
@@ -427,6 +556,9 @@ class VirtualHand(ManipulationTechnique): #funktioniert
         if self.enable_flag == False:
             return
 
+        if self.latency_monitor is not None:
+            self.latency_monitor.mark_evaluate()
+
         _mf_pick_result = self.calc_pick_result(PICK_MAT = self.pointer_node.WorldTransform.value)
     
         if len(_mf_pick_result.value) > 0: # intersection found
@@ -456,9 +588,10 @@ class GoGo(ManipulationTechnique): #effektiv HOMER aber mit Treshhold
         TRACKING_TRANSMITTER_OFFSET = avango.gua.make_identity_mat(),
         POINTER_DEVICE_STATION = None,
         HEAD_NODE = None,
+        PICKING_SERVICE = None,
         ):
 
-        ManipulationTechnique.my_constructor(self, SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION) # call base class constructor
+        ManipulationTechnique.my_constructor(self, SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION, PICKING_SERVICE) # call base class constructor
 
 
         ### external references ###
@@ -484,7 +617,7 @@ class GoGo(ManipulationTechnique): #effektiv HOMER aber mit Treshhold
        
         
         ### further resources ###
-        _loader = avango.gua.nodes.TriMeshLoader()
+        _loader = TRIMESH_LOADER # shared trimesh loader (load report)
 
 
         self.hand_geometry = _loader.create_geometry_from_file("hand_geometry", "data/objects/hand.obj", avango.gua.LoaderFlags.DEFAULTS)
@@ -508,6 +641,9 @@ class GoGo(ManipulationTechnique): #effektiv HOMER aber mit Treshhold
         if self.enable_flag == False:
             return
 
+        if self.latency_monitor is not None:
+            self.latency_monitor.mark_evaluate()
+
         self.head_to_pointer_offset = self.HEAD_NODE.WorldTransform.value.get_translate().z - self.pointer_node.WorldTransform.value.get_translate().z
 
         if self.head_to_pointer_offset<0 :
@@ -567,9 +703,10 @@ class Homer(ManipulationTechnique): #ray-controll, aber nach Pick Hand mit "unse
         TRACKING_TRANSMITTER_OFFSET = avango.gua.make_identity_mat(),
         POINTER_DEVICE_STATION = None,
         HEAD_NODE = None,
+        PICKING_SERVICE = None,
         ):
 
-        ManipulationTechnique.my_constructor(self, SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION) # call base class constructor
+        ManipulationTechnique.my_constructor(self, SCENEGRAPH, NAVIGATION_NODE, POINTER_TRACKING_STATION, TRACKING_TRANSMITTER_OFFSET, POINTER_DEVICE_STATION, PICKING_SERVICE) # call base class constructor
 
 
         ### external references ###
@@ -593,7 +730,7 @@ class Homer(ManipulationTechnique): #ray-controll, aber nach Pick Hand mit "unse
        
         
         ### further resources ###
-        _loader = avango.gua.nodes.TriMeshLoader()
+        _loader = TRIMESH_LOADER # shared trimesh loader (load report)
 
         ## ToDo: init hand node(s) here
         # ...
@@ -658,6 +795,9 @@ class Homer(ManipulationTechnique): #ray-controll, aber nach Pick Hand mit "unse
         # ...
         if self.enable_flag == False:
             return
+
+        if self.latency_monitor is not None:
+            self.latency_monitor.mark_evaluate()
     
         #print(self.hand_transform.Transform.value)
         ## calc ray intersection
@@ -0,0 +1,74 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+
+
+## Caches the last ray intersection result of a manipulation technique.
+# A cached result is reused as long as both ray end points moved less than
+# EPSILON since the ray was tested and the scenegraph generation did not
+# change. Code that transforms pickable nodes has to call
+# PickCache.scene_changed().
+class PickCache:
+
+    ## scenegraph-change generation shared by all pick caches
+    scene_generation = 0
+
+    ## constructor
+    def __init__(self,
+        EPSILON = 0.001, # in meter
+        ):
+
+        ### parameters ###
+        self.epsilon = EPSILON
+
+
+        ### variables ###
+        self.ray_start = None
+        self.ray_end = None
+        self.generation = -1
+        self.mf_pick_result = None
+
+        ## statistics
+        self.hits = 0
+        self.misses = 0
+
+
+    ### functions ###
+    @staticmethod
+    def scene_changed():
+        PickCache.scene_generation += 1
+
+
+    def invalidate(self):
+        self.mf_pick_result = None
+
+
+    ## returns the cached result for the given ray or None (cache miss)
+    def lookup(self, RAY_START, RAY_END):
+        if self.mf_pick_result is not None \
+            and self.generation == PickCache.scene_generation \
+            and (RAY_START - self.ray_start).length() < self.epsilon \
+            and (RAY_END - self.ray_end).length() < self.epsilon:
+            self.hits += 1
+            return self.mf_pick_result
+
+        self.misses += 1
+        return None
+
+
+    def store(self, RAY_START, RAY_END, MF_PICK_RESULT):
+        self.ray_start = RAY_START
+        self.ray_end = RAY_END
+        self.generation = PickCache.scene_generation
+        self.mf_pick_result = MF_PICK_RESULT
+
+
+    def get_hit_rate(self):
+        _total = self.hits + self.misses
+
+        if _total == 0:
+            return 0.0
+
+        return float(self.hits) / _total
@@ -0,0 +1,213 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+import avango.script
+from avango.script import field_has_changed
+
+### import application libraries
+from lib.PickCache import PickCache
+
+
+
+## A ray request registered at a PickingService. The owner sets the ray and
+# reads the intersection result of this ray with get_pick_result(); requests
+# not read in the frame are resolved when the service is evaluated.
+class PickRequest(avango.script.Script):
+
+    ## input fields
+    sf_ray_origin = avango.gua.SFVec3()
+    sf_ray_direction = avango.gua.SFVec3() # scaled by pick length
+
+    ## output fields
+    mf_pick_result = avango.gua.MFPickResult()
+
+
+    ## constructor
+    def __init__(self):
+        self.super(PickRequest).__init__()
+
+
+    def my_constructor(self,
+        SERVICE = None,
+        PICK_OPTIONS = avango.gua.PickingOptions.PICK_ONLY_FIRST_OBJECT,
+        WHITE_LIST = [],
+        BLACK_LIST = [],
+        CACHE_EPSILON = 0.0, # in meter (0.0 disables the pick cache)
+        ):
+
+        ### external references ###
+        self.SERVICE = SERVICE
+
+
+        ### parameters ###
+        self.pick_options = PICK_OPTIONS
+        self.white_list = WHITE_LIST
+        self.black_list = BLACK_LIST
+
+
+        ### variables ###
+        self.pending = False
+
+        if CACHE_EPSILON > 0.0:
+            self.pick_cache = PickCache(EPSILON = CACHE_EPSILON)
+        else:
+            self.pick_cache = None
+
+
+    ### functions ###
+    def set_ray(self, ORIGIN, DIRECTION):
+        self.sf_ray_origin.value = ORIGIN
+        self.sf_ray_direction.value = DIRECTION
+
+
+    ## intersection result of the current ray (resolves pending requests in the same frame)
+    def get_pick_result(self):
+        if self.pending == True:
+            self.SERVICE.resolve()
+
+        return self.mf_pick_result
+
+
+    def reset(self):
+        self.pending = False
+        self.mf_pick_result.value = []
+
+        if self.pick_cache is not None:
+            self.pick_cache.invalidate()
+
+
+    ### callback functions ###
+    @field_has_changed(sf_ray_origin)
+    def sf_ray_origin_changed(self):
+        self.submit()
+
+
+    @field_has_changed(sf_ray_direction)
+    def sf_ray_direction_changed(self):
+        self.submit()
+
+
+    def submit(self):
+        if self.pending == False:
+            self.pending = True
+            self.SERVICE.sf_pending.touch() # schedule service evaluation
+
+
+
+## Collects the ray requests issued during a frame and resolves them in one
+# pass. Requests with identical rays share one ray test and requests whose
+# ray (almost) did not move reuse their cached result. With a broad phase
+# (see RayBroadPhase), rays missing all pickable bounding boxes are not tested
+# and the hit candidates are passed as white-list. Reading a request's result
+# resolves all requests pending at that time; the remaining ones are resolved
+# when the service is evaluated.
+class PickingService(avango.script.Script):
+
+    ## internal fields
+    sf_pending = avango.SFBool()
+
+
+    ## constructor
+    def __init__(self):
+        self.super(PickingService).__init__()
+
+
+    def my_constructor(self,
+        SCENEGRAPH = None,
+        BROAD_PHASE = None,
+        ):
+
+        ### external references ###
+        self.SCENEGRAPH = SCENEGRAPH
+        self.BROAD_PHASE = BROAD_PHASE
+
+
+        ### variables ###
+        self.requests = []
+
+        ## statistics
+        self.ray_tests = 0
+        self.resolved_requests = 0
+
+
+        ### resources ###
+        self.ray = avango.gua.nodes.Ray() # required for trimesh intersection
+
+        self.empty_pick_result = avango.gua.MFPickResult() # result of culled rays
+
+
+    ### functions ###
+    def create_request(self, PICK_OPTIONS = avango.gua.PickingOptions.PICK_ONLY_FIRST_OBJECT, WHITE_LIST = [], BLACK_LIST = [], CACHE_EPSILON = 0.0):
+        _request = PickRequest()
+        _request.my_constructor(SERVICE = self, PICK_OPTIONS = PICK_OPTIONS, WHITE_LIST = WHITE_LIST, BLACK_LIST = BLACK_LIST, CACHE_EPSILON = CACHE_EPSILON)
+
+        self.requests.append(_request)
+
+        return _request
+
+
+    def remove_request(self, REQUEST):
+        if REQUEST in self.requests:
+            self.requests.remove(REQUEST)
+
+
+    def resolve(self):
+        _batch = {} # ray key -> pick result of this pass
+
+        for _request in self.requests:
+            if _request.pending == False:
+                continue
+
+            _request.pending = False
+            self.resolved_requests += 1
+
+            _origin = _request.sf_ray_origin.value
+            _direction = _request.sf_ray_direction.value
+            _end = _origin + _direction
+
+            ## reuse last result if the ray (almost) did not move
+            if _request.pick_cache is not None:
+                _mf_pick_result = _request.pick_cache.lookup(_origin, _end)
+
+                if _mf_pick_result is not None:
+                    continue
+
+            _key = (_origin.x, _origin.y, _origin.z, _direction.x, _direction.y, _direction.z, _request.pick_options, tuple(_request.white_list), tuple(_request.black_list))
+
+            if _key not in _batch:
+                _batch[_key] = self.ray_test(_origin, _direction, _request.pick_options, _request.white_list, _request.black_list)
+
+            _mf_pick_result = _batch[_key]
+
+            if _request.pick_cache is not None:
+                _request.pick_cache.store(_origin, _end, _mf_pick_result)
+
+            _request.mf_pick_result.value = _mf_pick_result.value
+
+
+    def ray_test(self, ORIGIN, DIRECTION, PICK_OPTIONS, WHITE_LIST, BLACK_LIST):
+        _white_list = WHITE_LIST
+
+        ## broad phase: cull rays missing all pickable nodes, narrow down candidates otherwise
+        if self.BROAD_PHASE is not None:
+            _candidate_tags = self.BROAD_PHASE.get_candidate_tags(ORIGIN, DIRECTION)
+
+            if len(_candidate_tags) == 0:
+                return self.empty_pick_result
+
+            if len(WHITE_LIST) == 0 and len(_candidate_tags) < self.BROAD_PHASE.get_num_nodes():
+                _white_list = _candidate_tags
+
+        self.ray.Origin.value = ORIGIN
+        self.ray.Direction.value = DIRECTION
+
+        self.ray_tests += 1
+
+        return self.SCENEGRAPH.ray_test(self.ray, PICK_OPTIONS, _white_list, BLACK_LIST)
+
+
+    ### callback functions ###
+    def evaluate(self): # evaluated once per frame if any request was submitted (resolves requests not read yet)
+        self.resolve()
@@ -0,0 +1,304 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+import avango.script
+from avango.script import field_has_changed
+
+### import application libraries
+from lib.StationHistory import StationHistory
+
+### import python libraries
+import math
+
+
+### global variables ###
+## predictor parameters per tracking station (stations not listed are connected unfiltered)
+#   min_cutoff: cutoff frequency at rest (in Hz, lower removes more jitter)
+#   beta: cutoff increase with speed (in Hz per m/s resp. rad/s, higher reduces lag during motions)
+#   d_cutoff: cutoff frequency of the velocity estimate (in Hz)
+#   prediction_time: extrapolation towards the expected display time (in sec)
+STATION_PARAMETERS = {
+    "tracking-art-pointer-1": {"min_cutoff": 1.0, "beta": 300.0, "d_cutoff": 1.0, "prediction_time": 0.025},
+    "tracking-art-pointer-2": {"min_cutoff": 1.0, "beta": 300.0, "d_cutoff": 1.0, "prediction_time": 0.025},
+    "tracking-art-pointer-3": {"min_cutoff": 1.0, "beta": 300.0, "d_cutoff": 1.0, "prediction_time": 0.025},
+    "tracking-pst-pointer-1": {"min_cutoff": 1.0, "beta": 300.0, "d_cutoff": 1.0, "prediction_time": 0.035},
+    "tracking-art-glasses-1": {"min_cutoff": 0.5, "beta": 100.0, "d_cutoff": 1.0, "prediction_time": 0.025},
+    "tracking-art-glasses-2": {"min_cutoff": 0.5, "beta": 100.0, "d_cutoff": 1.0, "prediction_time": 0.025},
+    "tracking-pst-glasses-1": {"min_cutoff": 0.5, "beta": 100.0, "d_cutoff": 1.0, "prediction_time": 0.035},
+    }
+
+
+
+### helper functions ###
+
+## smoothing factor of an exponential low-pass filter with cutoff frequency CUTOFF (in Hz) for time step DT
+def get_alpha(CUTOFF, DT):
+    _tau = 1.0 / (2.0 * math.pi * CUTOFF)
+    return 1.0 / (1.0 + _tau / DT)
+
+
+## quaternions are (w, x, y, z) tuples
+def quat_multiply(Q1, Q2):
+    _w1, _x1, _y1, _z1 = Q1
+    _w2, _x2, _y2, _z2 = Q2
+
+    return (
+        _w1 * _w2 - _x1 * _x2 - _y1 * _y2 - _z1 * _z2,
+        _w1 * _x2 + _x1 * _w2 + _y1 * _z2 - _z1 * _y2,
+        _w1 * _y2 - _x1 * _z2 + _y1 * _w2 + _z1 * _x2,
+        _w1 * _z2 + _x1 * _y2 - _y1 * _x2 + _z1 * _w2)
+
+
+def quat_conjugate(Q):
+    return (Q[0], -Q[1], -Q[2], -Q[3])
+
+
+def quat_normalize(Q):
+    _length = math.sqrt(Q[0] * Q[0] + Q[1] * Q[1] + Q[2] * Q[2] + Q[3] * Q[3])
+
+    if _length == 0.0:
+        return (1.0, 0.0, 0.0, 0.0)
+
+    return (Q[0] / _length, Q[1] / _length, Q[2] / _length, Q[3] / _length)
+
+
+## rotation vector (axis * angle in radians) of a unit quaternion (shortest rotation)
+def quat_to_rotation_vector(Q):
+    if Q[0] < 0.0:
+        Q = (-Q[0], -Q[1], -Q[2], -Q[3])
+
+    _sin = math.sqrt(Q[1] * Q[1] + Q[2] * Q[2] + Q[3] * Q[3])
+
+    if _sin < 1.0e-12:
+        return (0.0, 0.0, 0.0)
+
+    _scale = 2.0 * math.atan2(_sin, Q[0]) / _sin
+
+    return (Q[1] * _scale, Q[2] * _scale, Q[3] * _scale)
+
+
+def quat_from_rotation_vector(V):
+    _angle = math.sqrt(V[0] * V[0] + V[1] * V[1] + V[2] * V[2])
+
+    if _angle < 1.0e-12:
+        return (1.0, 0.0, 0.0, 0.0)
+
+    _scale = math.sin(_angle * 0.5) / _angle
+
+    return (math.cos(_angle * 0.5), V[0] * _scale, V[1] * _scale, V[2] * _scale)
+
+
+## angle (in degrees) between two orientations
+def get_angle(Q1, Q2):
+    _v = quat_to_rotation_vector(quat_multiply(Q2, quat_conjugate(Q1)))
+    return math.degrees(math.sqrt(_v[0] * _v[0] + _v[1] * _v[1] + _v[2] * _v[2]))
+
+
+def matrix_to_pose(MAT):
+    _t = MAT.get_translate()
+    _q = MAT.get_rotate()
+
+    return (_t.x, _t.y, _t.z), quat_normalize((_q.w, _q.x, _q.y, _q.z))
+
+
+def pose_to_matrix(POSITION, QUAT):
+    _mat = avango.gua.make_trans_mat(POSITION[0], POSITION[1], POSITION[2])
+    _sin = math.sqrt(QUAT[1] * QUAT[1] + QUAT[2] * QUAT[2] + QUAT[3] * QUAT[3])
+
+    if _sin < 1.0e-12: # no rotation
+        return _mat
+
+    return _mat * avango.gua.make_rot_mat(math.degrees(2.0 * math.atan2(_sin, QUAT[0])), QUAT[1] / _sin, QUAT[2] / _sin, QUAT[3] / _sin)
+
+
+
+## One-Euro filter (Casiez et al. 2012) for position and orientation samples
+# with constant-velocity prediction. The cutoff frequency rises with the
+# filtered speed, so jitter at rest is removed while fast motions lag little;
+# the filtered velocities extrapolate the pose by PREDICTION_TIME.
+class PosePredictor:
+
+    ## constructor
+    def __init__(self,
+        MIN_CUTOFF = 1.0, # in Hz
+        BETA = 1.0,
+        D_CUTOFF = 1.0, # in Hz
+        PREDICTION_TIME = 0.0, # in sec
+        ):
+
+        ### parameters ###
+        self.min_cutoff = MIN_CUTOFF
+        self.beta = BETA
+        self.d_cutoff = D_CUTOFF
+        self.prediction_time = PREDICTION_TIME
+
+
+        ### variables ###
+        self.reset()
+
+
+    ### functions ###
+    def reset(self):
+        self.last_time = None
+        self.last_position = None # raw sample
+        self.last_quat = None
+        self.position = None # filtered
+        self.quat = None
+        self.velocity = (0.0, 0.0, 0.0) # filtered, in m/s
+        self.angular_velocity = (0.0, 0.0, 0.0) # filtered rotation vector per sec
+
+
+    ## filter sample (POSITION, QUAT) taken at TIME (in sec); returns the predicted pose
+    def update(self, POSITION, QUAT, TIME):
+        if self.last_time is None or TIME <= self.last_time: # first (or repeated) sample
+            if self.last_time is None:
+                self.position = POSITION
+                self.quat = QUAT
+                self.last_position = POSITION
+                self.last_quat = QUAT
+                self.last_time = TIME
+
+            return self.predict()
+
+        _dt = TIME - self.last_time
+        _alpha_d = get_alpha(self.d_cutoff, _dt)
+
+        ## translation
+        _velocity = [(POSITION[_i] - self.last_position[_i]) / _dt for _i in range(3)]
+        self.velocity = tuple([self.velocity[_i] + _alpha_d * (_velocity[_i] - self.velocity[_i]) for _i in range(3)])
+
+        _speed = math.sqrt(self.velocity[0] * self.velocity[0] + self.velocity[1] * self.velocity[1] + self.velocity[2] * self.velocity[2])
+        _alpha = get_alpha(self.min_cutoff + self.beta * _speed, _dt)
+        self.position = tuple([self.position[_i] + _alpha * (POSITION[_i] - self.position[_i]) for _i in range(3)])
+
+        ## rotation (low-pass along the shortest rotation towards the sample)
+        _delta = quat_to_rotation_vector(quat_multiply(QUAT, quat_conjugate(self.last_quat)))
+        self.angular_velocity = tuple([self.angular_velocity[_i] + _alpha_d * (_delta[_i] / _dt - self.angular_velocity[_i]) for _i in range(3)])
+
+        _angular_speed = math.sqrt(self.angular_velocity[0] * self.angular_velocity[0] + self.angular_velocity[1] * self.angular_velocity[1] + self.angular_velocity[2] * self.angular_velocity[2])
+        _alpha = get_alpha(self.min_cutoff + self.beta * _angular_speed, _dt)
+        _error = quat_to_rotation_vector(quat_multiply(QUAT, quat_conjugate(self.quat)))
+        self.quat = quat_normalize(quat_multiply(quat_from_rotation_vector([_e * _alpha for _e in _error]), self.quat))
+
+        self.last_position = POSITION
+        self.last_quat = QUAT
+        self.last_time = TIME
+
+        return self.predict()
+
+
+    ## filtered pose extrapolated by prediction_time (constant linear and angular velocity)
+    def predict(self):
+        _t = self.prediction_time
+
+        if _t == 0.0:
+            return self.position, self.quat
+
+        _position = tuple([self.position[_i] + self.velocity[_i] * _t for _i in range(3)])
+        _quat = quat_normalize(quat_multiply(quat_from_rotation_vector([_w * _t for _w in self.angular_velocity]), self.quat))
+
+        return _position, _quat
+
+
+
+## Predictor stage between a DeviceSensor matrix and a transform node:
+# node.Transform.connect_from(TrackingPredictor.sf_output_mat)
+# Samples are stamped with the time the daemon took them (station history)
+# resp. with the frame time; repeated samples are skipped.
+class TrackingPredictor(avango.script.Script):
+
+    ## input fields
+    sf_input_mat = avango.gua.SFMatrix4()
+
+    ## output fields
+    sf_output_mat = avango.gua.SFMatrix4()
+
+    ## constructor
+    def __init__(self):
+        self.super(TrackingPredictor).__init__()
+
+
+    def my_constructor(self,
+        SF_INPUT_MAT = None,
+        STATION = "", # tracking station (sample times from its history, if the daemon keeps one)
+        MIN_CUTOFF = 1.0, # in Hz
+        BETA = 1.0,
+        D_CUTOFF = 1.0, # in Hz
+        PREDICTION_TIME = 0.0, # in sec
+        ):
+
+        ### variables ###
+        self.history_times = False # sample times taken from the history (not comparable with frame times)
+
+
+        ### resources ###
+        self.predictor = PosePredictor(MIN_CUTOFF, BETA, D_CUTOFF, PREDICTION_TIME)
+        self.history = StationHistory(STATION)
+        self.time_sensor = avango.nodes.TimeSensor() # frame clock
+
+        self.sf_output_mat.value = avango.gua.make_identity_mat()
+
+
+        ### init field connections ###
+        if SF_INPUT_MAT is not None:
+            self.sf_input_mat.connect_from(SF_INPUT_MAT)
+
+
+    ### functions ###
+    ## time (in sec) the current sample was taken, None if it is no new sample
+    def get_sample_time(self):
+        if self.history.is_available() == True:
+            _samples = self.history.read()
+
+            if self.history_times == False: # switch of time base
+                self.history_times = True
+                self.predictor.reset()
+
+            if len(_samples) == 0:
+                return None
+
+            return _samples[-1][0]
+
+        return self.time_sensor.Time.value
+
+
+    ### callback functions ###
+    @field_has_changed(sf_input_mat)
+    def sf_input_mat_changed(self):
+        _position, _quat = matrix_to_pose(self.sf_input_mat.value)
+
+        if _position == self.predictor.last_position and _quat == self.predictor.last_quat: # re-published sample
+            return
+
+        _time = self.get_sample_time()
+
+        if _time is None:
+            return
+
+        _position, _quat = self.predictor.update(_position, _quat, _time)
+
+        self.sf_output_mat.value = pose_to_matrix(_position, _quat)
+
+
+
+## Matrix field of a tracking sensor, filtered and predicted if the station is
+# configured in STATION_PARAMETERS. Returns (matrix field, predictor or None).
+def create_tracking_output(SENSOR):
+    _parameters = STATION_PARAMETERS.get(SENSOR.Station.value)
+
+    if _parameters is None:
+        return SENSOR.Matrix, None
+
+    _predictor = TrackingPredictor()
+    _predictor.my_constructor(
+        SF_INPUT_MAT = SENSOR.Matrix,
+        STATION = SENSOR.Station.value,
+        MIN_CUTOFF = _parameters["min_cutoff"],
+        BETA = _parameters["beta"],
+        D_CUTOFF = _parameters["d_cutoff"],
+        PREDICTION_TIME = _parameters["prediction_time"],
+        )
+
+    return _predictor.sf_output_mat, _predictor
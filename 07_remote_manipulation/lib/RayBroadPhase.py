@@ -0,0 +1,263 @@
+#!/usr/bin/python
+
+### import guacamole libraries
+import avango
+import avango.gua
+import avango.script
+from avango.script import field_has_changed
+
+
+
+## Reports world transformation changes of a registered node to the broad phase.
+class BroadPhaseWatcher(avango.script.Script):
+
+    ## input fields
+    sf_world_mat = avango.gua.SFMatrix4()
+
+
+    ## constructor
+    def __init__(self):
+        self.super(BroadPhaseWatcher).__init__()
+
+
+    def my_constructor(self, BROAD_PHASE, NODE):
+
+        ### external references ###
+        self.BROAD_PHASE = BROAD_PHASE
+        self.NODE = NODE
+
+        ## init field connections
+        self.sf_world_mat.connect_from(NODE.WorldTransform)
+
+
+    ### callback functions ###
+    @field_has_changed(sf_world_mat)
+    def sf_world_mat_changed(self):
+        self.BROAD_PHASE.mark_dirty(self.NODE)
+
+
+
+class _TreeNode:
+
+    __slots__ = ("bb_min", "bb_max", "left", "right", "parent", "leaf")
+
+    def __init__(self):
+        self.bb_min = [0.0, 0.0, 0.0]
+        self.bb_max = [0.0, 0.0, 0.0]
+        self.left = None
+        self.right = None
+        self.parent = None
+        self.leaf = None # registered node (leaves only)
+
+
+
+## Bounding-volume hierarchy over the world bounding boxes of pickable nodes.
+# Moved nodes only refit their leaf and its ancestors; the tree is rebuilt
+# once the number of refits exceeds the number of nodes. All pickable nodes of
+# the scene have to be registered, since rays missing every box are not tested.
+# A registered node's tag is added to all nodes of its subtree.
+class RayBroadPhase:
+
+    ## constructor
+    def __init__(self,
+        TAG_PREFIX = "broad_phase_", # unique per-node tags for the dynamic white-list
+        ):
+
+        ### parameters ###
+        self.tag_prefix = TAG_PREFIX
+
+
+        ### variables ###
+        self.nodes = []
+        self.node_tags = {} # node -> white-list tag
+        self.leaves = {} # node -> tree leaf
+        self.watchers = []
+
+        self.root = None
+        self.dirty_nodes = set()
+        self.needs_rebuild = True
+        self.refits = 0
+
+        ## statistics
+        self.queries = 0
+        self.culled_queries = 0
+
+
+    ### functions ###
+    def register(self, NODE):
+        if NODE in self.node_tags:
+            return
+
+        _tag = self.tag_prefix + str(len(self.nodes))
+
+        ## white-lists are checked on the geometry nodes themselves --> tag the
+        # whole subtree (loaders return a transform node with one child per mesh)
+        _stack = [NODE]
+
+        while len(_stack) > 0:
+            _node = _stack.pop()
+            _node.Tags.value = list(_node.Tags.value) + [_tag]
+            _stack.extend(_node.Children.value)
+
+        self.nodes.append(NODE)
+        self.node_tags[NODE] = _tag
+        self.needs_rebuild = True
+
+        _watcher = BroadPhaseWatcher()
+        _watcher.my_constructor(self, NODE)
+        self.watchers.append(_watcher)
+
+
+    def get_num_nodes(self):
+        return len(self.nodes)
+
+
+    def mark_dirty(self, NODE):
+        self.dirty_nodes.add(NODE)
+
+
+    def get_bounds(self, NODE):
+        _bb = NODE.BoundingBox.value
+
+        if _bb.Min.x > _bb.Max.x or _bb.Min.y > _bb.Max.y or _bb.Min.z > _bb.Max.z: # bounding box not (yet) valid --> always a candidate
+            return [-1.0e30, -1.0e30, -1.0e30], [1.0e30, 1.0e30, 1.0e30]
+
+        return [_bb.Min.x, _bb.Min.y, _bb.Min.z], [_bb.Max.x, _bb.Max.y, _bb.Max.z]
+
+
+    def rebuild(self):
+        self.leaves = {}
+        _leaves = []
+
+        for _node in self.nodes:
+            _leaf = _TreeNode()
+            _leaf.bb_min, _leaf.bb_max = self.get_bounds(_node)
+            _leaf.leaf = _node
+
+            self.leaves[_node] = _leaf
+            _leaves.append(_leaf)
+
+        self.root = self.build_subtree(_leaves)
+
+        self.dirty_nodes = set()
+        self.needs_rebuild = False
+        self.refits = 0
+
+
+    ## top-down build (median split along the longest axis of the leaf centers)
+    def build_subtree(self, LEAVES):
+        if len(LEAVES) == 0:
+            return None
+
+        if len(LEAVES) == 1:
+            return LEAVES[0]
+
+        _min = [min([_leaf.bb_min[_i] + _leaf.bb_max[_i] for _leaf in LEAVES]) for _i in range(3)]
+        _max = [max([_leaf.bb_min[_i] + _leaf.bb_max[_i] for _leaf in LEAVES]) for _i in range(3)]
+        _axis = max(range(3), key = lambda _i: _max[_i] - _min[_i])
+
+        _sorted = sorted(LEAVES, key = lambda _leaf: _leaf.bb_min[_axis] + _leaf.bb_max[_axis])
+        _half = len(_sorted) // 2
+
+        _node = _TreeNode()
+        _node.left = self.build_subtree(_sorted[:_half])
+        _node.right = self.build_subtree(_sorted[_half:])
+        _node.left.parent = _node
+        _node.right.parent = _node
+        self.fit(_node)
+
+        return _node
+
+
+    def fit(self, TREE_NODE):
+        _left = TREE_NODE.left
+        _right = TREE_NODE.right
+
+        TREE_NODE.bb_min = [min(_left.bb_min[_i], _right.bb_min[_i]) for _i in range(3)]
+        TREE_NODE.bb_max = [max(_left.bb_max[_i], _right.bb_max[_i]) for _i in range(3)]
+
+
+    ## refit leaves of moved nodes and their ancestors
+    def update(self):
+        if self.needs_rebuild == True or self.refits > len(self.nodes):
+            self.rebuild()
+            return
+
+        for _node in self.dirty_nodes:
+            _leaf = self.leaves[_node]
+            _leaf.bb_min, _leaf.bb_max = self.get_bounds(_node)
+
+            _parent = _leaf.parent
+
+            while _parent is not None:
+                self.fit(_parent)
+                _parent = _parent.parent
+
+            self.refits += 1
+
+        self.dirty_nodes = set()
+
+
+    ## slab test of the ray segment ORIGIN + t * DIRECTION (t in [0,1]) against a box
+    def intersects(self, ORIGIN, INV_DIRECTION, BB_MIN, BB_MAX):
+        _t_min = 0.0
+        _t_max = 1.0
+
+        for _i in range(3):
+            if INV_DIRECTION[_i] is None: # ray parallel to slab
+                if ORIGIN[_i] < BB_MIN[_i] or ORIGIN[_i] > BB_MAX[_i]:
+                    return False
+                continue
+
+            _t_1 = (BB_MIN[_i] - ORIGIN[_i]) * INV_DIRECTION[_i]
+            _t_2 = (BB_MAX[_i] - ORIGIN[_i]) * INV_DIRECTION[_i]
+
+            if _t_1 > _t_2:
+                _t_1, _t_2 = _t_2, _t_1
+
+            _t_min = max(_t_min, _t_1)
+            _t_max = min(_t_max, _t_2)
+
+            if _t_min > _t_max:
+                return False
+
+        return True
+
+
+    ## nodes whose world bounding box is hit by the ray (DIRECTION scaled by pick length)
+    def get_candidates(self, ORIGIN, DIRECTION):
+        if self.needs_rebuild == True or len(self.dirty_nodes) > 0:
+            self.update()
+
+        self.queries += 1
+
+        _candidates = []
+
+        if self.root is None:
+            return _candidates
+
+        _origin = (ORIGIN.x, ORIGIN.y, ORIGIN.z)
+        _inv_direction = tuple([(1.0 / _d) if _d != 0.0 else None for _d in (DIRECTION.x, DIRECTION.y, DIRECTION.z)])
+
+        _stack = [self.root]
+
+        while len(_stack) > 0:
+            _tree_node = _stack.pop()
+
+            if self.intersects(_origin, _inv_direction, _tree_node.bb_min, _tree_node.bb_max) == False:
+                continue
+
+            if _tree_node.leaf is not None:
+                _candidates.append(_tree_node.leaf)
+            else:
+                _stack.append(_tree_node.left)
+                _stack.append(_tree_node.right)
+
+        if len(_candidates) == 0:
+            self.culled_queries += 1
+
+        return _candidates
+
+
+    def get_candidate_tags(self, ORIGIN, DIRECTION):
+        return [self.node_tags[_node] for _node in self.get_candidates(ORIGIN, DIRECTION)]
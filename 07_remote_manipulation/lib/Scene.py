@@ -6,6 +6,9 @@ import avango.gua
 import avango.script
 from avango.script import field_has_changed
 
+### import application libraries
+from lib.PickCache import PickCache
+
 ### import python libraries
 
 
@@ -53,6 +56,9 @@ class Scene:
         ### external reference ###
         self.PARENT_NODE = PARENT_NODE
 
+        ### variables ###
+        self.pickable_list = [] # geometries loaded with MAKE_PICKABLE
+
         ### resources ###                
         self.script = SceneScript()
         self.script.my_constructor(self)
@@ -96,6 +102,7 @@ class Scene:
             avango.gua.make_scale_mat(0.0003)
         self.table.add_and_init_field(avango.gua.SFMatrix4(), "HomeMatrix", self.table.Transform.value)
         PARENT_NODE.Children.value.append(self.table)
+        self.pickable_list.append(self.table)
         
 
         # notebook
@@ -106,6 +113,7 @@ class Scene:
             avango.gua.make_scale_mat(0.011)
         self.notebook.add_and_init_field(avango.gua.SFMatrix4(), "HomeMatrix", self.notebook.Transform.value)
         PARENT_NODE.Children.value.append(self.notebook)
+        self.pickable_list.append(self.notebook)
         
 
         # tablelamp
@@ -116,6 +124,7 @@ class Scene:
             avango.gua.make_scale_mat(0.00022)
         self.tablelamp.add_and_init_field(avango.gua.SFMatrix4(), "HomeMatrix", self.tablelamp.Transform.value)
         PARENT_NODE.Children.value.append(self.tablelamp)
+        self.pickable_list.append(self.tablelamp)
                                      
 
 
@@ -127,6 +136,7 @@ class Scene:
             avango.gua.make_scale_mat(0.000012)
         self.telephone.add_and_init_field(avango.gua.SFMatrix4(), "HomeMatrix", self.telephone.Transform.value)
         PARENT_NODE.Children.value.append(self.telephone)
+        self.pickable_list.append(self.telephone)
         
    
         # penholder
@@ -136,6 +146,7 @@ class Scene:
             avango.gua.make_scale_mat(0.0002)
         self.penholder.add_and_init_field(avango.gua.SFMatrix4(), "HomeMatrix", self.penholder.Transform.value)
         PARENT_NODE.Children.value.append(self.penholder)
+        self.pickable_list.append(self.penholder)
         
 
         # calculator
@@ -146,6 +157,7 @@ class Scene:
             avango.gua.make_scale_mat(0.01)
         self.calculator.add_and_init_field(avango.gua.SFMatrix4(), "HomeMatrix", self.calculator.Transform.value)
         PARENT_NODE.Children.value.append(self.calculator)
+        self.pickable_list.append(self.calculator)
 
 
     ### functions ###
@@ -154,4 +166,6 @@ class Scene:
         for _node in self.PARENT_NODE.Children.value:
             if _node.has_field("HomeMatrix") == True:
                 _node.Transform.value = _node.HomeMatrix.value
+
+        PickCache.scene_changed() # pickable geometry moved
                 
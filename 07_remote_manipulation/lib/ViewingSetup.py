@@ -8,6 +8,7 @@ import avango.daemon
 ### import application libraries
 from lib.GuaVE import GuaVE
 from lib.FPSGui import FPSGui
+from lib.PosePredictor import create_tracking_output
 
 
 class StereoViewingSetup:
@@ -29,6 +30,10 @@ class StereoViewingSetup:
         TRACKING_TRANSMITTER_OFFSET = avango.gua.make_identity_mat(),
         ):
 
+        ### variables ###
+        self.latencyMonitor = None
+
+
         ### resources ###
         
         self.shell = GuaVE()
@@ -91,7 +96,8 @@ class StereoViewingSetup:
             self.headtracking_sensor.Station.value = HEADTRACKING_STATION
             self.headtracking_sensor.TransmitterOffset.value = TRACKING_TRANSMITTER_OFFSET
 
-            self.head_node.Transform.connect_from(self.headtracking_sensor.Matrix)
+            _sf_head_mat, self.head_predictor = create_tracking_output(self.headtracking_sensor) # optional jitter filter and latency prediction
+            self.head_node.Transform.connect_from(_sf_head_mat)
 
 
         ## init screen node
@@ -139,9 +145,29 @@ class StereoViewingSetup:
         self.camera_node.EyeDistance.value = FLOAT
 
 
+    ## show the motion-to-photon histogram and timestamp frame submissions (see lib/LatencyMonitor.py)
+    def set_latency_monitor(self, MONITOR):
+        self.latencyMonitor = MONITOR
+
+        self.fpsGui = FPSGui(
+            PARENT_NODE = self.screen_node,
+            WINDOW = self.window,
+            VIEWER = self.viewer,
+            LATENCY_MONITOR = self.latencyMonitor,
+            SHOW_FPS = False, # FPS chart stays disabled as in the constructor
+            )
+
+
     def run(self, LOCALS, GLOBALS):
         self.shell.start(LOCALS, GLOBALS)
-        self.viewer.run()
+
+        if self.latencyMonitor is None:
+            self.viewer.run()
+
+        else: # frame loop in python to timestamp the submission of each frame
+            while True:
+                self.viewer.frame()
+                self.latencyMonitor.submit_frame()
 
 
     def list_variabels(self):
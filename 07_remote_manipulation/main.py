@@ -11,6 +11,8 @@ from lib.Scene import Scene
 from lib.Device import NewSpacemouseInput
 from lib.Navigation import SteeringNavigation
 from lib.Manipulation import ManipulationManager
+from lib.TriMeshLoadReport import TRIMESH_LOADER
+from lib.LatencyMonitor import LatencyMonitor
 
 
 def start():
@@ -63,6 +65,7 @@ def start():
             TRACKING_TRANSMITTER_OFFSET = _tracking_transmitter_offset,
             POINTER_DEVICE_STATION = "device-pointer-3", # gyromouse
             HEAD_NODE = viewingSetup.head_node,
+            PICKABLE_LIST = scene.pickable_list,
             )
 
     elif hostname == "athena": # small powerwall workstation
@@ -91,6 +94,7 @@ def start():
             TRACKING_TRANSMITTER_OFFSET = _tracking_transmitter_offset,
             POINTER_DEVICE_STATION = "device-pointer-2",
             HEAD_NODE = viewingSetup.head_node,
+            PICKABLE_LIST = scene.pickable_list,
             )
 
     elif hostname == "kronos": # Samsung 3D-TV workstation
@@ -117,6 +121,7 @@ def start():
             TRACKING_TRANSMITTER_OFFSET = _tracking_transmitter_offset,
             POINTER_DEVICE_STATION = "device-pointer-1",
             HEAD_NODE = viewingSetup.head_node,            
+            PICKABLE_LIST = scene.pickable_list,
             )
             
     else:
@@ -127,7 +132,15 @@ def start():
     steeringNavigation.set_rotation_center_offset(viewingSetup.get_head_position())
 
 
+    ## init motion-to-photon latency measurement (write histogram with latencyMonitor.dump("latency.txt"))
+    latencyMonitor = LatencyMonitor()
+    latencyMonitor.my_constructor(SF_SENSOR_MAT = manipulationManager.active_manipulation_technique.pointer_tracking_sensor.Matrix) # all techniques track the same station
+    manipulationManager.set_latency_monitor(latencyMonitor)
+    viewingSetup.set_latency_monitor(latencyMonitor)
+
+
     print_graph(scenegraph.Root.value)
+    TRIMESH_LOADER.print_report() # load time and resident memory per mesh file
 
     ## start application/render loop
     viewingSetup.run(locals(), globals())
@@ -0,0 +1,460 @@
+#!/usr/bin/python
+
+## @file
+# Pure-Python stand-in for the avango core module (fields, field containers and
+# the per-frame evaluation loop). Put the parent directory of this package in
+# front of PYTHONPATH to run the exercise libraries without a guacamole install.
+
+### import python libraries
+import collections
+import copy
+import sys
+
+
+## alias used by some exercises (e.g. avango.avango.gua.SFMatrix4)
+avango = sys.modules[__name__]
+
+
+### evaluation state ###
+
+## containers that need to be polled once per frame (device sensors, update callbacks)
+_frame_containers = []
+
+## scripts evaluated every frame regardless of input changes
+_always_evaluated = []
+
+## scripts with changed input fields since the last evaluation
+_dirty_scripts = []
+
+## derived fields (e.g. WorldTransform) that have outgoing field connections
+_derived_sources = []
+
+## number of evaluation passes so far
+_frame_count = 0
+
+
+
+### fields ###
+
+class Field(object):
+
+    ## default value of this field type
+    default = None
+
+    ## constructor
+    def __init__(self):
+        self._value = copy.copy(self.default)
+        self._name = ""
+        self._container = None
+        self._source = None
+        self._targets = []
+        self._callbacks = None
+        self._pushing = False
+
+
+    ## clone a class-level field declaration for a new container instance
+    def _clone(self, CONTAINER):
+        _field = self.__class__.__new__(self.__class__)
+        _field._value = self._copy_value(self._value)
+        _field._name = self._name
+        _field._container = CONTAINER
+        _field._source = None
+        _field._targets = []
+        _field._callbacks = None
+        _field._pushing = False
+        return _field
+
+
+    def _copy_value(self, VALUE):
+        return copy.copy(VALUE)
+
+
+    def _get_value(self):
+        return self._value
+
+    def _set_value(self, VALUE):
+        self._value = VALUE
+        self.touch()
+
+    value = property(lambda self: self._get_value(), lambda self, VALUE: self._set_value(VALUE))
+
+
+    def _get_name(self):
+        return self._name
+
+
+    def get_container(self):
+        return self._container
+
+
+    ## notify the owning container and push the value along outgoing connections
+    def touch(self):
+        if self._pushing == True: # break connection cycles
+            return
+
+        self._pushing = True
+
+        try:
+            if self._container is not None:
+                self._container._field_has_changed(self)
+
+            for _target in self._targets:
+                _target._set_value(self._get_value())
+
+        finally:
+            self._pushing = False
+
+
+    def connect_from(self, FIELD):
+        self.disconnect()
+
+        self._source = FIELD
+        FIELD._targets.append(self)
+
+        if isinstance(FIELD, DerivedField) and FIELD not in _derived_sources:
+            _derived_sources.append(FIELD)
+
+        self._set_value(FIELD._get_value()) # initial propagation
+
+
+    def disconnect_from(self, FIELD):
+        if self._source is FIELD:
+            self.disconnect()
+
+
+    def disconnect(self):
+        if self._source is not None:
+            self._source._targets.remove(self)
+            self._source = None
+
+
+    def disconnect_auditors(self):
+        for _target in list(self._targets):
+            _target.disconnect()
+
+
+
+## A read-mostly field whose value is computed on demand (e.g. WorldTransform).
+# Outgoing connections are refreshed once per evaluation pass.
+class DerivedField(Field):
+
+    def __init__(self, GETTER = None, SETTER = None):
+        Field.__init__(self)
+        self._getter = GETTER
+        self._setter = SETTER
+        self._last_pushed = None
+
+
+    def _get_value(self):
+        return self._getter()
+
+    def _set_value(self, VALUE):
+        if self._setter is not None:
+            self._setter(VALUE)
+
+
+    def _sync(self):
+        _value = self._get_value()
+
+        if _value != self._last_pushed:
+            self._last_pushed = _value
+
+            for _target in self._targets:
+                _target._set_value(_value)
+
+
+
+class SFBool(Field):
+    default = False
+
+class SFFloat(Field):
+    default = 0.0
+
+class SFDouble(Field):
+    default = 0.0
+
+class SFInt(Field):
+    default = 0
+
+class SFUInt(Field):
+    default = 0
+
+class SFLong(Field):
+    default = 0
+
+class SFString(Field):
+    default = ""
+
+class SFObject(Field):
+    default = None
+
+
+class _MultiField(Field):
+    default = []
+
+    def _copy_value(self, VALUE):
+        return list(VALUE)
+
+    def _set_value(self, VALUE):
+        self._value = list(VALUE)
+        self.touch()
+
+
+class MFBool(_MultiField):
+    pass
+
+class MFFloat(_MultiField):
+    pass
+
+class MFDouble(_MultiField):
+    pass
+
+class MFInt(_MultiField):
+    pass
+
+class MFUInt(_MultiField):
+    pass
+
+class MFString(_MultiField):
+    pass
+
+class MFObject(_MultiField):
+    pass
+
+
+
+### field containers ###
+
+class _FieldContainerMeta(type):
+
+    def __init__(cls, NAME, BASES, DICT):
+        type.__init__(cls, NAME, BASES, DICT)
+
+        ## collect class-level field declarations (including base classes)
+        _prototypes = {}
+
+        for _base in reversed(cls.__mro__):
+            for _name, _value in vars(_base).items():
+                if isinstance(_value, Field):
+                    _value._name = _name
+                    _prototypes[_name] = _value
+
+        cls._field_prototypes = _prototypes
+
+        ## collect @field_has_changed callbacks by field name
+        _callbacks = {}
+
+        for _base in reversed(cls.__mro__):
+            for _attr, _value in vars(_base).items():
+                _field = getattr(_value, "_field_has_changed", None)
+
+                if _field is not None:
+                    _callbacks.setdefault(_field._name, [])
+
+                    if _attr not in _callbacks[_field._name]:
+                        _callbacks[_field._name].append(_attr)
+
+        cls._field_callbacks = _callbacks
+
+
+
+class FieldContainer(object, metaclass = _FieldContainerMeta):
+
+    ## only scripts are scheduled for evaluation on input changes
+    _is_script = False
+
+    def __new__(cls, *ARGS, **KWARGS):
+        _self = object.__new__(cls)
+        _self._fields = []
+        _self._dirty = False
+        _self._always_evaluate = False
+
+        for _name, _prototype in cls._field_prototypes.items():
+            _field = _prototype._clone(_self)
+            _field._callbacks = cls._field_callbacks.get(_name)
+            _self.__dict__[_name] = _field
+            _self._fields.append(_field)
+
+        return _self
+
+
+    def __init__(self, **KWARGS):
+        for _name, _value in KWARGS.items():
+            getattr(self, _name).value = _value
+
+
+    ## python2-style super call used throughout the exercises
+    def super(self, CLASS):
+        return super(CLASS, self)
+
+
+    def add_field(self, FIELD, NAME):
+        FIELD._name = NAME
+        FIELD._container = self
+        self.__dict__[NAME] = FIELD
+        self._fields.append(FIELD)
+
+
+    def add_and_init_field(self, FIELD, NAME, VALUE):
+        self.add_field(FIELD, NAME)
+        FIELD.value = VALUE
+
+
+    def has_field(self, NAME):
+        return isinstance(self.__dict__.get(NAME), Field)
+
+
+    def get_num_fields(self):
+        return len(self._fields)
+
+
+    def get_field(self, INDEX):
+        return self._fields[INDEX]
+
+
+    def get_field_name(self, INDEX):
+        return self._fields[INDEX]._name
+
+
+    def always_evaluate(self, FLAG):
+        self._always_evaluate = FLAG
+
+        if FLAG == True and self not in _always_evaluated:
+            _always_evaluated.append(self)
+        elif FLAG == False and self in _always_evaluated:
+            _always_evaluated.remove(self)
+
+
+    def evaluate(self):
+        pass
+
+
+    def _field_has_changed(self, FIELD):
+        if FIELD._callbacks is not None:
+            for _attr in FIELD._callbacks:
+                getattr(self, _attr)()
+
+        if self._is_script == True and self._dirty == False:
+            self._dirty = True
+            _dirty_scripts.append(self)
+
+
+    ## polling order of containers registered in _frame_containers
+    _frame_priority = 1
+
+    ## hook for containers registered in _frame_containers
+    def _frame(self):
+        pass
+
+
+
+## register a container that must be polled at the start of every frame
+# (sensors before update callbacks, see FieldContainer._frame_priority)
+def register_frame_container(CONTAINER):
+    if CONTAINER in _frame_containers:
+        return
+
+    _index = len(_frame_containers)
+
+    while _index > 0 and _frame_containers[_index - 1]._frame_priority > CONTAINER._frame_priority:
+        _index -= 1
+
+    _frame_containers.insert(_index, CONTAINER)
+
+
+def unregister_frame_container(CONTAINER):
+    if CONTAINER in _frame_containers:
+        _frame_containers.remove(CONTAINER)
+
+
+
+### evaluation loop ###
+
+## Run one evaluation pass: poll sensors and update callbacks, refresh derived
+# field connections and evaluate every script whose inputs changed (or which
+# requested to be evaluated every frame). Each script is evaluated at most once.
+def evaluate():
+    global _frame_count
+
+    for _container in list(_frame_containers):
+        _container._frame()
+
+    for _field in _derived_sources:
+        _field._sync()
+
+    _evaluated = set()
+    _queue = collections.deque(_always_evaluated)
+    _carry = [] # scripts changed after their evaluation in this pass
+
+    while True:
+        for _container in _dirty_scripts:
+            if id(_container) in _evaluated:
+                _carry.append(_container)
+            else:
+                _queue.append(_container)
+
+        del _dirty_scripts[:]
+
+        _next = None
+
+        while len(_queue) > 0:
+            _container = _queue.popleft()
+
+            if id(_container) not in _evaluated:
+                _next = _container
+                break
+
+        if _next is None:
+            break
+
+        _evaluated.add(id(_next))
+        _next._dirty = False
+        _next.evaluate()
+
+    for _field in _derived_sources:
+        _field._sync()
+
+    for _container in _carry: # evaluated again in the next pass
+        if _container._dirty == True and _container not in _dirty_scripts:
+            _dirty_scripts.append(_container)
+
+    _frame_count += 1
+
+
+def get_frame_count():
+    return _frame_count
+
+
+## drop all evaluation state (used when a benchmark builds a fresh application)
+def reset():
+    global _frame_count
+
+    del _frame_containers[:]
+    del _always_evaluated[:]
+    del _dirty_scripts[:]
+    del _derived_sources[:]
+    _frame_count = 0
+
+
+
+### core nodes ###
+
+class _TimeSensor(FieldContainer):
+
+    Time = SFDouble()
+    RealTime = SFDouble()
+
+    _frame_priority = 0
+
+    def __init__(self, **KWARGS):
+        FieldContainer.__init__(self, **KWARGS)
+        register_frame_container(self)
+
+    def _frame(self):
+        from avango import headless
+        self.Time.value = headless.get_time()
+        self.RealTime.value = self.Time.value
+
+
+class nodes(object):
+    TimeSensor = _TimeSensor
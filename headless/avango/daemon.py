@@ -0,0 +1,239 @@
+#!/usr/bin/python
+
+## @file
+# Stand-in for avango.daemon. Stations live in an in-process table instead of
+# shared memory; input is fed by writing to Station objects directly
+# (e.g. avango.daemon.Station("gua-device-mouse").values[0] = 2.0) or replayed
+# from an input log (see ReplayDeviceService).
+
+### import guacamole libraries
+import avango
+import avango.gua
+
+### import application libraries
+import inputlog
+
+### import python libraries
+import os
+
+
+NUM_BUTTONS = 32
+NUM_VALUES = 16
+
+
+## station table (station name -> Station)
+_stations = {}
+
+## active replay (feeds the station table before sensors read it)
+_replay = [None]
+
+
+class _Station(object):
+
+    def __init__(self, NAME):
+        self.name = NAME
+        self.matrix = avango.gua.make_identity_mat()
+        self.buttons = [False] * NUM_BUTTONS
+        self.values = [0.0] * NUM_VALUES
+        self.timestamp = 0.0
+
+
+## Get (or create) the station with the given name.
+def Station(NAME):
+    if NAME not in _stations:
+        _stations[NAME] = _Station(NAME)
+
+    return _stations[NAME]
+
+
+def get_stations():
+    return _stations
+
+
+def reset():
+    _stations.clear()
+    _replay[0] = None
+
+
+
+class DeviceService(object):
+
+    def get_station(self, NAME):
+        if NAME == "" or NAME is None:
+            return None
+
+        if _replay[0] is not None:
+            _replay[0].advance()
+
+        return Station(NAME)
+
+
+
+## Plays back an input log (see headless/inputlog.py) into the station table,
+# so all DeviceSensors of an application see the recorded input. Log time is
+# mapped to the simulated clock, SPEED > 1.0 replays accelerated. Installing
+# the service with start() redirects every DeviceService; the environment
+# variables AVANGO_HEADLESS_REPLAY (log file) and AVANGO_HEADLESS_REPLAY_SPEED
+# do so for a whole run (see headless/start.sh).
+class ReplayDeviceService(DeviceService):
+
+    ## constructor
+    def __init__(self,
+        FILENAME,
+        SPEED = 1.0,
+        ):
+
+        from avango import headless
+
+        ### parameters ###
+        self.speed = SPEED
+        self.clock = headless.get_time
+
+
+        ### variables ###
+        _reader = inputlog.InputLogReader(FILENAME)
+        self.records = _reader.read()
+        _reader.close()
+
+        self.cursor = 0 # next record to apply
+        self.start_time = self.clock()
+        self.last_time = None
+
+
+    ### functions ###
+    def start(self):
+        self.cursor = 0
+        self.start_time = self.clock()
+        self.last_time = None
+
+        _replay[0] = self
+
+
+    def stop(self):
+        if _replay[0] is self:
+            _replay[0] = None
+
+
+    def is_finished(self):
+        return self.cursor >= len(self.records)
+
+
+    ## apply all records up to the current (scaled) replay time; once per clock tick
+    def advance(self):
+        _time = self.clock()
+
+        if _time == self.last_time:
+            return
+
+        self.last_time = _time
+        _replay_time = (_time - self.start_time) * self.speed
+        _records = self.records
+
+        while self.cursor < len(_records) and _records[self.cursor][0] <= _replay_time:
+            _time, _name, _kind, _index, _payload = _records[self.cursor]
+            _station = Station(_name)
+
+            if _kind == inputlog.KIND_VALUE:
+                _station.values[_index] = _payload
+            elif _kind == inputlog.KIND_BUTTONS:
+                _station.buttons = _payload
+            elif _kind == inputlog.KIND_MATRIX:
+                _station.matrix = avango.gua.make_identity_mat()
+
+                for _i, _element in enumerate(_payload):
+                    _station.matrix.set_element(_i // 4, _i % 4, _element)
+
+            _station.timestamp = _time
+            self.cursor += 1
+
+
+
+class _DeviceSensor(avango.FieldContainer):
+
+    Station = avango.SFString()
+    TransmitterOffset = avango.gua.SFMatrix4()
+    ReceiverOffset = avango.gua.SFMatrix4()
+    Matrix = avango.gua.SFMatrix4()
+
+    _frame_priority = 0 # poll before update callbacks
+
+    ## constructor
+    def __init__(self, DeviceService = None, **KWARGS):
+        self.DeviceService = DeviceService
+
+        for _i in range(NUM_BUTTONS):
+            self.add_field(avango.SFBool(), "Button" + str(_i))
+
+        for _i in range(NUM_VALUES):
+            self.add_field(avango.SFFloat(), "Value" + str(_i))
+
+        self._buttons = [getattr(self, "Button" + str(_i)) for _i in range(NUM_BUTTONS)]
+        self._values = [getattr(self, "Value" + str(_i)) for _i in range(NUM_VALUES)]
+        self._last_station_matrix = None
+
+        avango.FieldContainer.__init__(self, **KWARGS)
+        avango.register_frame_container(self)
+
+
+    ## copy the current station state into the sensor fields (changed values only)
+    def _frame(self):
+        if self.DeviceService is None:
+            return
+
+        _station = self.DeviceService.get_station(self.Station.value)
+
+        if _station is None:
+            return
+
+        for _field, _value in zip(self._buttons, _station.buttons):
+            if _field._value != _value:
+                _field.value = _value
+
+        for _field, _value in zip(self._values, _station.values):
+            if _field._value != _value:
+                _field.value = _value
+
+        _matrix = self.TransmitterOffset.value * _station.matrix * self.ReceiverOffset.value
+
+        if _matrix != self.Matrix.value:
+            self.Matrix.value = _matrix
+
+
+
+class nodes(object):
+    DeviceSensor = _DeviceSensor
+
+
+
+### daemon-side device classes (accepted but not connected to hardware) ###
+
+class _Device(object):
+
+    def __init__(self):
+        self.station = None
+        self.stations = {}
+        self.device = ""
+        self.port = ""
+        self.timeout = ""
+        self.norm_abs = ""
+        self.values = {}
+        self.buttons = {}
+
+
+class DTrack(_Device):
+    pass
+
+class HIDInput(_Device):
+    pass
+
+class WacomTablet(_Device):
+    pass
+
+
+## install a replay for the whole run (see ReplayDeviceService)
+if os.environ.get("AVANGO_HEADLESS_REPLAY", "") != "":
+    ReplayDeviceService(os.environ["AVANGO_HEADLESS_REPLAY"], SPEED = float(os.environ.get("AVANGO_HEADLESS_REPLAY_SPEED", "1.0"))).start()
+
+
+def run(DEVICE_LIST):
+    print("headless daemon: no hardware devices are polled (" + str(len(DEVICE_LIST)) + " configured)")
@@ -0,0 +1,37 @@
+#!/usr/bin/python
+
+## @file
+# Stand-in for avango.gua: math types, field types, node types and enums.
+
+from avango.gua._math import Vec2, Vec2ui, Vec3, Vec4, Color, Quat, Mat4, BoundingBox, \
+    make_identity_mat, make_trans_mat, make_rot_mat, make_scale_mat, make_inverse_mat, make_empty_bbox
+from avango.gua._fields import SFMatrix4, SFVec2, SFVec2ui, SFVec3, SFVec4, SFColor, SFQuat, SFBoundingBox, \
+    SFNode, SFMaterial, SFSceneGraph, SFPickResult, MFMatrix4, MFVec3, MFVec4, MFNode, MFPickResult
+from avango.gua._nodes import PickingOptions, LoaderFlags, Material, register_window
+from avango.gua import nodes
+
+
+## Namespace for render enums; unknown members evaluate to their own name.
+class _EnumMeta(type):
+
+    def __getattr__(cls, NAME):
+        if NAME.startswith("_"):
+            raise AttributeError(NAME)
+
+        return cls.__name__ + "." + NAME
+
+
+class StereoMode(metaclass = _EnumMeta):
+    pass
+
+class ToneMappingMode(metaclass = _EnumMeta):
+    pass
+
+class BackgroundMode(metaclass = _EnumMeta):
+    pass
+
+class LightType(metaclass = _EnumMeta):
+    pass
+
+class ShadowMode(metaclass = _EnumMeta):
+    pass
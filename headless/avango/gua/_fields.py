@@ -0,0 +1,62 @@
+#!/usr/bin/python
+
+## @file
+# Field types of avango.gua.
+
+### import guacamole libraries
+import avango
+
+from avango.gua._math import Vec2, Vec2ui, Vec3, Vec4, Color, Quat, Mat4, BoundingBox, make_empty_bbox
+
+
+class SFMatrix4(avango.Field):
+    default = Mat4()
+
+class SFVec2(avango.Field):
+    default = Vec2()
+
+class SFVec2ui(avango.Field):
+    default = Vec2ui()
+
+class SFVec3(avango.Field):
+    default = Vec3()
+
+class SFVec4(avango.Field):
+    default = Vec4()
+
+class SFColor(avango.Field):
+    default = Color()
+
+class SFQuat(avango.Field):
+    default = Quat()
+
+class SFBoundingBox(avango.Field):
+    default = make_empty_bbox()
+
+class SFNode(avango.Field):
+    default = None
+
+class SFMaterial(avango.Field):
+    default = None
+
+class SFSceneGraph(avango.Field):
+    default = None
+
+class SFPickResult(avango.Field):
+    default = None
+
+
+class MFMatrix4(avango._MultiField):
+    pass
+
+class MFVec3(avango._MultiField):
+    pass
+
+class MFVec4(avango._MultiField):
+    pass
+
+class MFNode(avango._MultiField):
+    pass
+
+class MFPickResult(avango._MultiField):
+    pass
@@ -0,0 +1,443 @@
+#!/usr/bin/python
+
+## @file
+# Pure-Python vector, quaternion, matrix and bounding box types mirroring the
+# subset of the avango.gua math API used by the exercises.
+
+### import python libraries
+import math
+
+
+class Vec2(object):
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, X = 0.0, Y = 0.0):
+        self.x = X
+        self.y = Y
+
+    def __eq__(self, OTHER):
+        return isinstance(OTHER, Vec2) and self.x == OTHER.x and self.y == OTHER.y
+
+    def __ne__(self, OTHER):
+        return not self.__eq__(OTHER)
+
+    def __repr__(self):
+        return "({0}, {1})".format(self.x, self.y)
+
+
+class Vec2ui(Vec2):
+    pass
+
+
+
+class Vec3(object):
+
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, X = 0.0, Y = 0.0, Z = 0.0):
+        if isinstance(X, (Vec3, Vec4)): # copy constructor
+            X, Y, Z = X.x, X.y, X.z
+
+        self.x = X
+        self.y = Y
+        self.z = Z
+
+    def __add__(self, OTHER):
+        return Vec3(self.x + OTHER.x, self.y + OTHER.y, self.z + OTHER.z)
+
+    def __sub__(self, OTHER):
+        return Vec3(self.x - OTHER.x, self.y - OTHER.y, self.z - OTHER.z)
+
+    def __neg__(self):
+        return Vec3(-self.x, -self.y, -self.z)
+
+    def __mul__(self, OTHER):
+        if isinstance(OTHER, Vec3): # component-wise
+            return Vec3(self.x * OTHER.x, self.y * OTHER.y, self.z * OTHER.z)
+
+        return Vec3(self.x * OTHER, self.y * OTHER, self.z * OTHER)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, SCALAR):
+        return Vec3(self.x / SCALAR, self.y / SCALAR, self.z / SCALAR)
+
+    def __eq__(self, OTHER):
+        return isinstance(OTHER, Vec3) and self.x == OTHER.x and self.y == OTHER.y and self.z == OTHER.z
+
+    def __ne__(self, OTHER):
+        return not self.__eq__(OTHER)
+
+    def __getitem__(self, INDEX):
+        return (self.x, self.y, self.z)[INDEX]
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __repr__(self):
+        return "({0}, {1}, {2})".format(self.x, self.y, self.z)
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def length2(self):
+        return self.x * self.x + self.y * self.y + self.z * self.z
+
+    def normalize(self): # in place, like avango.gua.Vec3
+        _length = self.length()
+
+        if _length > 0.0:
+            self.x /= _length
+            self.y /= _length
+            self.z /= _length
+
+    def dot(self, OTHER):
+        return self.x * OTHER.x + self.y * OTHER.y + self.z * OTHER.z
+
+    def cross(self, OTHER):
+        return Vec3(
+            self.y * OTHER.z - self.z * OTHER.y,
+            self.z * OTHER.x - self.x * OTHER.z,
+            self.x * OTHER.y - self.y * OTHER.x)
+
+
+
+class Vec4(object):
+
+    __slots__ = ("x", "y", "z", "w")
+
+    def __init__(self, X = 0.0, Y = 0.0, Z = 0.0, W = 0.0):
+        self.x = X
+        self.y = Y
+        self.z = Z
+        self.w = W
+
+    def __eq__(self, OTHER):
+        return isinstance(OTHER, Vec4) and self.x == OTHER.x and self.y == OTHER.y and self.z == OTHER.z and self.w == OTHER.w
+
+    def __ne__(self, OTHER):
+        return not self.__eq__(OTHER)
+
+    def __mul__(self, SCALAR):
+        return Vec4(self.x * SCALAR, self.y * SCALAR, self.z * SCALAR, self.w * SCALAR)
+
+    def __repr__(self):
+        return "({0}, {1}, {2}, {3})".format(self.x, self.y, self.z, self.w)
+
+
+
+class Color(object):
+
+    __slots__ = ("r", "g", "b")
+
+    def __init__(self, R = 0.0, G = 0.0, B = 0.0):
+        self.r = R
+        self.g = G
+        self.b = B
+
+    def __eq__(self, OTHER):
+        return isinstance(OTHER, Color) and self.r == OTHER.r and self.g == OTHER.g and self.b == OTHER.b
+
+
+
+## Unit quaternion (x, y, z imaginary part, w real part).
+class Quat(object):
+
+    __slots__ = ("x", "y", "z", "w")
+
+    def __init__(self, X = 0.0, Y = 0.0, Z = 0.0, W = 1.0):
+        self.x = X
+        self.y = Y
+        self.z = Z
+        self.w = W
+
+    def __eq__(self, OTHER):
+        return isinstance(OTHER, Quat) and self.x == OTHER.x and self.y == OTHER.y and self.z == OTHER.z and self.w == OTHER.w
+
+    def __repr__(self):
+        return "quat({0}, {1}, {2}, {3})".format(self.x, self.y, self.z, self.w)
+
+    def get_angle(self):
+        return math.degrees(2.0 * math.acos(max(-1.0, min(1.0, self.w))))
+
+    def get_axis(self):
+        _s = math.sqrt(max(0.0, 1.0 - self.w * self.w))
+
+        if _s < 1e-9:
+            return Vec3(1.0, 0.0, 0.0)
+
+        return Vec3(self.x / _s, self.y / _s, self.z / _s)
+
+
+
+## 4x4 matrix, stored row-major in a flat list (element (row, col) at row * 4 + col).
+class Mat4(object):
+
+    __slots__ = ("m",)
+
+    def __init__(self, ELEMENTS = None):
+        if ELEMENTS is None:
+            self.m = [1.0, 0.0, 0.0, 0.0,
+                      0.0, 1.0, 0.0, 0.0,
+                      0.0, 0.0, 1.0, 0.0,
+                      0.0, 0.0, 0.0, 1.0]
+        else:
+            self.m = list(ELEMENTS)
+
+    def __copy__(self):
+        return Mat4(self.m)
+
+    def __eq__(self, OTHER):
+        return isinstance(OTHER, Mat4) and self.m == OTHER.m
+
+    def __ne__(self, OTHER):
+        return not self.__eq__(OTHER)
+
+    def __repr__(self):
+        return "\n".join(str(self.m[_r * 4:_r * 4 + 4]) for _r in range(4))
+
+    def __mul__(self, OTHER):
+        a = self.m
+
+        if isinstance(OTHER, Mat4):
+            b = OTHER.m
+            return Mat4([
+                a[0]*b[0] + a[1]*b[4] + a[2]*b[8] + a[3]*b[12],
+                a[0]*b[1] + a[1]*b[5] + a[2]*b[9] + a[3]*b[13],
+                a[0]*b[2] + a[1]*b[6] + a[2]*b[10] + a[3]*b[14],
+                a[0]*b[3] + a[1]*b[7] + a[2]*b[11] + a[3]*b[15],
+                a[4]*b[0] + a[5]*b[4] + a[6]*b[8] + a[7]*b[12],
+                a[4]*b[1] + a[5]*b[5] + a[6]*b[9] + a[7]*b[13],
+                a[4]*b[2] + a[5]*b[6] + a[6]*b[10] + a[7]*b[14],
+                a[4]*b[3] + a[5]*b[7] + a[6]*b[11] + a[7]*b[15],
+                a[8]*b[0] + a[9]*b[4] + a[10]*b[8] + a[11]*b[12],
+                a[8]*b[1] + a[9]*b[5] + a[10]*b[9] + a[11]*b[13],
+                a[8]*b[2] + a[9]*b[6] + a[10]*b[10] + a[11]*b[14],
+                a[8]*b[3] + a[9]*b[7] + a[10]*b[11] + a[11]*b[15],
+                a[12]*b[0] + a[13]*b[4] + a[14]*b[8] + a[15]*b[12],
+                a[12]*b[1] + a[13]*b[5] + a[14]*b[9] + a[15]*b[13],
+                a[12]*b[2] + a[13]*b[6] + a[14]*b[10] + a[15]*b[14],
+                a[12]*b[3] + a[13]*b[7] + a[14]*b[11] + a[15]*b[15]])
+
+        if isinstance(OTHER, Vec4):
+            return Vec4(
+                a[0]*OTHER.x + a[1]*OTHER.y + a[2]*OTHER.z + a[3]*OTHER.w,
+                a[4]*OTHER.x + a[5]*OTHER.y + a[6]*OTHER.z + a[7]*OTHER.w,
+                a[8]*OTHER.x + a[9]*OTHER.y + a[10]*OTHER.z + a[11]*OTHER.w,
+                a[12]*OTHER.x + a[13]*OTHER.y + a[14]*OTHER.z + a[15]*OTHER.w)
+
+        if isinstance(OTHER, Vec3): # transform as point
+            return Vec3(
+                a[0]*OTHER.x + a[1]*OTHER.y + a[2]*OTHER.z + a[3],
+                a[4]*OTHER.x + a[5]*OTHER.y + a[6]*OTHER.z + a[7],
+                a[8]*OTHER.x + a[9]*OTHER.y + a[10]*OTHER.z + a[11])
+
+        return NotImplemented
+
+    def get_element(self, ROW, COL):
+        return self.m[ROW * 4 + COL]
+
+    def set_element(self, ROW, COL, VALUE):
+        self.m[ROW * 4 + COL] = VALUE
+
+    def get_translate(self):
+        return Vec3(self.m[3], self.m[7], self.m[11])
+
+    def get_scale(self):
+        _m = self.m
+        return Vec3(
+            math.sqrt(_m[0]*_m[0] + _m[4]*_m[4] + _m[8]*_m[8]),
+            math.sqrt(_m[1]*_m[1] + _m[5]*_m[5] + _m[9]*_m[9]),
+            math.sqrt(_m[2]*_m[2] + _m[6]*_m[6] + _m[10]*_m[10]))
+
+    def get_rotate(self):
+        _m = self.m
+        return _quat_from_rotation(_m[0], _m[1], _m[2], _m[4], _m[5], _m[6], _m[8], _m[9], _m[10])
+
+    def get_rotate_scale_corrected(self):
+        _m = self.m
+        _s = self.get_scale()
+        _sx = _s.x if _s.x > 0.0 else 1.0
+        _sy = _s.y if _s.y > 0.0 else 1.0
+        _sz = _s.z if _s.z > 0.0 else 1.0
+        return _quat_from_rotation(
+            _m[0] / _sx, _m[1] / _sy, _m[2] / _sz,
+            _m[4] / _sx, _m[5] / _sy, _m[6] / _sz,
+            _m[8] / _sx, _m[9] / _sy, _m[10] / _sz)
+
+
+
+def _quat_from_rotation(M00, M01, M02, M10, M11, M12, M20, M21, M22):
+    _trace = M00 + M11 + M22
+
+    if _trace > 0.0:
+        _s = math.sqrt(_trace + 1.0) * 2.0
+        return Quat((M21 - M12) / _s, (M02 - M20) / _s, (M10 - M01) / _s, 0.25 * _s)
+
+    elif M00 > M11 and M00 > M22:
+        _s = math.sqrt(1.0 + M00 - M11 - M22) * 2.0
+        return Quat(0.25 * _s, (M01 + M10) / _s, (M02 + M20) / _s, (M21 - M12) / _s)
+
+    elif M11 > M22:
+        _s = math.sqrt(1.0 + M11 - M00 - M22) * 2.0
+        return Quat((M01 + M10) / _s, 0.25 * _s, (M12 + M21) / _s, (M02 - M20) / _s)
+
+    else:
+        _s = math.sqrt(1.0 + M22 - M00 - M11) * 2.0
+        return Quat((M02 + M20) / _s, (M12 + M21) / _s, 0.25 * _s, (M10 - M01) / _s)
+
+
+
+class BoundingBox(object):
+
+    __slots__ = ("Min", "Max")
+
+    def __init__(self, MIN = None, MAX = None):
+        self.Min = MIN if MIN is not None else Vec3(0.0, 0.0, 0.0)
+        self.Max = MAX if MAX is not None else Vec3(0.0, 0.0, 0.0)
+
+    def __eq__(self, OTHER):
+        return isinstance(OTHER, BoundingBox) and self.Min == OTHER.Min and self.Max == OTHER.Max
+
+    def __repr__(self):
+        return "bbox({0}, {1})".format(self.Min, self.Max)
+
+    def is_empty(self):
+        return self.Min.x > self.Max.x or self.Min.y > self.Max.y or self.Min.z > self.Max.z
+
+    def contains(self, POINT):
+        return self.Min.x <= POINT.x <= self.Max.x \
+            and self.Min.y <= POINT.y <= self.Max.y \
+            and self.Min.z <= POINT.z <= self.Max.z
+
+    def intersects(self, OTHER):
+        return self.Min.x <= OTHER.Max.x and OTHER.Min.x <= self.Max.x \
+            and self.Min.y <= OTHER.Max.y and OTHER.Min.y <= self.Max.y \
+            and self.Min.z <= OTHER.Max.z and OTHER.Min.z <= self.Max.z
+
+    def expand(self, OTHER):
+        if OTHER.is_empty():
+            return
+
+        if self.is_empty():
+            self.Min = Vec3(OTHER.Min)
+            self.Max = Vec3(OTHER.Max)
+            return
+
+        self.Min = Vec3(min(self.Min.x, OTHER.Min.x), min(self.Min.y, OTHER.Min.y), min(self.Min.z, OTHER.Min.z))
+        self.Max = Vec3(max(self.Max.x, OTHER.Max.x), max(self.Max.y, OTHER.Max.y), max(self.Max.z, OTHER.Max.z))
+
+    ## axis-aligned box enclosing this box after transformation with MAT
+    def transformed(self, MAT):
+        if self.is_empty():
+            return BoundingBox(Vec3(1.0, 1.0, 1.0), Vec3(-1.0, -1.0, -1.0))
+
+        _m = MAT.m
+        _min = [_m[3], _m[7], _m[11]]
+        _max = [_m[3], _m[7], _m[11]]
+        _lo = (self.Min.x, self.Min.y, self.Min.z)
+        _hi = (self.Max.x, self.Max.y, self.Max.z)
+
+        for _row in range(3): # Arvo's method
+            for _col in range(3):
+                _a = _m[_row * 4 + _col] * _lo[_col]
+                _b = _m[_row * 4 + _col] * _hi[_col]
+                _min[_row] += min(_a, _b)
+                _max[_row] += max(_a, _b)
+
+        return BoundingBox(Vec3(*_min), Vec3(*_max))
+
+
+## an empty bounding box (Min > Max)
+def make_empty_bbox():
+    return BoundingBox(Vec3(1.0, 1.0, 1.0), Vec3(-1.0, -1.0, -1.0))
+
+
+
+### matrix factories ###
+
+def make_identity_mat():
+    return Mat4()
+
+
+def make_trans_mat(X, Y = None, Z = None):
+    if Y is None: # Vec3
+        X, Y, Z = X.x, X.y, X.z
+
+    return Mat4([1.0, 0.0, 0.0, X,
+                 0.0, 1.0, 0.0, Y,
+                 0.0, 0.0, 1.0, Z,
+                 0.0, 0.0, 0.0, 1.0])
+
+
+def make_scale_mat(X, Y = None, Z = None):
+    if isinstance(X, Vec3):
+        X, Y, Z = X.x, X.y, X.z
+    elif Y is None: # uniform scale
+        Y = Z = X
+
+    return Mat4([X, 0.0, 0.0, 0.0,
+                 0.0, Y, 0.0, 0.0,
+                 0.0, 0.0, Z, 0.0,
+                 0.0, 0.0, 0.0, 1.0])
+
+
+## make_rot_mat(ANGLE, X, Y, Z), make_rot_mat(ANGLE, VEC3) or make_rot_mat(QUAT); angles in degrees
+def make_rot_mat(ANGLE, X = None, Y = None, Z = None):
+    if isinstance(ANGLE, Quat):
+        return _make_rot_mat_from_quat(ANGLE.x, ANGLE.y, ANGLE.z, ANGLE.w)
+
+    if isinstance(X, Vec3):
+        X, Y, Z = X.x, X.y, X.z
+
+    _length = math.sqrt(X * X + Y * Y + Z * Z)
+
+    if _length == 0.0:
+        return Mat4()
+
+    X /= _length
+    Y /= _length
+    Z /= _length
+
+    _rad = math.radians(ANGLE)
+    _c = math.cos(_rad)
+    _s = math.sin(_rad)
+    _t = 1.0 - _c
+
+    return Mat4([_t*X*X + _c,   _t*X*Y - _s*Z, _t*X*Z + _s*Y, 0.0,
+                 _t*X*Y + _s*Z, _t*Y*Y + _c,   _t*Y*Z - _s*X, 0.0,
+                 _t*X*Z - _s*Y, _t*Y*Z + _s*X, _t*Z*Z + _c,   0.0,
+                 0.0, 0.0, 0.0, 1.0])
+
+
+def _make_rot_mat_from_quat(X, Y, Z, W):
+    return Mat4([1.0 - 2.0*(Y*Y + Z*Z), 2.0*(X*Y - Z*W),       2.0*(X*Z + Y*W),       0.0,
+                 2.0*(X*Y + Z*W),       1.0 - 2.0*(X*X + Z*Z), 2.0*(Y*Z - X*W),       0.0,
+                 2.0*(X*Z - Y*W),       2.0*(Y*Z + X*W),       1.0 - 2.0*(X*X + Y*Y), 0.0,
+                 0.0, 0.0, 0.0, 1.0])
+
+
+## general 4x4 inverse (Gauss-Jordan elimination with partial pivoting)
+def make_inverse_mat(MAT):
+    _a = [MAT.m[_r * 4:_r * 4 + 4] + [1.0 if _r == _c else 0.0 for _c in range(4)] for _r in range(4)]
+
+    for _col in range(4):
+        _pivot = max(range(_col, 4), key = lambda _r: abs(_a[_r][_col]))
+
+        if abs(_a[_pivot][_col]) < 1e-12: # singular matrix
+            return Mat4()
+
+        _a[_col], _a[_pivot] = _a[_pivot], _a[_col]
+
+        _inv = 1.0 / _a[_col][_col]
+        _a[_col] = [_v * _inv for _v in _a[_col]]
+
+        for _r in range(4):
+            if _r != _col:
+                _f = _a[_r][_col]
+
+                if _f != 0.0:
+                    _a[_r] = [_v - _f * _p for _v, _p in zip(_a[_r], _a[_col])]
+
+    return Mat4([_v for _r in range(4) for _v in _a[_r][4:]])
@@ -0,0 +1,540 @@
+#!/usr/bin/python
+
+## @file
+# Scenegraph node, loader, picking and viewer stand-ins for avango.gua.
+
+### import guacamole libraries
+import avango
+from avango import headless
+
+from avango.gua._math import Vec2, Vec2ui, Vec3, Vec4, Color, Quat, Mat4, BoundingBox, make_empty_bbox, make_inverse_mat
+from avango.gua._fields import SFMatrix4, SFVec3, SFNode, SFMaterial, SFBoundingBox, MFNode, MFPickResult
+
+### import python libraries
+import os
+import time
+
+
+## Incremented on every transform or hierarchy change; derived world transforms
+# and bounding boxes are cached per generation.
+_generation = [0]
+
+def _invalidate():
+    _generation[0] += 1
+
+
+
+class PickingOptions(object):
+    PICK_ALL = 0
+    PICK_ONLY_FIRST_OBJECT = 1 << 0
+    PICK_ONLY_FIRST_FACE = 1 << 1
+    INTERPOLATE_NORMALS = 1 << 2
+    GET_POSITIONS = 1 << 3
+    GET_WORLD_POSITIONS = 1 << 4
+    GET_NORMALS = 1 << 5
+    GET_WORLD_NORMALS = 1 << 6
+    GET_TEXTURE_COORDS = 1 << 7
+
+
+class LoaderFlags(object):
+    DEFAULTS = 0
+    LOAD_MATERIALS = 1 << 0
+    OPTIMIZE_GEOMETRY = 1 << 1
+    MAKE_PICKABLE = 1 << 2
+    NORMALIZE_SCALE = 1 << 3
+    NORMALIZE_POSITION = 1 << 4
+
+
+
+## List of child nodes that keeps the Parent field of its elements up to date.
+class _ChildList(list):
+
+    def __init__(self, OWNER, ITEMS = ()):
+        list.__init__(self)
+        self.owner = OWNER
+
+        for _node in ITEMS:
+            self.append(_node)
+
+    def _adopt(self, NODE):
+        NODE.Parent.value = self.owner
+
+    def _release(self, NODE):
+        if NODE.Parent.value is self.owner:
+            NODE.Parent.value = None
+
+    def append(self, NODE):
+        list.append(self, NODE)
+        self._adopt(NODE)
+
+    def insert(self, INDEX, NODE):
+        list.insert(self, INDEX, NODE)
+        self._adopt(NODE)
+
+    def extend(self, NODES):
+        for _node in NODES:
+            self.append(_node)
+
+    def remove(self, NODE):
+        list.remove(self, NODE)
+        self._release(NODE)
+
+    def pop(self, INDEX = -1):
+        _node = list.pop(self, INDEX)
+        self._release(_node)
+        return _node
+
+    def clear(self):
+        for _node in list(self):
+            self._release(_node)
+
+        list.clear(self)
+
+    def __setitem__(self, INDEX, VALUE):
+        for _node in (self[INDEX] if isinstance(INDEX, slice) else [self[INDEX]]):
+            self._release(_node)
+
+        list.__setitem__(self, INDEX, VALUE)
+
+        for _node in (VALUE if isinstance(INDEX, slice) else [VALUE]):
+            self._adopt(_node)
+
+    def __delitem__(self, INDEX):
+        for _node in (self[INDEX] if isinstance(INDEX, slice) else [self[INDEX]]):
+            self._release(_node)
+
+        list.__delitem__(self, INDEX)
+
+
+
+class _ChildrenField(MFNode):
+
+    def _set_value(self, VALUE):
+        if isinstance(self._value, _ChildList):
+            self._value.clear()
+
+        self._value = _ChildList(self._container, VALUE)
+        self.touch()
+
+
+
+class Node(avango.FieldContainer):
+
+    Name = avango.SFString()
+    Transform = SFMatrix4()
+    Parent = SFNode()
+    Tags = avango.MFString()
+
+    ## constructor
+    def __init__(self, **KWARGS):
+        self._world_cache = (-1, None)
+        self._bbox_cache = (-1, None)
+
+        self.add_field(_ChildrenField(), "Children")
+        self.Children.value = []
+
+        self.add_field(avango.DerivedField(self._get_world_transform, self._set_world_transform), "WorldTransform")
+        self.add_field(avango.DerivedField(self._get_bounding_box), "BoundingBox")
+        self.add_field(avango.DerivedField(self._get_path), "Path")
+
+        avango.FieldContainer.__init__(self, **KWARGS)
+
+
+    def _field_has_changed(self, FIELD):
+        if FIELD._name == "Transform" or FIELD._name == "Parent" or FIELD._name == "Children":
+            _invalidate()
+
+        avango.FieldContainer._field_has_changed(self, FIELD)
+
+
+    def _get_world_transform(self):
+        if self._world_cache[0] == _generation[0]:
+            return self._world_cache[1]
+
+        _parent = self.Parent.value
+
+        if _parent is None:
+            _mat = self.Transform.value
+        else:
+            _mat = _parent.WorldTransform.value * self.Transform.value
+
+        self._world_cache = (_generation[0], _mat)
+        return _mat
+
+
+    def _set_world_transform(self, MAT):
+        _parent = self.Parent.value
+
+        if _parent is None:
+            self.Transform.value = MAT
+        else:
+            self.Transform.value = make_inverse_mat(_parent.WorldTransform.value) * MAT
+
+
+    ## local (object space) bounding box of this node's own geometry
+    def get_local_bounding_box(self):
+        return make_empty_bbox()
+
+
+    def _get_bounding_box(self):
+        if self._bbox_cache[0] == _generation[0]:
+            return self._bbox_cache[1]
+
+        _bb = self.get_local_bounding_box().transformed(self.WorldTransform.value)
+
+        for _child in self.Children.value:
+            _bb.expand(_child.BoundingBox.value)
+
+        self._bbox_cache = (_generation[0], _bb)
+        return _bb
+
+
+    def _get_path(self):
+        _parent = self.Parent.value
+
+        if _parent is None:
+            return "/"
+
+        _path = _parent.Path.value
+
+        if _path.endswith("/") == False:
+            _path += "/"
+
+        return _path + self.Name.value
+
+
+
+class TransformNode(Node):
+    pass
+
+
+
+## Node type without special behavior; unknown fields are created on first access
+# (e.g. LightNode.ShadowMapSize, CameraNode.LeftScreenPath).
+class GenericNode(Node):
+
+    def __getattr__(self, NAME):
+        if NAME.startswith("_") or NAME[0].islower():
+            raise AttributeError(NAME)
+
+        _field = avango.SFObject()
+        self.add_field(_field, NAME)
+        return _field
+
+
+class GenericContainer(avango.FieldContainer):
+
+    def __getattr__(self, NAME):
+        if NAME.startswith("_") or NAME[0].islower():
+            raise AttributeError(NAME)
+
+        _field = avango.SFObject()
+        self.add_field(_field, NAME)
+        return _field
+
+
+
+class Material(GenericContainer):
+
+    EnableBackfaceCulling = avango.SFBool()
+
+    ## constructor
+    def __init__(self, **KWARGS):
+        self.uniforms = {}
+        self.EnableBackfaceCulling.value = True
+
+        GenericContainer.__init__(self, **KWARGS)
+
+
+    def set_uniform(self, NAME, VALUE):
+        self.uniforms[NAME] = VALUE
+
+
+    def get_uniform(self, NAME):
+        return self.uniforms.get(NAME)
+
+
+
+class TriMeshNode(GenericNode):
+
+    Material = SFMaterial()
+
+    ## constructor
+    def __init__(self, **KWARGS):
+        self.Material.value = Material()
+        self.geometry_bbox = make_empty_bbox()
+        self.pickable = False # only geometries loaded with LoaderFlags.MAKE_PICKABLE are hit by ray tests
+        self.add_field(avango.SFString(), "Geometry")
+
+        Node.__init__(self, **KWARGS)
+
+
+    def get_local_bounding_box(self):
+        return self.geometry_bbox
+
+
+
+class SceneGraph(avango.FieldContainer):
+
+    Name = avango.SFString()
+    Root = SFNode()
+
+    ## constructor
+    def __init__(self, **KWARGS):
+        avango.FieldContainer.__init__(self, **KWARGS)
+
+        self.Root.value = TransformNode(Name = "/")
+
+
+    ## Intersect RAY (Origin, Direction incl. length) with the axis-aligned world
+    # bounding boxes of all pickable geometry nodes. Distances are normalized to the ray length.
+    def ray_test(self, RAY, OPTIONS = 0, WHITE_LIST = [], BLACK_LIST = []):
+        _origin = RAY.Origin.value
+        _direction = RAY.Direction.value
+
+        _hits = []
+        _stack = [self.Root.value]
+
+        while len(_stack) > 0:
+            _node = _stack.pop()
+            _tags = _node.Tags.value
+
+            if len(BLACK_LIST) > 0 and any(_tag in BLACK_LIST for _tag in _tags):
+                continue
+
+            _stack.extend(_node.Children.value)
+
+            if len(WHITE_LIST) > 0 and not any(_tag in WHITE_LIST for _tag in _tags):
+                continue
+
+            if getattr(_node, "pickable", False) == False:
+                continue
+
+            _local_bb = _node.get_local_bounding_box()
+
+            if _local_bb.is_empty():
+                continue
+
+            _hit = intersect_ray_box(_origin, _direction, _local_bb.transformed(_node.WorldTransform.value))
+
+            if _hit is not None:
+                _hits.append((_hit[0], _hit[1], _node))
+
+        _hits.sort(key = lambda _h: _h[0])
+
+        if OPTIONS & PickingOptions.PICK_ONLY_FIRST_OBJECT:
+            _hits = _hits[:1]
+
+        _results = MFPickResult()
+        _results.value = [PickResult.from_hit(_origin, _direction, _t, _axis, _node) for _t, _axis, _node in _hits]
+        return _results
+
+
+
+## Slab test of a ray segment ORIGIN + t * DIRECTION (t in [0, 1]) against an AABB.
+# Returns (t, hit axis) or None.
+def intersect_ray_box(ORIGIN, DIRECTION, BBOX):
+    _t_min = 0.0
+    _t_max = 1.0
+    _axis = 0
+
+    for _i, (_o, _d, _lo, _hi) in enumerate((
+        (ORIGIN.x, DIRECTION.x, BBOX.Min.x, BBOX.Max.x),
+        (ORIGIN.y, DIRECTION.y, BBOX.Min.y, BBOX.Max.y),
+        (ORIGIN.z, DIRECTION.z, BBOX.Min.z, BBOX.Max.z))):
+
+        if _d == 0.0:
+            if _o < _lo or _o > _hi:
+                return None
+            continue
+
+        _t0 = (_lo - _o) / _d
+        _t1 = (_hi - _o) / _d
+
+        if _t0 > _t1:
+            _t0, _t1 = _t1, _t0
+
+        if _t0 > _t_min:
+            _t_min = _t0
+            _axis = _i
+
+        _t_max = min(_t_max, _t1)
+
+        if _t_min > _t_max:
+            return None
+
+    return (_t_min, _axis)
+
+
+
+class Ray(avango.FieldContainer):
+
+    Origin = SFVec3()
+    Direction = SFVec3()
+    TMax = avango.SFFloat()
+
+    def __init__(self, **KWARGS):
+        self.Origin.value = Vec3(0.0, 0.0, 0.0)
+        self.Direction.value = Vec3(0.0, 0.0, -1.0)
+        self.TMax.value = 1.0
+
+        avango.FieldContainer.__init__(self, **KWARGS)
+
+
+
+class PickResult(avango.FieldContainer):
+
+    Distance = avango.SFFloat()
+    Object = SFNode()
+    Position = SFVec3()
+    WorldPosition = SFVec3()
+    Normal = SFVec3()
+    WorldNormal = SFVec3()
+
+    @staticmethod
+    def from_hit(ORIGIN, DIRECTION, T, AXIS, NODE):
+        _result = PickResult()
+        _result.Distance.value = T
+        _result.Object.value = NODE
+
+        _world_pos = ORIGIN + DIRECTION * T
+        _result.WorldPosition.value = _world_pos
+        _result.Position.value = make_inverse_mat(NODE.WorldTransform.value) * _world_pos
+
+        _normal = [0.0, 0.0, 0.0]
+        _normal[AXIS] = -1.0 if DIRECTION[AXIS] > 0.0 else 1.0
+        _result.WorldNormal.value = Vec3(*_normal)
+        _result.Normal.value = Vec3(*_normal)
+
+        return _result
+
+
+
+class TriMeshLoader(avango.FieldContainer):
+
+    ## Create a geometry node for an OBJ file. Only vertex positions are parsed
+    # (for bounding boxes and picking); missing files yield an empty geometry.
+    # As in guacamole, files loaded with LoaderFlags.LOAD_MATERIALS yield a
+    # transform node with one geometry child per mesh (OBJ object or group).
+    def create_geometry_from_file(self, NAME, FILENAME, FLAGS = LoaderFlags.DEFAULTS):
+        _meshes = load_obj_bounding_boxes(FILENAME)
+
+        if (FLAGS & LoaderFlags.LOAD_MATERIALS) == 0:
+            _bb = make_empty_bbox()
+
+            for _mesh_name, _mesh_bb in _meshes:
+                _bb.expand(_mesh_bb)
+
+            return self.create_trimesh_node(NAME, FILENAME, _bb, FLAGS)
+
+        _node = TransformNode(Name = NAME)
+
+        for _i, (_mesh_name, _mesh_bb) in enumerate(_meshes):
+            _node.Children.value.append(self.create_trimesh_node(_mesh_name or NAME + "_" + str(_i), FILENAME, _mesh_bb, FLAGS))
+
+        return _node
+
+
+    def create_trimesh_node(self, NAME, FILENAME, BBOX, FLAGS):
+        _node = TriMeshNode(Name = NAME)
+        _node.Geometry.value = FILENAME
+        _node.geometry_bbox = BBOX
+        _node.pickable = (FLAGS & LoaderFlags.MAKE_PICKABLE) != 0
+        return _node
+
+
+
+## (mesh name, bounding box) per OBJ object or group with vertices
+def load_obj_bounding_boxes(FILENAME):
+    if os.path.isfile(FILENAME) == False:
+        print("WARNING: file not found:", FILENAME)
+        return [("", make_empty_bbox())]
+
+    _meshes = []
+    _name = ""
+    _min = [float("inf")] * 3
+    _max = [float("-inf")] * 3
+
+    with open(FILENAME, "r", errors = "ignore") as _file:
+        for _line in _file:
+            if _line.startswith("o ") or _line.startswith("g "):
+                if _min[0] <= _max[0]:
+                    _meshes.append((_name, BoundingBox(Vec3(*_min), Vec3(*_max))))
+
+                _name = _line[2:].strip()
+                _min = [float("inf")] * 3
+                _max = [float("-inf")] * 3
+
+            elif _line.startswith("v "):
+                _values = _line.split()
+
+                for _i in range(3):
+                    _v = float(_values[_i + 1])
+
+                    if _v < _min[_i]:
+                        _min[_i] = _v
+                    if _v > _max[_i]:
+                        _max[_i] = _v
+
+    if _min[0] <= _max[0]:
+        _meshes.append((_name, BoundingBox(Vec3(*_min), Vec3(*_max))))
+
+    if len(_meshes) == 0:
+        _meshes.append(("", make_empty_bbox()))
+
+    return _meshes
+
+
+
+## Window registry (render output is discarded in the headless backend)
+_windows = {}
+
+def register_window(NAME, WINDOW):
+    _windows[NAME] = WINDOW
+
+
+
+class Viewer(GenericContainer):
+
+    SceneGraphs = avango.MFObject()
+    Windows = avango.MFObject()
+    DesiredFPS = avango.SFFloat()
+    ApplicationFPS = avango.SFFloat()
+
+    def __init__(self, **KWARGS):
+        self.DesiredFPS.value = 60.0
+        GenericContainer.__init__(self, **KWARGS)
+
+
+    ## evaluate one (simulated) frame
+    def frame(self):
+        _start = time.time()
+        headless.step(1.0 / self.DesiredFPS.value)
+        _duration = time.time() - _start
+
+        self.ApplicationFPS.value = min(self.DesiredFPS.value, 1.0 / _duration) if _duration > 0.0 else self.DesiredFPS.value
+
+        for _window in self.Windows.value:
+            if isinstance(_window, avango.FieldContainer):
+                _window.RenderingFPS.value = self.ApplicationFPS.value
+
+
+    ## Frame loop paced at DesiredFPS. Runs until interrupted or, if the environment
+    # variable AVANGO_HEADLESS_FRAMES is set, for that many frames.
+    def run(self):
+        _frames = int(os.environ.get("AVANGO_HEADLESS_FRAMES", "0"))
+        _count = 0
+
+        try:
+            while _frames == 0 or _count < _frames:
+                _start = time.time()
+                self.frame()
+                _count += 1
+
+                _sleep = 1.0 / self.DesiredFPS.value - (time.time() - _start)
+
+                if _sleep > 0.0 and _frames == 0:
+                    time.sleep(_sleep)
+
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,24 @@
+#!/usr/bin/python
+
+## @file
+# Stand-in for avango.gua.gui (html gui resources are not rendered).
+
+from avango.gua._nodes import GenericContainer
+
+
+class GuiResourceNode(GenericContainer):
+
+    ## constructor
+    def __init__(self, **KWARGS):
+        GenericContainer.__init__(self, **KWARGS)
+
+        ## last arguments passed to each javascript function
+        self.javascript_calls = {}
+
+
+    def call_javascript(self, FUNCTION, ARGUMENTS):
+        self.javascript_calls[FUNCTION] = ARGUMENTS
+
+
+class nodes(object):
+    GuiResourceNode = GuiResourceNode
@@ -0,0 +1,32 @@
+#!/usr/bin/python
+
+## @file
+# Node types of avango.gua. Node types that are only relevant for rendering
+# (lights, cameras, windows, pipeline passes, ...) are created generically.
+
+from avango.gua._nodes import Node, TransformNode, TriMeshNode, SceneGraph, Ray, PickResult, TriMeshLoader, Viewer, GenericNode, GenericContainer
+
+
+## scenegraph node types created as GenericNode
+_SCENE_NODE_TYPES = (
+    "LightNode",
+    "ScreenNode",
+    "CameraNode",
+    "TexturedQuadNode",
+    "TexturedScreenSpaceQuadNode",
+    "LineStripNode",
+    "PLodNode",
+    )
+
+_generic_types = {}
+
+
+def __getattr__(NAME):
+    if NAME.startswith("_"):
+        raise AttributeError(NAME)
+
+    if NAME not in _generic_types:
+        _base = GenericNode if NAME in _SCENE_NODE_TYPES else GenericContainer
+        _generic_types[NAME] = type(NAME, (_base,), {})
+
+    return _generic_types[NAME]
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+
+## @file
+# Simulated frame loop of the headless backend. The simulated clock replaces
+# wall-clock frame timing so that runs are deterministic and can be replayed
+# faster (or slower) than real time.
+
+### import guacamole libraries
+import avango
+
+### import python libraries
+import time
+
+
+### clock state ###
+_time = [0.0]
+
+
+## simulated application time in seconds
+def get_time():
+    return _time[0]
+
+
+def set_time(SECONDS):
+    _time[0] = SECONDS
+
+
+## advance the simulated clock by DT seconds and evaluate one frame
+def step(DT = 1.0 / 60.0):
+    _time[0] += DT
+    avango.evaluate()
+
+
+
+class FrameLoop:
+
+    ## constructor
+    def __init__(self,
+        FPS = 60.0,
+        ):
+
+        ### parameters ###
+        self.fps = FPS
+
+        ### variables ###
+        self.frame_count = 0
+        self.frame_durations = [] # wall-clock evaluation time per frame (in seconds)
+
+
+    ## Evaluate FRAMES frames. BEFORE_FRAME(INDEX) is called ahead of each
+    # evaluation pass, e.g. to feed recorded input into the daemon stations.
+    def run(self, FRAMES, BEFORE_FRAME = None):
+        for _i in range(FRAMES):
+            if BEFORE_FRAME is not None:
+                BEFORE_FRAME(self.frame_count)
+
+            _start = time.perf_counter()
+            step(1.0 / self.fps)
+            self.frame_durations.append(time.perf_counter() - _start)
+
+            self.frame_count += 1
+
+
+    def reset_statistics(self):
+        self.frame_durations = []
@@ -0,0 +1,52 @@
+#!/usr/bin/python
+
+## @file
+# Stand-in for avango.script (Script base class, field_has_changed and Update).
+
+### import guacamole libraries
+import avango
+
+
+class Script(avango.FieldContainer):
+
+    _is_script = True
+
+    ## constructor
+    def __init__(self, **KWARGS):
+        avango.FieldContainer.__init__(self, **KWARGS)
+
+
+
+## Decorator marking a script method as change callback of a class-level field.
+def field_has_changed(FIELD):
+
+    def _decorator(FUNCTION):
+        FUNCTION._field_has_changed = FIELD
+        return FUNCTION
+
+    return _decorator
+
+
+
+class _Update(avango.FieldContainer):
+
+    Active = avango.SFBool()
+
+    ## constructor
+    def __init__(self, Callback = None, Active = False):
+        avango.FieldContainer.__init__(self)
+
+        self.Callback = Callback
+        self.Active.value = Active
+
+        avango.register_frame_container(self)
+
+
+    def _frame(self):
+        if self.Active.value == True and self.Callback is not None:
+            self.Callback()
+
+
+
+class nodes(object):
+    Update = _Update
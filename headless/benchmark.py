@@ -0,0 +1,505 @@
+#!/usr/bin/python
+
+## @file
+# Per-frame hot-path benchmark of the manipulation techniques, driven through
+# the headless avango backend with synthetic pointer/mouse/spacemouse input.
+# Usage: python3 headless/benchmark.py [--frames 3000] [--output benchmark.json]
+#
+# With --prediction the residual error of the 07 tracking predictors is
+# reported instead, on a synthetic jittered pointer trace or on the tracking
+# stations of a recorded input log (--trace, see record.py).
+
+### import python libraries
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+
+HEADLESS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(HEADLESS_DIR)
+
+sys.path.insert(0, HEADLESS_DIR)
+
+### import guacamole libraries (headless stand-in)
+import avango
+import avango.gua
+import avango.daemon
+from avango import headless
+
+### import application libraries
+import inputlog
+
+
+### global variables ###
+FRAME_BUDGET = 1.0 / 60.0 # 60 Hz stereo cluster nodes (in sec)
+
+POINTER_TRACKING_STATION = "tracking-art-pointer-1"
+POINTER_DEVICE_STATION = "device-pointer-1"
+
+
+
+### exercise loading ###
+
+## Make the lib package of an exercise importable and reset all backend state.
+# Exercises resolve data files relative to their own directory, so the working
+# directory is changed as well.
+def load_exercise(NAME):
+    avango.reset()
+    avango.daemon.reset()
+    headless.set_time(0.0)
+
+    for _module in list(sys.modules.keys()):
+        if _module == "lib" or _module.startswith("lib."):
+            del sys.modules[_module]
+
+    _dir = os.path.join(REPO_DIR, NAME)
+
+    if _dir in sys.path:
+        sys.path.remove(_dir)
+
+    for _path in list(sys.path):
+        if os.path.dirname(_path) == REPO_DIR and os.path.basename(_path)[:2].isdigit():
+            sys.path.remove(_path) # lib package of a previously loaded exercise
+
+    sys.path.insert(0, _dir)
+    os.chdir(_dir)
+
+
+
+### synthetic input ###
+
+## Deterministic input traces; one sample per frame.
+class InputTrace:
+
+    def __init__(self, SEED = 0, FPS = 60.0):
+        self.random = random.Random(SEED)
+        self.fps = FPS
+
+
+    ## relative mouse motion (counts/frame) with a drag every 3 sec
+    def mouse(self, FRAME):
+        _t = FRAME / self.fps
+        _x = 6.0 * math.sin(_t * 1.3) + self.random.gauss(0.0, 1.0)
+        _y = 4.0 * math.cos(_t * 0.7) + self.random.gauss(0.0, 1.0)
+        _button = (_t % 3.0) > 2.0
+        return _x, _y, _button
+
+
+    ## spacemouse deflection (+-350) with idle phases (device at rest half of the time)
+    def spacemouse(self, FRAME):
+        _t = FRAME / self.fps
+
+        if (_t % 4.0) < 2.0:
+            return [0.0] * 6, False
+
+        _values = [200.0 * math.sin(_t * (0.5 + _i * 0.2)) + self.random.gauss(0.0, 5.0) for _i in range(6)]
+        _button = (_t % 4.0) > 3.0
+        return _values, _button
+
+
+    ## tracked pointer sweeping in front of the user with a drag every 2 sec
+    def pointer(self, FRAME):
+        _t = FRAME / self.fps
+        _mat = avango.gua.make_trans_mat(0.15 * math.sin(_t), 0.05 * math.cos(_t * 0.5), 0.1 + 0.05 * math.sin(_t * 0.3)) * \
+            avango.gua.make_rot_mat(20.0 * math.sin(_t * 0.8), 0, 1, 0) * \
+            avango.gua.make_rot_mat(10.0 * math.cos(_t * 0.6), 1, 0, 0)
+        _button = (_t % 2.0) > 1.2
+        return _mat, _button
+
+
+
+### timing ###
+
+## Wraps the evaluate() method of script instances and accumulates the time
+# spent in them per frame.
+class EvaluateTimer:
+
+    def __init__(self, CONTAINERS):
+        self.current = 0.0
+        self.samples = []
+
+        for _container in CONTAINERS:
+            self.wrap(_container)
+
+
+    def wrap(self, CONTAINER):
+        _evaluate = CONTAINER.evaluate
+
+        def _timed_evaluate():
+            _start = time.perf_counter()
+            _evaluate()
+            self.current += time.perf_counter() - _start
+
+        CONTAINER.evaluate = _timed_evaluate
+
+
+    def end_frame(self):
+        self.samples.append(self.current)
+        self.current = 0.0
+
+
+
+def percentile(SAMPLES, P):
+    _sorted = sorted(SAMPLES)
+    _index = min(len(_sorted) - 1, max(0, int(math.ceil(P / 100.0 * len(_sorted))) - 1))
+    return _sorted[_index]
+
+
+def summarize(SAMPLES):
+    if len(SAMPLES) == 0:
+        return {}
+
+    _ms = [_s * 1000.0 for _s in SAMPLES]
+
+    return {
+        "mean_ms": sum(_ms) / len(_ms),
+        "p95_ms": percentile(_ms, 95),
+        "p99_ms": percentile(_ms, 99),
+        "max_ms": max(_ms),
+        "budget_share_p99": percentile(_ms, 99) / (FRAME_BUDGET * 1000.0),
+        }
+
+
+## Run FRAMES frames (after WARMUP frames) and collect evaluate() and whole-frame timings.
+def run_frames(CONTAINERS, FEED, FRAMES, WARMUP):
+    _timer = EvaluateTimer(CONTAINERS)
+    _loop = headless.FrameLoop(FPS = 1.0 / FRAME_BUDGET)
+
+    with open(os.devnull, "w") as _null, contextlib.redirect_stdout(_null): # techniques print debug output every frame
+        _loop.run(WARMUP, FEED)
+        _timer.samples = []
+        _loop.reset_statistics()
+
+        for _i in range(FRAMES):
+            _loop.run(1, FEED)
+            _timer.end_frame()
+
+    _result = {"evaluate": summarize(_timer.samples), "frame": summarize(_loop.frame_durations)}
+    return _result
+
+
+
+### benchmarks ###
+
+def build_remote_manipulation_scene(SCENEGRAPH, NUMBER = 20, SEED = 0):
+    _random = random.Random(SEED)
+    _loader = avango.gua.nodes.TriMeshLoader()
+    _pickable_list = []
+
+    for _i in range(NUMBER):
+        _geometry = _loader.create_geometry_from_file("box_geometry" + str(_i), "data/objects/cube.obj", avango.gua.LoaderFlags.DEFAULTS | avango.gua.LoaderFlags.LOAD_MATERIALS | avango.gua.LoaderFlags.MAKE_PICKABLE) # loader hierarchy as in lib/Scene.py
+
+        _node = avango.gua.nodes.TransformNode(Name = "box" + str(_i))
+        _node.Transform.value = \
+            avango.gua.make_trans_mat(_random.uniform(-0.4, 0.4), _random.uniform(-0.2, 0.2), _random.uniform(-1.0, -0.3)) * \
+            avango.gua.make_scale_mat(0.05)
+        _node.Children.value.append(_geometry)
+        SCENEGRAPH.Root.value.Children.value.append(_node)
+        _pickable_list.append(_geometry)
+
+    return _pickable_list
+
+
+def benchmark_remote_manipulation(FRAMES, WARMUP, SEED):
+    _results = {}
+
+    for _index, _name in enumerate(["VirtualRay", "VirtualHand", "GoGo", "Homer"]):
+        load_exercise("07_remote_manipulation")
+
+        from lib.Manipulation import ManipulationManager
+
+        _scenegraph = avango.gua.nodes.SceneGraph(Name = "scenegraph")
+        _pickable_list = build_remote_manipulation_scene(_scenegraph, SEED = SEED)
+
+        _navigation_node = avango.gua.nodes.TransformNode(Name = "navigation_node")
+        _scenegraph.Root.value.Children.value.append(_navigation_node)
+
+        _head_node = avango.gua.nodes.TransformNode(Name = "head_node")
+        _head_node.Transform.value = avango.gua.make_trans_mat(0.0, 0.0, 0.6)
+        _navigation_node.Children.value.append(_head_node)
+
+        with open(os.devnull, "w") as _null, contextlib.redirect_stdout(_null):
+            _manager = ManipulationManager()
+            _manager.my_constructor(
+                SCENEGRAPH = _scenegraph,
+                NAVIGATION_NODE = _navigation_node,
+                POINTER_TRACKING_STATION = POINTER_TRACKING_STATION,
+                POINTER_DEVICE_STATION = POINTER_DEVICE_STATION,
+                HEAD_NODE = _head_node,
+                PICKABLE_LIST = _pickable_list,
+                )
+            _manager.set_manipulation_technique(_index)
+
+        _trace = InputTrace(SEED)
+        _tracking_station = avango.daemon.Station(POINTER_TRACKING_STATION)
+        _device_station = avango.daemon.Station(POINTER_DEVICE_STATION)
+
+        def _feed(FRAME):
+            _tracking_station.matrix, _device_station.buttons[0] = _trace.pointer(FRAME)
+
+        _containers = [_manager.active_manipulation_technique]
+
+        if hasattr(_manager, "pickingService"): # ray tests are resolved by the picking service
+            _containers.append(_manager.pickingService)
+
+        _results["07_remote_manipulation/" + _name] = run_frames(_containers, _feed, FRAMES, WARMUP)
+
+        if _index == 0 and _manager.rayBroadPhase is not None:
+            _results["07_remote_manipulation/" + _name]["broad_phase_mismatches"] = count_broad_phase_mismatches(_manager.pickingService, _scenegraph, InputTrace(SEED), FRAMES)
+
+    return _results
+
+
+## Number of pointer rays whose broad-phase pick result differs from an
+# unculled ray test (e.g. hits missed because of the candidate white-list).
+def count_broad_phase_mismatches(PICKING_SERVICE, SCENEGRAPH, TRACE, FRAMES, PICK_LENGTH = 10.0):
+    _ray = avango.gua.nodes.Ray()
+    _mismatches = 0
+
+    for _frame in range(FRAMES):
+        _mat = TRACE.pointer(_frame)[0]
+        _origin = _mat.get_translate()
+        _vec = avango.gua.make_rot_mat(_mat.get_rotate_scale_corrected()) * avango.gua.Vec3(0.0, 0.0, -1.0)
+        _direction = avango.gua.Vec3(_vec.x, _vec.y, _vec.z) * PICK_LENGTH
+
+        _ray.Origin.value = _origin
+        _ray.Direction.value = _direction
+
+        _options = avango.gua.PickingOptions.PICK_ONLY_FIRST_OBJECT
+        _culled = [_result.Object.value for _result in PICKING_SERVICE.ray_test(_origin, _direction, _options, [], []).value]
+        _unculled = [_result.Object.value for _result in SCENEGRAPH.ray_test(_ray, _options, [], []).value]
+
+        if _culled != _unculled:
+            _mismatches += 1
+
+    return _mismatches
+
+
+def benchmark_transfer_functions(FRAMES, WARMUP, SEED):
+    _results = {}
+
+    for _index in range(1, 9):
+        load_exercise("05_transfer_functions")
+
+        from lib.Scene import Scene
+        from lib.Manipulation import ManipulationManager
+
+        random.seed(SEED) # scene uses the global random generator
+
+        _scenegraph = avango.gua.nodes.SceneGraph(Name = "scenegraph")
+        _scene = Scene(PARENT_NODE = _scenegraph.Root.value)
+
+        _navigation_node = avango.gua.nodes.TransformNode(Name = "navigation_node")
+        _scenegraph.Root.value.Children.value.append(_navigation_node)
+
+        with open(os.devnull, "w") as _null, contextlib.redirect_stdout(_null):
+            _manager = ManipulationManager()
+            _manager.my_constructor(PARENT_NODE = _navigation_node, SCENE_ROOT = _scenegraph.Root.value, TARGET_LIST = _scene.target_list)
+            _manager.set_manipulation_technique(_index)
+
+        _technique = _manager.active_manipulation
+
+        _trace = InputTrace(SEED)
+        _mouse_station = avango.daemon.Station("gua-device-mouse")
+        _spacemouse_station = avango.daemon.Station("gua-device-spacemouse")
+
+        def _feed(FRAME):
+            _x, _y, _mouse_station.buttons[0] = _trace.mouse(FRAME)
+            _mouse_station.values[0] = _x
+            _mouse_station.values[1] = _y
+
+            _values, _spacemouse_station.buttons[0] = _trace.spacemouse(FRAME)
+            _spacemouse_station.values[0:6] = _values
+
+        _name = "05_transfer_functions/" + (_technique.type or _technique.__class__.__name__)
+        _results[_name] = run_frames([_technique, _manager], _feed, FRAMES, WARMUP)
+
+    return _results
+
+
+
+### prediction ###
+
+## Tracking samples as {station: [(time, matrix)]}, from the matrix records of
+# an input log or from the synthetic pointer trace with added jitter (the
+# clean trace is returned as ground truth, else the samples are).
+def load_tracking_samples(TRACE, FRAMES, SEED, JITTER = (0.0005, 0.2)):
+    if TRACE is not None:
+        _reader = inputlog.InputLogReader(TRACE)
+        _samples = {}
+
+        for _time, _station, _kind, _index, _payload in _reader.read():
+            if _kind == inputlog.KIND_MATRIX and _station.startswith("tracking-"):
+                _mat = avango.gua.make_identity_mat()
+
+                for _i, _element in enumerate(_payload):
+                    _mat.set_element(_i // 4, _i % 4, _element)
+
+                _samples.setdefault(_station, []).append((_time, _mat))
+
+        _reader.close()
+        return _samples, _samples
+
+    _trace = InputTrace(SEED)
+    _random = random.Random(SEED)
+    _truth = []
+    _samples = []
+
+    for _frame in range(FRAMES):
+        _time = _frame / _trace.fps
+        _mat = _trace.pointer(_frame)[0]
+        _truth.append((_time, _mat))
+
+        _jitter_mat = avango.gua.make_trans_mat(_random.gauss(0.0, JITTER[0]), _random.gauss(0.0, JITTER[0]), _random.gauss(0.0, JITTER[0])) * \
+            avango.gua.make_rot_mat(_random.gauss(0.0, JITTER[1]), 1, 0, 0) * \
+            avango.gua.make_rot_mat(_random.gauss(0.0, JITTER[1]), 0, 1, 0)
+        _samples.append((_time, _jitter_mat * _mat))
+
+    return {POINTER_TRACKING_STATION: _samples}, {POINTER_TRACKING_STATION: _truth}
+
+
+## Position (in mm) and angle (in degrees) error of a predictor against the
+# ground truth at the time each output is displayed (sample time + prediction time).
+def measure_prediction_error(PREDICTOR, SAMPLES, TRUTH, PREDICTION_TIME, POSE_PREDICTOR):
+    _truth = [(_time, POSE_PREDICTOR.matrix_to_pose(_mat)) for _time, _mat in TRUTH]
+    _position_errors = []
+    _angle_errors = []
+    _j = 0
+
+    for _time, _mat in SAMPLES:
+        _position, _quat = POSE_PREDICTOR.matrix_to_pose(_mat)
+
+        if PREDICTOR is not None:
+            _position, _quat = PREDICTOR.update(_position, _quat, _time)
+
+        _display_time = _time + PREDICTION_TIME
+
+        while _j + 1 < len(_truth) and _truth[_j + 1][0] <= _display_time:
+            _j += 1
+
+        if _j + 1 >= len(_truth): # display time beyond the trace
+            break
+
+        ## interpolate ground truth position, nearest orientation
+        (_t0, (_p0, _q0)), (_t1, (_p1, _q1)) = _truth[_j], _truth[_j + 1]
+        _w = (_display_time - _t0) / (_t1 - _t0) if _t1 > _t0 else 0.0
+        _true_position = [_p0[_i] + (_p1[_i] - _p0[_i]) * _w for _i in range(3)]
+        _true_quat = _q0 if _w < 0.5 else _q1
+
+        _position_errors.append(math.sqrt(sum([(_position[_i] - _true_position[_i]) ** 2 for _i in range(3)])) * 1000.0)
+        _angle_errors.append(POSE_PREDICTOR.get_angle(_quat, _true_quat))
+
+    if len(_position_errors) == 0:
+        return {}
+
+    return {
+        "position_rms_mm": math.sqrt(sum([_e * _e for _e in _position_errors]) / len(_position_errors)),
+        "position_p95_mm": percentile(_position_errors, 95),
+        "angle_rms_deg": math.sqrt(sum([_e * _e for _e in _angle_errors]) / len(_angle_errors)),
+        "angle_p95_deg": percentile(_angle_errors, 95),
+        }
+
+
+def benchmark_prediction(TRACE, FRAMES, SEED):
+    load_exercise("07_remote_manipulation")
+
+    from lib import PosePredictor
+
+    _samples, _truth = load_tracking_samples(TRACE, FRAMES, SEED)
+    _results = {}
+
+    for _station in sorted(_samples.keys()):
+        _parameters = PosePredictor.STATION_PARAMETERS.get(_station, {"min_cutoff": 1.0, "beta": 1.0, "d_cutoff": 1.0, "prediction_time": 0.0})
+        _time = _parameters["prediction_time"]
+
+        for _name, _predictor in [
+            ("raw", None),
+            ("filter", PosePredictor.PosePredictor(_parameters["min_cutoff"], _parameters["beta"], _parameters["d_cutoff"], 0.0)),
+            ("filter+prediction", PosePredictor.PosePredictor(_parameters["min_cutoff"], _parameters["beta"], _parameters["d_cutoff"], _time)),
+            ]:
+            _results[_station + "/" + _name] = measure_prediction_error(_predictor, _samples[_station], _truth[_station], _time, PosePredictor)
+
+    return _results
+
+
+
+### helper functions ###
+
+def get_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd = REPO_DIR, stderr = subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_results(RESULTS):
+    print("{:<80} {:>9} {:>9} {:>9} {:>9}".format("technique (evaluate / frame)", "mean ms", "p95 ms", "p99 ms", "budget"))
+
+    for _name, _result in sorted(RESULTS.items()):
+        for _kind in ("evaluate", "frame"):
+            _stats = _result[_kind]
+            print("{:<80} {:9.4f} {:9.4f} {:9.4f} {:8.2f}%".format(
+                _name + " (" + _kind + ")", _stats["mean_ms"], _stats["p95_ms"], _stats["p99_ms"], _stats["budget_share_p99"] * 100.0))
+
+        if _result.get("broad_phase_mismatches", 0) > 0:
+            print("WARNING:", _name, "broad phase changed", _result["broad_phase_mismatches"], "pick results")
+
+
+def print_prediction_results(RESULTS):
+    print("{:<60} {:>9} {:>9} {:>9} {:>9}".format("station/predictor (error at display time)", "rms mm", "p95 mm", "rms deg", "p95 deg"))
+
+    for _name, _result in sorted(RESULTS.items()):
+        print("{:<60} {:9.3f} {:9.3f} {:9.3f} {:9.3f}".format(
+            _name, _result["position_rms_mm"], _result["position_p95_mm"], _result["angle_rms_deg"], _result["angle_p95_deg"]))
+
+
+def start():
+    _parser = argparse.ArgumentParser(description = "per-frame benchmark of the manipulation techniques")
+    _parser.add_argument("--frames", type = int, default = 3000)
+    _parser.add_argument("--warmup", type = int, default = 120)
+    _parser.add_argument("--seed", type = int, default = 0)
+    _parser.add_argument("--output", default = "benchmark.json")
+    _parser.add_argument("--prediction", action = "store_true", help = "report residual error of the tracking predictors")
+    _parser.add_argument("--trace", default = None, help = "input log with tracking stations (prediction mode)")
+    _args = _parser.parse_args()
+
+    _output = os.path.abspath(_args.output)
+    _trace = os.path.abspath(_args.trace) if _args.trace is not None else None
+
+    _results = {}
+
+    if _args.prediction == True:
+        _results.update(benchmark_prediction(_trace, _args.frames, _args.seed))
+        print_prediction_results(_results)
+
+    else:
+        _results.update(benchmark_remote_manipulation(_args.frames, _args.warmup, _args.seed))
+        _results.update(benchmark_transfer_functions(_args.frames, _args.warmup, _args.seed))
+        print_results(_results)
+
+    _report = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "frames": _args.frames,
+        "warmup": _args.warmup,
+        "seed": _args.seed,
+        "trace": _trace,
+        "frame_budget_ms": FRAME_BUDGET * 1000.0,
+        "results": _results,
+        }
+
+    with open(_output, "w") as _file:
+        json.dump(_report, _file, indent = 2, sort_keys = True)
+
+    print("results written to", _output)
+
+
+if __name__ == '__main__':
+  start()
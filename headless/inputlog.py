@@ -0,0 +1,288 @@
+#!/usr/bin/python
+
+## @file
+# Compact binary log of device station input (values, buttons and matrices of
+# avango.daemon stations) for deterministic replay, see ReplayDeviceService in
+# the headless avango.daemon.
+#
+# The log starts with a short header followed by fixed-size records
+#   time (double, sec since recording start), station id (ushort), kind (uchar), index (uchar)
+# and a kind-specific payload. Only changes are logged; a station's name is
+# logged once (KIND_NAME) before its first change.
+#
+# InputLogWriter appends to a memory-mapped file that grows in chunks, so a
+# frame costs a few slice assignments instead of write calls. A log that was
+# not closed properly ends in zero padding and is read up to the last record.
+
+### import python libraries
+import mmap
+import struct
+
+
+### global variables ###
+MAGIC = b"AVIL"
+VERSION = 1
+
+HEADER = struct.Struct("<4sH")
+RECORD = struct.Struct("<dHBB")
+
+## record kinds (0 marks the unused end of a log)
+KIND_END = 0
+KIND_NAME = 1 # payload: name length (ushort), utf-8 name
+KIND_VALUE = 2 # payload: value (double) of channel index
+KIND_BUTTONS = 3 # payload: button states as bitmask (uint)
+KIND_MATRIX = 4 # payload: 16 doubles (row-major)
+
+NAME_LENGTH = struct.Struct("<H")
+VALUE_PAYLOAD = struct.Struct("<d")
+BUTTONS_PAYLOAD = struct.Struct("<I")
+MATRIX_PAYLOAD = struct.Struct("<16d")
+
+NUM_BUTTONS = 32
+NUM_VALUES = 16
+
+
+
+class InputLogWriter:
+
+    ## constructor
+    def __init__(self,
+        FILENAME,
+        CHUNK_SIZE = 1 << 20, # file grows by this many bytes
+        ):
+
+        ### parameters ###
+        self.filename = FILENAME
+        self.chunk_size = CHUNK_SIZE
+
+
+        ### variables ###
+        self.station_ids = {} # station name -> id
+        self.size = 0 # bytes written
+
+
+        ### resources ###
+        self.file = open(FILENAME, "w+b")
+        self.file.truncate(CHUNK_SIZE)
+        self.buffer = mmap.mmap(self.file.fileno(), CHUNK_SIZE)
+
+        self.append(HEADER.pack(MAGIC, VERSION))
+
+
+    ### functions ###
+    def append(self, BYTES):
+        _end = self.size + len(BYTES)
+
+        if _end > len(self.buffer):
+            self.buffer.resize(len(self.buffer) + max(self.chunk_size, len(BYTES)))
+
+        self.buffer[self.size:_end] = BYTES
+        self.size = _end
+
+
+    def get_station_id(self, TIME, STATION):
+        _id = self.station_ids.get(STATION)
+
+        if _id is None:
+            _id = len(self.station_ids)
+            self.station_ids[STATION] = _id
+
+            _name = STATION.encode("utf-8")
+            self.append(RECORD.pack(TIME, _id, KIND_NAME, 0) + NAME_LENGTH.pack(len(_name)) + _name)
+
+        return _id
+
+
+    def write_value(self, TIME, STATION, INDEX, VALUE):
+        self.append(RECORD.pack(TIME, self.get_station_id(TIME, STATION), KIND_VALUE, INDEX) + VALUE_PAYLOAD.pack(VALUE))
+
+
+    def write_buttons(self, TIME, STATION, BUTTONS):
+        _mask = 0
+
+        for _i, _button in enumerate(BUTTONS):
+            if _button == True:
+                _mask |= 1 << _i
+
+        self.append(RECORD.pack(TIME, self.get_station_id(TIME, STATION), KIND_BUTTONS, 0) + BUTTONS_PAYLOAD.pack(_mask))
+
+
+    def write_matrix(self, TIME, STATION, ELEMENTS):
+        self.append(RECORD.pack(TIME, self.get_station_id(TIME, STATION), KIND_MATRIX, 0) + MATRIX_PAYLOAD.pack(*ELEMENTS))
+
+
+    def flush(self):
+        self.buffer.flush()
+
+
+    ## cut off the unused part of the last chunk
+    def close(self):
+        if self.buffer is None:
+            return
+
+        self.buffer.flush()
+        self.buffer.close()
+        self.buffer = None
+
+        self.file.truncate(self.size)
+        self.file.close()
+
+
+
+class InputLogReader:
+
+    ## constructor
+    def __init__(self, FILENAME):
+
+        ### parameters ###
+        self.filename = FILENAME
+
+
+        ### resources ###
+        with open(FILENAME, "rb") as _file:
+            self.buffer = mmap.mmap(_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        _magic, _version = HEADER.unpack_from(self.buffer, 0)
+
+        if _magic != MAGIC or _version != VERSION:
+            raise ValueError("input log " + FILENAME + ": unknown format")
+
+
+    ### functions ###
+    ## all records as (time, station name, kind, index, payload) tuples in recording order
+    def read(self):
+        _buffer = self.buffer
+        _size = len(_buffer)
+        _offset = HEADER.size
+        _names = {}
+        _records = []
+
+        while _offset + RECORD.size <= _size:
+            _time, _id, _kind, _index = RECORD.unpack_from(_buffer, _offset)
+            _offset += RECORD.size
+
+            if _kind == KIND_END: # zero padding of an unclosed log
+                break
+
+            elif _kind == KIND_NAME:
+                _length, = NAME_LENGTH.unpack_from(_buffer, _offset)
+                _offset += NAME_LENGTH.size
+                _names[_id] = _buffer[_offset:_offset + _length].decode("utf-8")
+                _offset += _length
+                continue
+
+            elif _kind == KIND_VALUE:
+                _payload, = VALUE_PAYLOAD.unpack_from(_buffer, _offset)
+                _offset += VALUE_PAYLOAD.size
+
+            elif _kind == KIND_BUTTONS:
+                _mask, = BUTTONS_PAYLOAD.unpack_from(_buffer, _offset)
+                _offset += BUTTONS_PAYLOAD.size
+                _payload = [(_mask >> _i) & 1 == 1 for _i in range(NUM_BUTTONS)]
+
+            elif _kind == KIND_MATRIX:
+                _payload = MATRIX_PAYLOAD.unpack_from(_buffer, _offset)
+                _offset += MATRIX_PAYLOAD.size
+
+            else:
+                raise ValueError("input log " + self.filename + ": unknown record kind " + str(_kind))
+
+            _records.append((_time, _names[_id], _kind, _index, _payload))
+
+        return _records
+
+
+    def close(self):
+        self.buffer.close()
+
+
+
+## Per-frame recorder of device stations (reads the stations through
+# DeviceSensors, so it works with the real daemon as well as the headless
+# stand-in). Create it before the application loop is started.
+def create_recorder(FILENAME, STATIONS, CLOCK = None):
+
+    ### import guacamole libraries (whichever avango is loaded)
+    import avango
+    import avango.script
+    import avango.daemon
+
+    ### import python libraries
+    import time
+
+
+    class InputRecorder(avango.script.Script):
+
+        ## constructor
+        def __init__(self):
+            self.super(InputRecorder).__init__()
+
+
+        def my_constructor(self, FILENAME, STATIONS, CLOCK = None):
+
+            ### parameters ###
+            self.clock = CLOCK if CLOCK is not None else time.time
+
+
+            ### variables ###
+            self.start_time = self.clock()
+            self.last_states = {} # station name -> (values, buttons, matrix elements)
+
+
+            ### resources ###
+            self.writer = InputLogWriter(FILENAME)
+
+            self.device_sensors = []
+
+            for _station in STATIONS:
+                _sensor = avango.daemon.nodes.DeviceSensor(DeviceService = avango.daemon.DeviceService())
+                _sensor.Station.value = _station
+
+                _values = [getattr(_sensor, "Value" + str(_i)) for _i in range(NUM_VALUES) if hasattr(_sensor, "Value" + str(_i))]
+                _buttons = [getattr(_sensor, "Button" + str(_i)) for _i in range(NUM_BUTTONS) if hasattr(_sensor, "Button" + str(_i))]
+
+                self.device_sensors.append((_station, _sensor, _values, _buttons))
+                self.last_states[_station] = ([0.0] * len(_values), [False] * len(_buttons), None)
+
+            self.frame_trigger = avango.script.nodes.Update(Callback = self.frame_callback, Active = True)
+
+
+        ### functions ###
+        def close(self):
+            self.frame_trigger.Active.value = False
+            self.writer.close()
+
+
+        ### callback functions ###
+        def frame_callback(self): # evaluated every frame
+            _time = self.clock() - self.start_time
+            _writer = self.writer
+
+            for _station, _sensor, _value_fields, _button_fields in self.device_sensors:
+                _last_values, _last_buttons, _last_matrix = self.last_states[_station]
+
+                for _i, _field in enumerate(_value_fields):
+                    _value = _field.value
+
+                    if _value != _last_values[_i]:
+                        _writer.write_value(_time, _station, _i, _value)
+                        _last_values[_i] = _value
+
+                _buttons = [_field.value for _field in _button_fields]
+
+                if _buttons != _last_buttons:
+                    _writer.write_buttons(_time, _station, _buttons)
+
+                _mat = _sensor.Matrix.value
+                _matrix = [_mat.get_element(_row, _col) for _row in range(4) for _col in range(4)]
+
+                if _matrix != _last_matrix:
+                    _writer.write_matrix(_time, _station, _matrix)
+
+                self.last_states[_station] = (_last_values, _buttons, _matrix)
+
+
+    _recorder = InputRecorder()
+    _recorder.my_constructor(FILENAME, STATIONS, CLOCK)
+
+    return _recorder
@@ -0,0 +1,69 @@
+#!/usr/bin/python
+
+## @file
+# Runs an exercise with the real avango/daemon (as its start.sh does) and
+# records all device stations into an input log for headless replay.
+# Usage (in the environment of start.sh, with daemon.py running):
+#   python3.4 headless/record.py 05_transfer_functions input.log [station ...]
+# Stations default to the ones configured in the exercise's daemon.py.
+# Replay with: headless/start.sh 05_transfer_functions 0 input.log [speed]
+
+### import python libraries
+import os
+import sys
+
+
+HEADLESS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(HEADLESS_DIR)
+
+## the stand-in must not shadow the real avango package
+sys.path = [_path for _path in sys.path if os.path.abspath(_path or ".") != HEADLESS_DIR]
+
+### import guacamole libraries
+import avango
+import avango.script
+import avango.daemon
+
+sys.path.append(HEADLESS_DIR)
+
+### import application libraries
+import inputlog
+
+
+## station names configured in the daemon.py of an exercise (see lib/StationDaemon.py)
+def get_daemon_stations(EXERCISE_DIR):
+    sys.path.insert(0, EXERCISE_DIR)
+
+    import daemon
+    from lib.StationDaemon import get_station_names
+
+    return get_station_names(daemon.STATIONS)
+
+
+
+def start():
+    if len(sys.argv) < 3:
+        print("usage: " + sys.argv[0] + " <exercise directory> <input log> [station ...]")
+        sys.exit(1)
+
+    _exercise_dir = os.path.join(REPO_DIR, sys.argv[1])
+    _filename = os.path.abspath(sys.argv[2])
+    _stations = sys.argv[3:] if len(sys.argv) > 3 else get_daemon_stations(_exercise_dir)
+
+    os.chdir(_exercise_dir) # exercises resolve data files relative to their directory
+    sys.path.insert(0, _exercise_dir)
+
+    import main
+
+    _recorder = inputlog.create_recorder(_filename, _stations)
+    print("recording stations", _stations, "to", _filename)
+
+    try:
+        main.start()
+    finally:
+        _recorder.close()
+
+
+
+if __name__ == '__main__':
+    start()
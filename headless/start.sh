@@ -0,0 +1,25 @@
+#!/bin/bash
+
+# Runs an exercise with the headless avango stand-in instead of guacamole
+# (no window, no daemon). Usage: headless/start.sh 05_transfer_functions [frames] [input log] [replay speed]
+
+# get directory of script
+DIR="$( cd "$( dirname "$0" )" && pwd )"
+
+if [ -z "$1" ]; then
+    echo "usage: $0 <exercise directory> [number of frames] [input log] [replay speed]"
+    exit 1
+fi
+
+# headless avango package
+export PYTHONPATH=$DIR
+
+# stop after the given number of frames (run forever if not set)
+export AVANGO_HEADLESS_FRAMES=${2:-0}
+
+# replay recorded device input (see record.py)
+export AVANGO_HEADLESS_REPLAY=${3:+$(cd "$(dirname "$3")" && pwd)/$(basename "$3")}
+export AVANGO_HEADLESS_REPLAY_SPEED=${4:-1.0}
+
+# run program
+cd "$DIR/../$1" && python3 ./main.py